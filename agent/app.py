@@ -1,24 +1,14 @@
 from langgraph.graph import END, StateGraph, START
-from langgraph.checkpoint.memory import MemorySaver
-from pydantic import BaseModel, Field
-from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-
-
-from openai import OpenAI
-import os
 from dotenv import load_dotenv
-from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from typing_extensions import TypedDict
-from pydantic import BaseModel, Field
 
+from utils.checkpoints import create_checkpointer
+from utils.run_stats import instrument_node
+from utils.snowflake_pool import release_run_session
+from utils.workspace import build_slot, finish_workspace, set_resumable_check
 
-load_dotenv()
 
-# Initialize OpenAI API
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=openai_api_key)
+load_dotenv()
 
 
 # Define the state schema
@@ -28,11 +18,12 @@ class AppState(TypedDict):
     approved: bool
     final_response: str
     question: str
-    script: str
+    # References into the artifact store (utils.artifacts), not the content
+    script_ref: str
     stack_trace: str
     csv_file: str
     snowflake_stage: str
-    semantic_model_yaml: str
+    semantic_model_ref: str
     generation: str
     demo_description: str
     question_1: str
@@ -40,8 +31,8 @@ class AppState(TypedDict):
     question_3: str
     question_4: str
     question_5: str
-    generated_idea: str
-    table_info: list  # Added to store table information
+    generated_idea_ref: str
+    table_info_ref: str  # Added to store table information
     cortex_search_path: str
     semantic_model_path: str
     schema: str
@@ -54,20 +45,39 @@ class AppState(TypedDict):
     sample_q_5: str
     snowflake_data_description: str
     documents_description: str
+    upload_stats: dict
+    script_run_stats: dict
+    # Dataset script retry budget, see nodes/evaluate_script_run.py
+    script_attempts: list
+    script_strategy: str
+    script_started_at: float
+    script_budget_start: int
+    script_guidance: str
+    documents_file: str
 
 
 # Update the StateGraph to use the defined schema
 workflow = StateGraph(AppState)
 
+
+def add_node(name, node):
+    # Every node reports its timings, LLM usage and Snowflake statements
+    workflow.add_node(name, instrument_node(name, node))
+
+
 from nodes.generate_demo_scenario import generate_demo_scenario
 from nodes.display_demo_idea import display_demo_idea
 from nodes.ask_user_feedback import ask_user_feedback
-from nodes.generate_dataset_script import generate_dataset_script
+from nodes.generate_dataset_script import (
+    generate_dataset_script,
+    regenerate_dataset_script,
+)
 from nodes.generate_document_data import generate_document_data
 from nodes.evaluate_human_feedback import evaluate_human_feedback
 from nodes.execute_dataset_script import execute_dataset_script
 from nodes.upload_to_snowflake import (
     upload_to_snowflake,
+    upload_documents,
     upload_semantic_model,
     create_agent,
     create_cortex_search,
@@ -75,62 +85,133 @@ from nodes.upload_to_snowflake import (
 )
 from nodes.generate_semantic_model import generate_semantic_model
 from nodes.fix_python_script import fix_python_script
+from nodes.evaluate_script_run import evaluate_script_run
+from nodes.ask_script_guidance import ask_script_guidance
 from nodes.check_dataset_script import check_dataset_script
 from nodes.check_semantic_model import check_semantic_model
 from nodes.display_results import display_results
 from nodes.generate_agent_description import generate_agent_description
 
-workflow.add_node("GenerateDemoScenario", generate_demo_scenario)
-workflow.add_node("DisplayDemoIdea", display_demo_idea)
-workflow.add_node("AskUserFeedback", ask_user_feedback)
-workflow.add_node("GenerateDocumentData", generate_document_data)
-workflow.add_node("GenerateDatasetScript", generate_dataset_script)
-workflow.add_node("ExecuteDatasetScript", execute_dataset_script)
-workflow.add_node("UploadToSnowflake", upload_to_snowflake)
-workflow.add_node("GenerateSemanticModel", generate_semantic_model)
-workflow.add_node("FixPythonScript", fix_python_script)
-workflow.add_node("UploadSemanticModel", upload_semantic_model)
-workflow.add_node("CreateCortexSearch", create_cortex_search)
-workflow.add_node("GenerateToolDescriptions", generate_tool_descriptions)
-workflow.add_node("CreateAgent", create_agent)
-workflow.add_node("CheckDatasetScript", check_dataset_script)
-workflow.add_node("CheckSemanticModel", check_semantic_model)
-workflow.add_node("DisplayResults", display_results)
-workflow.add_node("GenerateAgentDescription", generate_agent_description)
+add_node("GenerateDemoScenario", generate_demo_scenario)
+add_node("DisplayDemoIdea", display_demo_idea)
+add_node("AskUserFeedback", ask_user_feedback)
+add_node("GenerateDocumentData", generate_document_data)
+add_node("GenerateDatasetScript", generate_dataset_script)
+add_node("ExecuteDatasetScript", execute_dataset_script)
+add_node("UploadToSnowflake", upload_to_snowflake)
+add_node("GenerateSemanticModel", generate_semantic_model)
+add_node("FixPythonScript", fix_python_script)
+add_node("RegenerateDatasetScript", regenerate_dataset_script)
+add_node("AskScriptGuidance", ask_script_guidance)
+add_node("UploadSemanticModel", upload_semantic_model)
+add_node("UploadDocuments", upload_documents)
+add_node("CreateCortexSearch", create_cortex_search)
+add_node("GenerateToolDescriptions", generate_tool_descriptions)
+add_node("CreateAgent", create_agent)
+add_node("CheckDatasetScript", check_dataset_script)
+add_node("CheckSemanticModel", check_semantic_model)
+add_node("DisplayResults", display_results)
+add_node("GenerateAgentDescription", generate_agent_description)
 
 
 workflow.add_edge(START, "GenerateDemoScenario")
 # Define the flow between nodes
 workflow.add_edge("GenerateDemoScenario", "DisplayDemoIdea")
 workflow.add_edge("DisplayDemoIdea", "AskUserFeedback")
-workflow.add_conditional_edges("AskUserFeedback", evaluate_human_feedback)
+workflow.add_conditional_edges(
+    "AskUserFeedback", instrument_node("EvaluateHumanFeedback", evaluate_human_feedback)
+)
+# Once the schema is known the structured data and the document branches run in
+# parallel and join again before the agent description is generated.
+# Structured data branch: script -> CSVs -> tables -> semantic model
 workflow.add_edge("GenerateDatasetScript", "CheckDatasetScript")
 workflow.add_edge("CheckDatasetScript", "ExecuteDatasetScript")
+# Failures are fixed within an attempt and time budget; repeated errors
+# regenerate the script and exhausted budgets ask the user
 workflow.add_conditional_edges(
-    "ExecuteDatasetScript",
-    lambda context, writer: (
-        "GenerateDocumentData"
-        if not context.get("stack_trace", None)
-        else "FixPythonScript"
-    ),
+    "ExecuteDatasetScript", instrument_node("EvaluateScriptRun", evaluate_script_run)
 )
 workflow.add_edge("FixPythonScript", "ExecuteDatasetScript")
-workflow.add_edge("GenerateDocumentData", "UploadToSnowflake")
+workflow.add_edge("RegenerateDatasetScript", "CheckDatasetScript")
+workflow.add_edge("AskScriptGuidance", "FixPythonScript")
 workflow.add_edge("UploadToSnowflake", "GenerateSemanticModel")
 workflow.add_edge("GenerateSemanticModel", "CheckSemanticModel")
 workflow.add_edge("CheckSemanticModel", "UploadSemanticModel")
-workflow.add_edge("UploadSemanticModel", "CreateCortexSearch")
-workflow.add_edge("CreateCortexSearch", "GenerateAgentDescription")
+# Document branch: documents -> DOCUMENTS table -> Cortex Search.
+# Nodes on both branches only return the keys they change, two branches
+# writing the same key in one step would be an InvalidUpdateError.
+workflow.add_edge("GenerateDatasetScript", "GenerateDocumentData")
+workflow.add_edge("GenerateDocumentData", "UploadDocuments")
+workflow.add_edge("UploadDocuments", "CreateCortexSearch")
+workflow.add_edge(["UploadSemanticModel", "CreateCortexSearch"], "GenerateAgentDescription")
 workflow.add_edge("GenerateAgentDescription", "GenerateToolDescriptions")
 workflow.add_edge("GenerateToolDescriptions", "CreateAgent")
 workflow.add_edge("CreateAgent", "DisplayResults")
 workflow.add_edge("DisplayResults", END)
 
 
-# A checkpointer is required for `interrupt` to work.
-checkpointer = MemorySaver()
+# A checkpointer is required for `interrupt` to work. With CHECKPOINTER=sqlite
+# the checkpoints outlive the process and builds can be resumed.
+checkpointer = create_checkpointer()
 # Compile the graph after defining nodes and edges
 app = workflow.compile(checkpointer=checkpointer)
 
-if __name__ == "__main__":
-    app.run()
+
+def thread_config(thread_id):
+    return {"configurable": {"thread_id": str(thread_id)}}
+
+
+def resumable_nodes(thread_id):
+    """Nodes a stopped build of `thread_id` would continue with.
+
+    Empty when the thread is unknown, finished, or waiting for user input (that
+    is resumed with `Command(resume=...)` instead).
+    """
+    state = app.get_state(thread_config(thread_id))
+    if any(task.interrupts for task in state.tasks):
+        return ()
+    return state.next
+
+
+def _can_continue(thread_id):
+    # Resumable after a failure, or waiting for user input
+    return bool(app.get_state(thread_config(thread_id)).next)
+
+
+# Stale workspaces of such builds are not pruned
+set_resumable_check(_can_continue)
+
+
+def stream_build(inputs, thread_id, stream_mode=("messages", "custom")):
+    """Run the build of `thread_id` with `inputs` and return the `app.stream` output.
+
+    Builds are limited to MAX_CONCURRENT_BUILDS at a time, each with its own
+    workspace (utils/workspace.py). The workspace is cleaned up according to
+    WORKSPACE_CLEANUP once the build finished or failed; a build waiting for
+    user input keeps it. Its Snowflake session goes back to the pool
+    (utils/snowflake_pool.py) whenever the build stops, including to wait for
+    user input.
+    """
+    config = thread_config(thread_id)
+    with build_slot():
+        try:
+            yield from app.stream(inputs, config=config, stream_mode=list(stream_mode))
+        except Exception:
+            finish_workspace(thread_id, succeeded=False)
+            raise
+        finally:
+            release_run_session(thread_id)
+    if not app.get_state(config).next:
+        finish_workspace(thread_id, succeeded=True)
+
+
+def resume(thread_id, stream_mode=("messages", "custom")):
+    """Continue a stopped build of `thread_id` from its last checkpoint.
+
+    Nodes that completed before the build stopped are not run again, including
+    nodes of a parallel branch that finished in the step that failed. Returns
+    the same stream as `stream_build`.
+    """
+    if not resumable_nodes(thread_id):
+        raise ValueError(f"Thread {thread_id} has nothing to resume")
+    return stream_build(None, thread_id, stream_mode)
@@ -0,0 +1,167 @@
+"""Build many demos without the UI.
+
+    python agent/batch.py prompts.jsonl --output results.jsonl --workers 4
+
+Every line of the input is a JSON object with the prompt in "prompt" (or
+"title" and "body", as in a backlog export) and optionally an "id" and
+scripted replies:
+
+- "feedback": reply, or list of replies, to the demo idea review. Once they
+  are used up (or when there are none) the idea is approved as it is.
+- "script_guidance": reply to the request for help when the dataset script
+  keeps failing. Without one the build is stopped and reported as failed.
+
+Demos are built by a pool of worker threads, each build in its own workspace.
+There are at most MAX_CONCURRENT_BUILDS workers, more would only queue for a
+build slot and time out. One JSON line is appended to the output per demo as
+soon as it finishes, with its status, error, duration and the run summary of
+utils/run_stats.py (per-node timings, LLM tokens and cost, Snowflake
+statements and bytes uploaded).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langgraph.types import Command
+
+import app as agent
+from utils.run_stats import merge_node_stats
+
+APPROVAL = "Looks good, build the demo exactly as proposed."
+STOP = "stop"
+# Feedback rounds before a build that keeps being re-planned is given up
+MAX_INTERRUPTS = 10
+
+
+def read_requests(path):
+    requests = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            prompt = request.get("prompt") or "\n\n".join(
+                part for part in (request.get("title"), request.get("body")) if part
+            )
+            if not prompt:
+                raise ValueError(f"{path}:{line_number} has no prompt")
+            request["id"] = str(request.get("id") or request.get("request_id") or line_number)
+            request["prompt"] = prompt
+            requests.append(request)
+    return requests
+
+
+def _scripted_replies(request):
+    feedback = request.get("feedback") or []
+    return [feedback] if isinstance(feedback, str) else list(feedback)
+
+
+def _reply_to(task, replies, request):
+    """The answer to the interrupt raised by `task`."""
+    if task.name == "AskScriptGuidance":
+        return request.get("script_guidance") or STOP
+    return replies.pop(0) if replies else APPROVAL
+
+
+def build_demo(request, quiet=False, on_event=None):
+    """Run one build to completion and return its result record.
+
+    `on_event` is called with every event of the `custom` stream.
+    """
+    thread_id = f"batch-{request['id']}-{uuid.uuid4().hex[:8]}"
+    config = agent.thread_config(thread_id)
+    summary = {"nodes": {}, "totals": {}}
+    replies = _scripted_replies(request)
+    result = {"id": request["id"], "thread_id": thread_id, "interrupts": 0}
+
+    start = time.perf_counter()
+    inputs = {"question": request["prompt"]}
+    try:
+        while True:
+            for _, chunk in agent.stream_build(inputs, thread_id, stream_mode=("custom",)):
+                if on_event is not None:
+                    on_event(chunk)
+                if isinstance(chunk, dict) and chunk.get("type") == "node_stats":
+                    merge_node_stats(summary, chunk)
+                # Token progress dicts are for the UI
+                elif isinstance(chunk, str) and not quiet:
+                    print(f"[{request['id']}] {chunk}", flush=True)
+
+            waiting = [task for task in agent.app.get_state(config).tasks if task.interrupts]
+            if not waiting:
+                break
+            if result["interrupts"] >= MAX_INTERRUPTS:
+                raise RuntimeError(f"Still waiting for input after {MAX_INTERRUPTS} replies")
+            result["interrupts"] += 1
+            inputs = Command(resume=_reply_to(waiting[0], replies, request))
+
+        state = agent.app.get_state(config).values
+        result.update(
+            status="succeeded",
+            schema=state.get("schema"),
+            agent_name=state.get("agent_name"),
+            script_run_stats=state.get("script_run_stats"),
+        )
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+        if not quiet:
+            traceback.print_exc()
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    result.update(summary)
+    return result
+
+
+def main(argv=None):
+    max_builds = int(os.getenv("MAX_CONCURRENT_BUILDS", "4"))
+    parser = argparse.ArgumentParser(description="Build demos from a JSONL file of prompts.")
+    parser.add_argument("requests", help="JSONL file with one demo request per line")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL results file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max_builds,
+        help="Demos built at the same time, at most MAX_CONCURRENT_BUILDS",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print finished demos")
+    args = parser.parse_args(argv)
+
+    requests = read_requests(args.requests)
+    workers = min(max(args.workers, 1), max_builds)
+    if workers < args.workers:
+        print(f"MAX_CONCURRENT_BUILDS is {max_builds}, using {workers} worker(s)", flush=True)
+    print(f"Building {len(requests)} demo(s) with {workers} worker(s)...", flush=True)
+
+    failures = 0
+    with open(args.output, "w", encoding="utf-8") as output, ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        futures = [executor.submit(build_demo, request, args.quiet) for request in requests]
+        for future in as_completed(futures):
+            result = future.result()
+            failures += result["status"] != "succeeded"
+            output.write(json.dumps(result) + "\n")
+            # Results of a long run survive an interruption
+            output.flush()
+            totals = result["totals"]
+            print(
+                f"[{result['id']}] {result['status']} in {result['seconds']:.0f}s, "
+                f"{totals.get('prompt_tokens', 0) + totals.get('completion_tokens', 0)} tokens, "
+                f"${totals.get('cost_usd', 0):.2f}",
+                flush=True,
+            )
+
+    print(f"{len(requests) - failures} of {len(requests)} demo(s) built, results in {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
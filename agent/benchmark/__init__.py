@@ -0,0 +1,7 @@
+"""Offline benchmark of the build graph, see `python -m benchmark --help`.
+
+The fake chat model (fake_llm.py) and Snowpark session (fake_snowflake.py)
+replace OpenAI and the Snowflake account, and scenarios.py defines demos of
+increasing size, so the generation and upload paths can be timed on a
+laptop without network access.
+"""
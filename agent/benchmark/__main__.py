@@ -0,0 +1,262 @@
+"""Run the whole graph offline and report where time and memory go.
+
+    cd agent
+    python -m benchmark --scenario small medium --output benchmark.json
+    python -m benchmark --baseline benchmark.json   # exits 1 on regressions
+    python -m benchmark --comparison schema-inference demo-data dataset-format
+
+Every scenario builds a demo end to end: the fake chat model answers the
+prompts, the dataset script really runs in the sandbox, and the data is
+loaded into the fake Snowflake session, through COPY INTO or write_pandas
+(--upload-mode). Per node the report shows wall time, peak process memory
+while it ran and the counters of utils/run_stats.py; end to end it shows
+the total time, the process peak and the dataset script's own peak.
+--comparison runs the before / after timings of comparisons.py instead.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Nodes faster than this in the baseline are too noisy to compare
+MIN_COMPARED_SECONDS = 0.5
+
+
+def _current_rss_mb():
+    """Resident memory of this process, the peak so far where that's all there is."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (peak if sys.platform == "darwin" else peak * 1024) / 1024 / 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples the process RSS every `interval` seconds while a build runs."""
+
+    def __init__(self, interval=0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter(), _current_rss_mb()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def peak(self, start=None, end=None):
+        window = [
+            rss
+            for at, rss in self.samples
+            if (start is None or at >= start) and (end is None or at <= end)
+        ]
+        if not window:
+            # Faster than the sampling interval, use the last sample before it ended
+            window = [rss for at, rss in self.samples if end is None or at <= end][-1:]
+        return round(max(window, default=0.0), 1)
+
+
+def _configure_environment(root, args):
+    # Before app is imported: the checkpointer and caches read these once
+    os.environ.update(
+        CHECKPOINTER="memory",
+        LLM_CACHE="none",
+        STREAM_LLM_PROGRESS="false",
+        ARTIFACT_DIR=os.path.join(root, "artifacts"),
+        WORKSPACE_ROOT=os.path.join(root, "workspaces"),
+        RUN_SUMMARY_DIR=os.path.join(root, "run_summaries"),
+        WORKSPACE_CLEANUP="always",
+        SNOWFLAKE_UPLOAD_MODE=args.upload_mode,
+    )
+    if args.dataset_format:
+        os.environ["DATASET_FORMAT"] = args.dataset_format
+
+
+def run_scenario(name, scenario, args):
+    import batch
+    from benchmark.fake_llm import FakeChatModel
+    from benchmark.fake_snowflake import FakeSession
+    from benchmark.scenarios import SCHEMA, scenario_responses
+    from utils.dataset_format import dataset_format
+    from utils.llm import set_llm_factory
+    from utils.snowflake_pool import set_session_factory
+
+    session = FakeSession(
+        schema=SCHEMA,
+        statement_latency=args.snowflake_latency,
+        upload_mb_per_second=args.upload_mb_per_second,
+    )
+    responses = scenario_responses(scenario, dataset_format(), session.database)
+    set_llm_factory(
+        lambda model_name, **kwargs: FakeChatModel(
+            model_name=model_name,
+            responses=responses,
+            text_chars=scenario["document_chars"],
+            latency=args.llm_latency,
+        )
+    )
+    # Every pooled session, the upload workers' too, is the same fake one
+    set_session_factory(lambda: session)
+
+    node_events = []
+
+    def on_event(event):
+        if isinstance(event, dict) and event.get("type") == "node_stats":
+            node_events.append((time.perf_counter(), event))
+
+    gc.collect()
+    sampler = MemorySampler()
+    sampler.start()
+    try:
+        result = batch.build_demo({"id": name, "prompt": f"A {name} benchmark demo"}, True, on_event)
+    finally:
+        sampler.stop()
+        set_llm_factory(None)
+
+    nodes = result["nodes"]
+    for node in nodes.values():
+        node["peak_rss_mb"] = 0.0
+    for ended, event in node_events:
+        node = nodes[event["node"]]
+        node["peak_rss_mb"] = max(
+            node["peak_rss_mb"], sampler.peak(ended - event["seconds"], ended)
+        )
+    return {
+        "status": result["status"],
+        "error": result.get("error"),
+        "seconds": result["seconds"],
+        "peak_rss_mb": sampler.peak(),
+        "script_peak_rss_mb": (result.get("script_run_stats") or {}).get("peak_rss_mb"),
+        "snowflake_statements": len(session.statements),
+        "nodes": nodes,
+    }
+
+
+def format_scenario(name, report):
+    lines = [
+        f"{name}: {report['status']} in {report['seconds']:.1f}s, peak {report['peak_rss_mb']:.0f} MB "
+        f"(dataset script {report['script_peak_rss_mb'] or 0:.0f} MB), "
+        f"{report['snowflake_statements']} Snowflake statements",
+    ]
+    if report["error"]:
+        lines.append(f"  {report['error']}")
+    lines.append(f"  {'node':<28}{'seconds':>9}{'peak MB':>9}{'LLM':>5}{'tokens':>9}{'SQL':>5}{'MB up':>8}")
+    for node_name, node in sorted(
+        report["nodes"].items(), key=lambda item: item[1]["seconds"], reverse=True
+    ):
+        lines.append(
+            f"  {node_name:<28}{node['seconds']:>9.2f}{node['peak_rss_mb']:>9.0f}"
+            f"{node['llm_calls']:>5}{node['prompt_tokens'] + node['completion_tokens']:>9}"
+            f"{node['snowflake_statements']:>5}{node['bytes_uploaded'] / 1024 / 1024:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(report, baseline, tolerance):
+    """Regressions of `report` against `baseline`, as readable lines."""
+    regressions = []
+
+    def check(label, new, old, minimum=0.0):
+        if old and old >= minimum and new > old * (1 + tolerance):
+            regressions.append(f"{label}: {old:.2f} -> {new:.2f} (+{(new / old - 1):.0%})")
+
+    for name, scenario in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        check(f"{name} seconds", scenario["seconds"], old["seconds"], MIN_COMPARED_SECONDS)
+        check(f"{name} peak MB", scenario["peak_rss_mb"], old["peak_rss_mb"])
+        for node_name, node in scenario["nodes"].items():
+            old_node = old["nodes"].get(node_name)
+            if old_node:
+                check(
+                    f"{name} {node_name} seconds",
+                    node["seconds"],
+                    old_node["seconds"],
+                    MIN_COMPARED_SECONDS,
+                )
+    return regressions
+
+
+def main(argv=None):
+    from benchmark.comparisons import COMPARISONS, format_comparison, missed_targets, run_comparison
+    from benchmark.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Offline benchmark of the demo build graph.")
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS))
+    parser.add_argument("--comparison", nargs="+", choices=sorted(COMPARISONS), default=[])
+    parser.add_argument("--comparison-rows", type=int, help="Rows of the comparisons' data")
+    parser.add_argument("--upload-mode", choices=["bulk", "pandas"], default="bulk")
+    parser.add_argument("--dataset-format", choices=["parquet", "csv"])
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario, the fastest is kept")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per LLM call")
+    parser.add_argument("--snowflake-latency", type=float, default=0.0, help="Seconds per statement")
+    parser.add_argument("--upload-mb-per-second", type=float, help="Simulated upload bandwidth")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args(argv)
+    if args.scenario is None:
+        args.scenario = [] if args.comparison else ["small"]
+
+    root = tempfile.mkdtemp(prefix="demo-benchmark-")
+    _configure_environment(root, args)
+    from utils.dataset_format import dataset_format
+
+    report = {
+        "settings": {
+            "upload_mode": args.upload_mode,
+            "dataset_format": dataset_format(),
+            "llm_latency": args.llm_latency,
+            "snowflake_latency": args.snowflake_latency,
+            "python": sys.version.split()[0],
+        },
+        "scenarios": {},
+        "comparisons": {},
+    }
+    for name in args.scenario:
+        runs = [run_scenario(name, SCENARIOS[name], args) for _ in range(args.repeat)]
+        report["scenarios"][name] = min(runs, key=lambda run: run["seconds"])
+        print(format_scenario(name, report["scenarios"][name]), flush=True)
+    for name in args.comparison:
+        report["comparisons"][name] = run_comparison(name, root, args)
+        print(format_comparison(name, report["comparisons"][name]), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = [name for name, run in report["scenarios"].items() if run["status"] != "succeeded"]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        print("Regressions:\n" + "\n".join(f"  {line}" for line in regressions) if regressions else "No regressions")
+    missed = missed_targets(report["comparisons"])
+    if missed:
+        print("Below target:\n" + "\n".join(f"  {line}" for line in missed))
+    return 1 if failed or regressions or missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
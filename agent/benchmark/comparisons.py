@@ -0,0 +1,226 @@
+"""Before / after timings of single build steps, on the same data.
+
+    cd agent
+    python -m benchmark --comparison schema-inference demo-data dataset-format
+
+Unlike the scenarios these don't run the graph: each comparison times one
+step the way it used to be done and the way it is done now, and reports
+both. A comparison with a `minimum_speedup` fails the run when the new way
+is not that much faster.
+"""
+
+import functools
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Simulated upload bandwidth of the dataset-format comparison, in MB/s
+DEFAULT_MB_PER_SECOND = 10.0
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _regex_schema(df):
+    """Column types as upload_to_snowflake inferred them before utils/schema_inference.py."""
+    date_cols = set()
+    for col_name in df.columns:
+        series_str = df[col_name].astype(str)
+        mask = series_str.str.match(r"^\d{4}-\d{2}-\d{2}$")
+        if mask.sum() >= len(df) * 0.8:
+            df[col_name] = pd.to_datetime(df[col_name], format="%Y-%m-%d", errors="coerce").dt.date
+            date_cols.add(col_name)
+
+    col_defs = {}
+    for col_name in df.columns:
+        if col_name in date_cols:
+            col_defs[col_name] = "DATE"
+        elif pd.api.types.is_integer_dtype(df[col_name]):
+            col_defs[col_name] = "NUMBER"
+        elif pd.api.types.is_float_dtype(df[col_name]):
+            col_defs[col_name] = "FLOAT"
+        else:
+            col_defs[col_name] = f"VARCHAR({df[col_name].astype(str).map(len).max() or 1})"
+    return col_defs
+
+
+def _vectorized_schema(df, sample_fraction):
+    from utils.schema_inference import apply_schema, infer_schema
+
+    return apply_schema(df, infer_schema(df, sample_fraction=sample_fraction))
+
+
+def compare_schema_inference(root, args, rows=2_000_000):
+    """Typing a large CSV: the per-value regex against infer_schema + apply_schema."""
+    rng = np.random.default_rng(0)
+    path = os.path.join(root, "SCHEMA_INFERENCE.csv")
+    pd.DataFrame(
+        {
+            "ORDER_ID": np.arange(1, rows + 1),
+            "AMOUNT": np.round(rng.lognormal(4, 0.5, rows), 2),
+            "ORDER_DATE": (
+                pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+            ).strftime("%Y-%m-%d"),
+            "CATEGORY": rng.choice(["North", "South", "East", "West"], rows),
+            "NOTE": rng.choice(["standard", "gift", "express delivery", "returned"], rows),
+        }
+    ).to_csv(path, index=False)
+    df = pd.read_csv(path)
+
+    return {
+        "rows": rows,
+        "seconds": {
+            "regex": _timed(_regex_schema, df.copy()),
+            "vectorized": _timed(_vectorized_schema, df.copy(), 1.0),
+            "vectorized, 1% sample": _timed(_vectorized_schema, df.copy(), 0.01),
+        },
+        "baseline": "regex",
+        "candidate": "vectorized",
+    }
+
+
+def _per_row_orders(rows):
+    """An orders table built the way generated scripts did before script_lib/demo_data.py."""
+    from faker import Faker
+
+    faker = Faker()
+    start = date(2023, 1, 1)
+    records = []
+    for order_id in range(1, rows + 1):
+        records.append(
+            {
+                "ORDER_ID": order_id,
+                "CUSTOMER_ID": random.randint(1, rows // 10 + 1),
+                "ORDER_DATE": start + timedelta(days=random.randint(0, 729)),
+                "AMOUNT": round(random.lognormvariate(4, 0.5), 2),
+                "STATUS": random.choices(["shipped", "pending", "returned"], [8, 1, 1])[0],
+                "CUSTOMER_NAME": faker.name(),
+                "CITY": faker.city(),
+            }
+        )
+    return pd.DataFrame(records)
+
+
+def _vectorized_orders(rows):
+    import script_lib.demo_data as dd
+
+    return pd.DataFrame(
+        {
+            "ORDER_ID": dd.ids(rows),
+            "CUSTOMER_ID": dd.foreign_keys(dd.ids(rows // 10 + 1), rows),
+            "ORDER_DATE": dd.dates(rows, "2023-01-01", "2024-12-30"),
+            "AMOUNT": dd.amounts(rows, mean=60.0),
+            "STATUS": dd.categorical(rows, ["shipped", "pending", "returned"], [8, 1, 1]),
+            "CUSTOMER_NAME": dd.full_names(rows),
+            "CITY": dd.cities(rows),
+        }
+    )
+
+
+def compare_demo_data(root, args, rows=1_000_000):
+    """A fact table: a per-row Faker loop against the vectorized demo_data helpers.
+
+    The loop takes minutes for a million rows, so it runs on 1/50 of them
+    and its time is scaled up.
+    """
+    sample_rows = max(rows // 50, 1)
+    return {
+        "rows": rows,
+        "seconds": {
+            "per-row": _timed(_per_row_orders, sample_rows) * rows / sample_rows,
+            "vectorized": _timed(_vectorized_orders, rows),
+        },
+        "baseline": "per-row",
+        "candidate": "vectorized",
+        "minimum_speedup": 10,
+        "notes": [f"per-row timed on {sample_rows} rows and scaled to {rows}"],
+    }
+
+
+def _upload(directory, file_name, args):
+    from benchmark.fake_snowflake import FakeSession
+    from nodes.upload_to_snowflake import load_files
+    from utils.snowflake_pool import set_session_factory
+
+    session = FakeSession(upload_mb_per_second=args.upload_mb_per_second or DEFAULT_MB_PER_SECOND)
+    set_session_factory(lambda: session)
+    rows_loaded, _, _, errors = load_files(session, directory, [file_name], lambda message: None, "BENCHMARK_STAGE")
+    if errors:
+        raise RuntimeError(f"Uploading {file_name} failed: {errors}")
+    return rows_loaded
+
+
+def compare_dataset_format(root, args, rows=1_000_000):
+    """Writing a table as CSV or Parquet and uploading it to a fake Snowflake.
+
+    Uploads go through load_files in the --upload-mode, at
+    --upload-mb-per-second (DEFAULT_MB_PER_SECOND if not given).
+    """
+    df = _vectorized_orders(rows)
+    seconds = {}
+    notes = []
+    for file_format in ("csv", "parquet"):
+        directory = os.path.join(root, f"dataset-format-{file_format}")
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"ORDERS.{file_format}"
+        path = os.path.join(directory, file_name)
+        write = functools.partial(getattr(df, f"to_{file_format}"), index=False)
+        write_seconds = _timed(write, path)
+        upload_seconds = _timed(_upload, directory, file_name, args)
+        seconds[file_format] = write_seconds + upload_seconds
+        notes.append(
+            f"{file_format}: {os.path.getsize(path) / 1024 / 1024:.1f} MB, "
+            f"written in {write_seconds:.2f}s, uploaded in {upload_seconds:.2f}s"
+        )
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "baseline": "csv",
+        "candidate": "parquet",
+        "notes": notes,
+    }
+
+
+COMPARISONS = {
+    "schema-inference": compare_schema_inference,
+    "demo-data": compare_demo_data,
+    "dataset-format": compare_dataset_format,
+}
+
+
+def run_comparison(name, root, args):
+    """Run comparison `name` (with --comparison-rows rows, if given) and add its speed-up."""
+    if args.comparison_rows:
+        result = COMPARISONS[name](root, args, rows=args.comparison_rows)
+    else:
+        result = COMPARISONS[name](root, args)
+    seconds = result["seconds"]
+    result["speedup"] = round(seconds[result["baseline"]] / max(seconds[result["candidate"]], 1e-9), 1)
+    return result
+
+
+def format_comparison(name, result):
+    lines = [
+        f"{name}: {result['candidate']} is {result['speedup']:.1f}x faster than "
+        f"{result['baseline']} on {result['rows']} rows"
+    ]
+    for label, seconds in result["seconds"].items():
+        lines.append(f"  {label:<28}{seconds:>9.2f}s")
+    lines.extend(f"  ({note})" for note in result.get("notes", []))
+    return "\n".join(lines)
+
+
+def missed_targets(comparisons):
+    """Comparisons slower than their `minimum_speedup`, as readable lines."""
+    return [
+        f"{name}: {result['speedup']:.1f}x, at least {result['minimum_speedup']:.0f}x expected"
+        for name, result in comparisons.items()
+        if result["speedup"] < result.get("minimum_speedup", 0)
+    ]
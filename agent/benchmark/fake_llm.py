@@ -0,0 +1,75 @@
+"""Chat model that answers from a benchmark scenario instead of the API."""
+
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from utils.run_stats import record_llm_call
+
+# The API's tokenizer averages about 4 characters per token of English text
+CHARS_PER_TOKEN = 4
+FILLER_WORDS = (
+    "revenue region quarter customer growth forecast pipeline margin churn "
+    "inventory shipment policy contract renewal support ticket escalation"
+).split()
+
+
+def _tokens(text):
+    return max(len(text) // CHARS_PER_TOKEN, 1)
+
+
+def filler_text(chars):
+    words = []
+    length = 0
+    while length < chars:
+        word = FILLER_WORDS[len(words) % len(FILLER_WORDS)]
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers with the canned fields of a scenario, without any network calls.
+
+    Structured output requests get an instance of the requested schema built
+    from `responses` (one value per field name), plain text requests get
+    `text_chars` characters of filler. Every call sleeps `latency` seconds and
+    records estimated token usage, like `LimitedChatOpenAI` does.
+    """
+
+    model_name: str
+    responses: dict
+    text_chars: int = 2000
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "benchmark-fake"
+
+    def _record(self, prompt_text, output_text):
+        if self.latency:
+            time.sleep(self.latency)
+        record_llm_call(self.model_name, _tokens(prompt_text), _tokens(output_text))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = filler_text(self.text_chars)
+        self._record("\n".join(str(message.content) for message in messages), text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def with_structured_output(self, schema, **kwargs):
+        missing = [name for name in schema.model_fields if name not in self.responses]
+        if missing:
+            raise KeyError(f"The scenario has no response for {schema.__name__}.{missing}")
+
+        def respond(prompt_value):
+            output = schema(**{name: self.responses[name] for name in schema.model_fields})
+            prompt_text = (
+                prompt_value.to_string() if hasattr(prompt_value, "to_string") else str(prompt_value)
+            )
+            self._record(prompt_text, output.model_dump_json())
+            return output
+
+        return RunnableLambda(respond, name=f"Fake{schema.__name__}")
@@ -0,0 +1,198 @@
+"""Local stand-in for the Snowpark `Session` methods the nodes use.
+
+Tables are kept as pandas DataFrames. Staged files are remembered by name and
+loaded when a `COPY INTO` refers to them (a file pandas can't read fails its
+table, as the exception handlers of the load block would), the row count,
+column type and profiling queries are answered from the DataFrames, and every
+other statement (DDL, Cortex Search, agents) is recorded and acknowledged. Optional latencies
+stand in for the round trips and upload bandwidth of a real account.
+"""
+
+import glob
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import date
+
+import pandas as pd
+
+from utils.table_profile import SAMPLE_ROWS, SAMPLE_SIZE
+
+StructField = namedtuple("StructField", ["name", "datatype"])
+
+COPY_PATTERN = re.compile(r"COPY INTO (\w+)\s+FROM @(\w+)\s+FILES = \('([^']+)'\)")
+ROW_COUNT_PATTERN = re.compile(r"SELECT '(\w+)' AS TABLE_NAME, COUNT\(\*\) AS ROW_COUNT FROM (\w+)")
+CREATE_TABLE_PATTERN = re.compile(r"^\s*CREATE (?:OR REPLACE )?TABLE (\w+) \(", re.IGNORECASE)
+DROP_TABLE_PATTERN = re.compile(r"^\s*DROP TABLE (?:IF EXISTS )?(\w+)", re.IGNORECASE)
+
+
+def _data_type(series):
+    if pd.api.types.is_bool_dtype(series):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(series):
+        return "NUMBER"
+    if pd.api.types.is_float_dtype(series):
+        return "FLOAT"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP_NTZ"
+    non_null = series.dropna()
+    if len(non_null) and isinstance(non_null.iloc[0], date):
+        return "DATE"
+    return "TEXT"
+
+
+class FakeDataFrame:
+    def __init__(self, session, query):
+        self._session = session
+        self._query = query
+
+    def collect(self):
+        return self._session._execute(self._query)
+
+    def to_pandas(self):
+        return pd.DataFrame(self.collect())
+
+
+class FakeFileOperation:
+    def __init__(self, session):
+        self._session = session
+
+    def put(self, local_file_name, stage_location, auto_compress=True, overwrite=False, **kwargs):
+        stage = stage_location.lstrip("@").split("/")[0]
+        staged = self._session.stages.setdefault(stage, {})
+        paths = glob.glob(local_file_name)
+        for path in paths:
+            name = os.path.basename(path)
+            staged[f"{name}.gz" if auto_compress else name] = path
+        self._session._wait(sum(os.path.getsize(path) for path in paths))
+        return []
+
+
+class FakeTable:
+    def __init__(self, df):
+        self._df = df
+
+    @property
+    def schema(self):
+        return [StructField(column, _data_type(self._df[column])) for column in self._df.columns]
+
+    def count(self):
+        return len(self._df)
+
+
+class FakeSession:
+    """Answers the statements of one build from local DataFrames.
+
+    `statement_latency` seconds are added to every statement and file
+    transfers are slowed to `upload_mb_per_second`, both off by default.
+    """
+
+    def __init__(self, database="BENCHMARK_DB", schema="DEMO", statement_latency=0.0, upload_mb_per_second=None):
+        self.database = database
+        self.schema = schema
+        self.statement_latency = statement_latency
+        self.upload_mb_per_second = upload_mb_per_second
+        self.tables = {}
+        self.stages = {}
+        self.statements = []
+        self.file = FakeFileOperation(self)
+
+    def _wait(self, bytes_uploaded=0):
+        seconds = self.statement_latency
+        if self.upload_mb_per_second:
+            seconds += bytes_uploaded / 1024 / 1024 / self.upload_mb_per_second
+        if seconds:
+            time.sleep(seconds)
+
+    def sql(self, query):
+        return FakeDataFrame(self, query)
+
+    def _execute(self, query):
+        self.statements.append(query)
+        self._wait()
+
+        if "INFORMATION_SCHEMA.COLUMNS" in query:
+            names = re.findall(r"'(\w+)'", query.split("TABLE_NAME IN", 1)[1])
+            return [
+                {"TABLE_NAME": name, "COLUMN_NAME": column, "DATA_TYPE": _data_type(df[column])}
+                for name in names
+                for df in [self.tables[name]]
+                for column in df.columns
+            ]
+        if "WITH STATS AS" in query:
+            return [self._profile(re.search(r"FROM (\w+)", query).group(1))]
+        if ROW_COUNT_PATTERN.search(query):
+            return [
+                {"TABLE_NAME": label, "ROW_COUNT": len(self.tables.get(table, ()))}
+                for label, table in ROW_COUNT_PATTERN.findall(query)
+            ]
+
+        errors = {}
+        for table, stage, file_name in COPY_PATTERN.findall(query):
+            path = self.stages[stage][file_name]
+            try:
+                df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+            except Exception as e:
+                # Caught by the table's exception handler in the load block
+                errors[table] = str(e)
+                continue
+            df.columns = [column.upper() for column in df.columns]
+            self.tables[table] = df
+        if query.startswith("EXECUTE IMMEDIATE"):
+            return [(json.dumps({"errors": errors, "failed": list(errors)}),)]
+        match = CREATE_TABLE_PATTERN.match(query)
+        if match:
+            self.tables[match.group(1)] = pd.DataFrame()
+        match = DROP_TABLE_PATTERN.match(query)
+        if match:
+            self.tables.pop(match.group(1), None)
+        return []
+
+    def _profile(self, table_name):
+        df = self.tables[table_name]
+        row = {"ROW_COUNT": len(df)}
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            non_null = series.dropna()
+            row[f"DISTINCT_{i}"] = int(non_null.nunique())
+            row[f"NULLS_{i}"] = int(series.isna().sum())
+            if _data_type(series) == "BOOLEAN" or not len(non_null):
+                row[f"MIN_{i}"] = row[f"MAX_{i}"] = None
+            else:
+                row[f"MIN_{i}"], row[f"MAX_{i}"] = non_null.min(), non_null.max()
+            samples = series.head(SAMPLE_ROWS).dropna().drop_duplicates().head(SAMPLE_SIZE)
+            # ARRAY columns come back as JSON text
+            row[f"SAMPLES_{i}"] = json.dumps(samples.tolist(), default=str)
+        return row
+
+    def write_pandas(self, df, table_name, auto_create_table=False, overwrite=False, **kwargs):
+        existing = self.tables.get(table_name)
+        if overwrite or existing is None or existing.empty:
+            self.tables[table_name] = df.copy()
+        else:
+            self.tables[table_name] = pd.concat([existing, df], ignore_index=True)
+        self.statements.append(f"write_pandas {table_name}")
+        self._wait(int(df.memory_usage(deep=True).sum()))
+
+    def table(self, table_name):
+        return FakeTable(self.tables[table_name.upper()])
+
+    def get_current_database(self):
+        return f'"{self.database}"'
+
+    def get_current_schema(self):
+        return f'"{self.schema}"'
+
+    def get_current_warehouse(self):
+        return '"BENCHMARK_WH"'
+
+    def use_schema(self, schema):
+        # A qualified name sets the database too
+        *database, self.schema = [part.strip('"') for part in schema.split(".")]
+        if database:
+            self.database = database[0]
+
+    def close(self):
+        pass
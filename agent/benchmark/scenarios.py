@@ -0,0 +1,170 @@
+"""Benchmark scenarios and the canned LLM responses that drive them.
+
+A scenario fixes the shape of the generated demo: how many tables, how many
+rows the fact tables have, how wide they are and how many documents are
+written. `scenario_responses` turns it into the field values the fake chat
+model answers with, including a real dataset script (built on demo_data) and
+a semantic model that matches the tables the script writes.
+"""
+
+import yaml
+
+# The first table is a dimension (CUSTOMERS) with a tenth of the fact rows
+SCENARIOS = {
+    "small": {"tables": 3, "rows": 10_000, "columns": 8, "documents": 5, "document_chars": 2_000},
+    "medium": {"tables": 5, "rows": 200_000, "columns": 12, "documents": 10, "document_chars": 4_000},
+    "large": {"tables": 6, "rows": 1_000_000, "columns": 16, "documents": 20, "document_chars": 8_000},
+}
+FACT_TABLES = ["ORDERS", "SHIPMENTS", "PAYMENTS", "TICKETS", "VISITS", "RETURNS", "INVOICES", "REVIEWS"]
+SCHEMA = "BENCHMARK_DEMO"
+# Columns every fact table has before the METRIC_n padding
+FACT_COLUMNS = ["CUSTOMER_ID", "CATEGORY", "AMOUNT", "QUANTITY", "EVENT_DATE", "CREATED_AT"]
+
+
+def table_names(scenario):
+    return ["CUSTOMERS"] + FACT_TABLES[: scenario["tables"] - 1]
+
+
+def _metric_columns(scenario):
+    return [f"METRIC_{i}" for i in range(1, max(scenario["columns"] - len(FACT_COLUMNS) - 1, 0) + 1)]
+
+
+def dataset_script(scenario, data_format):
+    """A vectorized dataset script for the scenario, like a good generated one."""
+    customers = max(scenario["rows"] // 10, 100)
+    extension = "parquet" if data_format == "parquet" else "csv"
+    writer = "to_parquet" if data_format == "parquet" else "to_csv"
+    lines = [
+        "import os",
+        "",
+        "import pandas as pd",
+        "",
+        "import demo_data as dd",
+        "",
+        "dd.seed(7)",
+        'os.makedirs("generated_csvs", exist_ok=True)',
+        "",
+        f"customer_ids = dd.ids({customers})",
+        "first_names = dd.first_names(len(customer_ids))",
+        "last_names = dd.last_names(len(customer_ids))",
+        "customers = pd.DataFrame({",
+        '    "CUSTOMER_ID": customer_ids,',
+        '    "FIRST_NAME": first_names,',
+        '    "LAST_NAME": last_names,',
+        '    "EMAIL": dd.emails(first_names, last_names),',
+        '    "CITY": dd.cities(len(customer_ids)),',
+        '    "SEGMENT": dd.categorical(len(customer_ids), ["Enterprise", "Mid-Market", "SMB"], [0.2, 0.3, 0.5]),',
+        '    "SIGNUP_DATE": dd.dates(len(customer_ids), "2021-01-01", "2024-12-31").date,',
+        "})",
+        f'customers.{writer}("generated_csvs/CUSTOMERS.{extension}", index=False)',
+    ]
+    for table in table_names(scenario)[1:]:
+        lines += [
+            "",
+            f"rows = {scenario['rows']}",
+            f"{table.lower()} = pd.DataFrame({{",
+            f'    "{table[:-1]}_ID": dd.ids(rows),',
+            '    "CUSTOMER_ID": dd.foreign_keys(customer_ids, rows, skew=1.1),',
+            '    "CATEGORY": dd.categorical(rows, ["North", "South", "East", "West"], [0.4, 0.2, 0.2, 0.2]),',
+            '    "AMOUNT": dd.amounts(rows, mean=120.0),',
+            '    "QUANTITY": dd.integers(rows, 1, 20),',
+            '    "EVENT_DATE": dd.dates(rows, "2023-01-01", "2024-12-31", trend=0.5).date,',
+            '    "CREATED_AT": dd.timestamps(rows, "2023-01-01", "2024-12-31"),',
+        ]
+        lines += [
+            f'    "{column}": dd.normal(rows, 100.0, 15.0),' for column in _metric_columns(scenario)
+        ]
+        lines += [
+            "})",
+            f'{table.lower()}.{writer}("generated_csvs/{table}.{extension}", index=False)',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def semantic_model(scenario, database):
+    """A semantic model over the scenario's tables that passes the local validator."""
+    tables = [
+        {
+            "name": "customers",
+            "description": "Customers and their segment.",
+            "base_table": {"database": database, "schema": SCHEMA, "table": "CUSTOMERS"},
+            "primary_key": {"columns": ["customer_id"]},
+            "dimensions": [
+                {"name": "customer_id", "expr": "CUSTOMER_ID", "data_type": "NUMBER"},
+                {"name": "city", "expr": "CITY", "data_type": "VARCHAR"},
+                {"name": "segment", "expr": "SEGMENT", "data_type": "VARCHAR"},
+            ],
+            "time_dimensions": [
+                {"name": "signup_date", "expr": "SIGNUP_DATE", "data_type": "DATE"},
+            ],
+        }
+    ]
+    relationships = []
+    for table in table_names(scenario)[1:]:
+        name = table.lower()
+        tables.append(
+            {
+                "name": name,
+                "description": f"One row per {name[:-1]}.",
+                "base_table": {"database": database, "schema": SCHEMA, "table": table},
+                "primary_key": {"columns": [f"{name[:-1]}_id"]},
+                "dimensions": [
+                    {"name": f"{name[:-1]}_id", "expr": f"{table[:-1]}_ID", "data_type": "NUMBER"},
+                    {"name": "customer_id", "expr": "CUSTOMER_ID", "data_type": "NUMBER"},
+                    {"name": "category", "expr": "CATEGORY", "data_type": "VARCHAR"},
+                ],
+                "time_dimensions": [
+                    {"name": "event_date", "expr": "EVENT_DATE", "data_type": "DATE"},
+                ],
+                "facts": [
+                    {"name": "amount", "expr": "AMOUNT", "data_type": "NUMBER"},
+                    {"name": "quantity", "expr": "QUANTITY", "data_type": "NUMBER"},
+                ],
+            }
+        )
+        relationships.append(
+            {
+                "name": f"{name}_to_customers",
+                "left_table": name,
+                "right_table": "customers",
+                "relationship_columns": [
+                    {"left_column": "customer_id", "right_column": "customer_id"}
+                ],
+                "join_type": "left_outer",
+                "relationship_type": "many_to_one",
+            }
+        )
+    model = {
+        "name": "benchmark_demo",
+        "description": "Customers and their activity, generated by the benchmark.",
+        "tables": tables,
+        "relationships": relationships,
+    }
+    return yaml.safe_dump(model, sort_keys=False)
+
+
+def scenario_responses(scenario, data_format, database):
+    """Field values for every structured output schema the nodes request."""
+    questions = {
+        f"question_{i}": f"(SQL) What is the total amount by category for quarter {i}?"
+        for i in range(1, 6)
+    }
+    return {
+        "demo_description": "A benchmark demo about customers and their orders.",
+        **questions,
+        "approved": True,
+        "script": dataset_script(scenario, data_format),
+        "schema": SCHEMA,
+        "agent_name": "Benchmark Agent",
+        "semantic_model_yaml": semantic_model(scenario, database),
+        "documents": [
+            {
+                "title": f"Policy document {i}",
+                "url": f"https://example.com/documents/{i}",
+                "generation_description": "A policy document about customer support.",
+            }
+            for i in range(1, scenario["documents"] + 1)
+        ],
+        "agent_description_markdown": "Answers questions about customers and their orders.",
+        **{f"sample_q_{i}": questions[f"question_{i}"] for i in range(1, 6)},
+    }
@@ -0,0 +1,31 @@
+from langgraph.types import interrupt
+
+STOP_ANSWERS = {"stop", "cancel", "abort"}
+
+
+def ask_script_guidance(context, writer):
+    writer("Asking for help with the dataset script...")
+
+    attempts = context.get("script_attempts") or []
+    guidance = interrupt(
+        {
+            "task": "Help fix the dataset generation script.",
+            "message": (
+                f"The synthetic data script still fails after {len(attempts)} attempt(s). "
+                "Describe how it should be fixed, or reply 'stop' to cancel the build.\n\n"
+                f"```\n{context.get('stack_trace', '')}\n```"
+            ),
+            "stack_trace": context.get("stack_trace", ""),
+        }
+    )
+
+    if guidance.strip().lower() in STOP_ANSWERS:
+        raise RuntimeError(
+            f"Build cancelled after {len(attempts)} failed dataset script attempt(s)"
+        )
+
+    return {
+        "script_guidance": guidance,
+        # A fresh budget for the attempts following the user's guidance
+        "script_budget_start": len(attempts),
+    }
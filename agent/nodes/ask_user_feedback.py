@@ -1,5 +1,7 @@
 from langgraph.types import interrupt
 
+from utils.artifacts import load_artifact
+
 
 def ask_user_feedback(context, writer):
     writer("Asking for user feedback...")
@@ -7,9 +9,8 @@ def ask_user_feedback(context, writer):
     human_feedback = interrupt(
         {
             "task": "Review the generated demo and questions.",
-            "generated_idea": context["generated_idea"],
+            "generated_idea": load_artifact(context["generated_idea_ref"]),
         }
     )
 
-    context["human_feedback"] = human_feedback
-    return context
+    return {"human_feedback": human_feedback}
@@ -1,8 +1,13 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from datetime import datetime
 
+from utils.artifacts import load_artifact, save_artifact
+from utils.dataset_format import output_instructions
+from utils.llm import get_llm
+from utils.script_library import script_library_reference
+from utils.workspace import SCRIPT_FILE, workspace_path
+
 
 def check_dataset_script(context, writer):
     writer("Checking the synthetic generation script...")
@@ -22,6 +27,7 @@ def check_dataset_script(context, writer):
         We are creating a demo for Snowflake and AI. The following instructions were given to an LLM to generate a Python script
         to create synthetic data to support the demo. Can you check the script and return the script either exactly as-is, or with
         any adjustments or modifications to improve it.
+        If the script builds rows in Python loops or calls `faker` per row, rewrite those parts with the `demo_data` library described below.
 
         DO NOT include any content besides what would be in a python script file.
 
@@ -41,9 +47,16 @@ def check_dataset_script(context, writer):
 
         You can assume the python environment that will execute this has `pandas`, `numpy`, `random`, and `faker` available. Ensure the generated script can be copied into a .py file and would run, so include all needed import statements.
 
-        Write the script so that it writes the synthetic data to a CSV file, with the format TABLENAME.csv in the current directory. So for example, if the table should be called CUSTOMERS it writes CUSTOMERS.csv with the generated data.
+        The environment also provides `demo_data`, a library of NumPy vectorized generators. Use it (`import demo_data as dd`) to build every table column by column,
+        DO NOT build rows in Python loops or call `faker` once per field or row, that takes minutes for large tables. Use `dd.foreign_keys` for every ID column that
+        references another table so every join key exists in the parent table, and the seasonality options of `dd.dates` / `dd.time_series` to make trends visible.
+
+        ### demo_data library ###
+        {script_library}
+
+        {output_instructions}
 
-        Save all CSVs into the folder `generated_csvs` in the current directory.
+        Save all files into the folder `generated_csvs` in the current directory.
 
         Joins are supported, but make sure your script generates valid IDs so after I load the synthetic data into snowflake the SQL queries would actually work.
 
@@ -81,7 +94,7 @@ def check_dataset_script(context, writer):
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
     structured_llm_generator = llm.with_structured_output(DemoScript)
 
     chain = prompt | structured_llm_generator
@@ -95,11 +108,12 @@ def check_dataset_script(context, writer):
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
             "current_date": current_date,
-            "script": context.get("script", ""),
+            "script_library": script_library_reference(),
+            "output_instructions": output_instructions(),
+            "script": load_artifact(context.get("script_ref")),
         }
     )
 
-    with open("generated_script.py", "w") as f:
+    with open(workspace_path(SCRIPT_FILE), "w") as f:
         f.write(response.script)
-    context.update(response.dict())
-    return context
+    return {"script_ref": save_artifact(response.script)}
@@ -1,12 +1,54 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from datetime import datetime
+import os
+
+from utils.artifacts import load_artifact, load_json_artifact, save_artifact
+from utils.llm import get_llm
+from utils.semantic_model_docs import get_semantic_model_documentation
+from utils.semantic_model_validator import validate_semantic_model
+from utils.table_profile import format_table_info
+from utils.workspace import SEMANTIC_MODEL_FILE, workspace_path
+
+
+def _strip_code_fences(yaml_content):
+    yaml_content = yaml_content.strip()
+
+    # Remove leading ```yaml or ```
+    if yaml_content.startswith("```yaml"):
+        yaml_content = yaml_content[7:]
+    elif yaml_content.startswith("```"):
+        yaml_content = yaml_content[3:]
+
+    # Remove trailing ``` and any text after it
+    if "```" in yaml_content:
+        yaml_content = yaml_content.split("```", 1)[0]
+
+    return yaml_content.strip()
 
 
 def check_semantic_model(context, writer):
     writer("Checking the semantic model...")
 
+    table_info = load_json_artifact(context["table_info_ref"])
+
+    # Validate and repair the structure locally first, the LLM is only asked to
+    # check the model when there is something the validator can't fix.
+    yaml_content, repairs, violations = validate_semantic_model(
+        _strip_code_fences(load_artifact(context.get("semantic_model_ref"))),
+        table_info,
+        context.get("schema"),
+    )
+    for repair in repairs:
+        writer(f"Repaired semantic model: {repair}")
+
+    if not violations and os.getenv("SEMANTIC_MODEL_LLM_CHECK", "on_violation") != "always":
+        with open(workspace_path(SEMANTIC_MODEL_FILE), "w") as f:
+            f.write(yaml_content)
+        return {"semantic_model_ref": save_artifact(yaml_content)}
+
+    writer(f"Asking the LLM to fix {len(violations)} semantic model issue(s)...")
+
     class DemoScript(BaseModel):
         semantic_model_yaml: str = Field(
             ...,
@@ -40,7 +82,7 @@ def check_semantic_model(context, writer):
 
         Below you will find sections for the following:
         
-        TABLE INFO - which contains the information about each table in snowflake including the full path to the table, the columns, and sample values.
+        TABLE INFO - which contains the information about each table in snowflake including the full path to the table, the row count, the columns with their types, and a profile of each column (distinct count, null ratio, value range and sample values).
         Be aware of synonyms and other hints in the semantic model that will improve accuracy of answering the specific questions listed below.
         
         DEMO DESCRIPTION AND QUESTIONS - this will contain the demo description and the questions that are intended to be answered by the semantic model. As mentioned some of the questions
@@ -75,6 +117,11 @@ def check_semantic_model(context, writer):
         {semantic_model_yaml}
         ```
 
+        ## ISSUES FOUND BY THE VALIDATOR ##
+        These MUST be fixed in the semantic model you return:
+
+        {violations}
+
         ## THINGS TO CONFIRM ##
         - If relationships exist, the left and right columns defined have identical values. If they are not identical or no left and right columns are defined, there's likely no relationship in the synthentic dataset.
         - If a relationship is defined, all tables included in a relationship have one or many `primary_key` defined in the `tables` section.
@@ -84,17 +131,16 @@ def check_semantic_model(context, writer):
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
     structured_llm_generator = llm.with_structured_output(DemoScript)
 
     chain = prompt | structured_llm_generator
 
-    with open("semantic_model_docs.txt", "r") as f:
-        semantic_model_documentation = f.read()
+    semantic_model_documentation = get_semantic_model_documentation(writer)
 
     response = chain.invoke(
         {
-            "table_info": context["table_info"],
+            "table_info": format_table_info(table_info),
             "demo_description": context.get("demo_description", ""),
             "question_1": context.get("question_1", ""),
             "question_2": context.get("question_2", ""),
@@ -102,24 +148,23 @@ def check_semantic_model(context, writer):
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
             "semantic_model_documentation": semantic_model_documentation,
-            "semantic_model_yaml": context.get("semantic_model_yaml", ""),
+            "semantic_model_yaml": yaml_content,
+            "violations": "\n".join(f"- {violation}" for violation in violations)
+            or "None found.",
         }
     )
-    yaml_content = response.semantic_model_yaml.strip()
 
-    # Remove leading ```yaml or ```
-    if yaml_content.startswith("```yaml"):
-        yaml_content = yaml_content[7:]
-    elif yaml_content.startswith("```"):
-        yaml_content = yaml_content[3:]
-
-    # Remove trailing ``` and any text after it
-    if "```" in yaml_content:
-        yaml_content = yaml_content.split("```", 1)[0]
-
-    yaml_content = yaml_content.strip()
+    # Apply the mechanical repairs to the LLM's version as well
+    yaml_content, repairs, violations = validate_semantic_model(
+        _strip_code_fences(response.semantic_model_yaml),
+        table_info,
+        context.get("schema"),
+    )
+    for repair in repairs:
+        writer(f"Repaired semantic model: {repair}")
+    for violation in violations:
+        writer(f"Semantic model issue remains: {violation}")
 
-    with open("semantic_model.yaml", "w") as f:
+    with open(workspace_path(SEMANTIC_MODEL_FILE), "w") as f:
         f.write(yaml_content)
-    context.update(response.dict())
-    return context
+    return {"semantic_model_ref": save_artifact(yaml_content)}
@@ -1,7 +1,9 @@
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 
+from utils.artifacts import save_artifact
+from utils.llm import get_llm
+
 
 def display_demo_idea(context, writer):
     writer("Processing demo idea...")
@@ -25,7 +27,7 @@ def display_demo_idea(context, writer):
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
 
     feedback_chain = prompt | llm | StrOutputParser()
 
@@ -38,5 +40,4 @@ def display_demo_idea(context, writer):
         {"demo_description": demo_description, "questions": questions}
     )
 
-    context["generated_idea"] = response
-    return context
+    return {"generated_idea_ref": save_artifact(response)}
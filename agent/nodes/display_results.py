@@ -1,11 +1,30 @@
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 
+from nodes.evaluate_script_run import summarize_script_attempts
+from utils.llm import get_llm, get_llm_cache
+from utils.run_stats import format_run_summary, load_run_summary
+
 
 def display_results(context, writer):
     writer("Wrapping up...")
 
+    # Everything up to this node, to show where the build spent its time
+    summary = load_run_summary()
+    if get_llm_cache() is not None:
+        # The cache's own counters are for every build in the process
+        totals = summary["totals"]
+        writer(
+            f"LLM cache: {totals.get('llm_cache_hits', 0)} hits, "
+            f"{totals.get('llm_cache_misses', 0)} misses"
+        )
+
+    script_attempts = summarize_script_attempts(context.get("script_attempts") or [])
+    if script_attempts:
+        writer(f"Dataset script attempts: {script_attempts}")
+
+    run_summary = format_run_summary(summary)
+
     prompt = ChatPromptTemplate.from_template(
         """
         You just finished generating everything needed for the user to run a demo in Snowflake Intelligence.
@@ -21,10 +40,11 @@ def display_results(context, writer):
         -- question 3: {question_3}
         -- question 4: {question_4}
         -- question 5: {question_5}
+        - Briefly mention how many attempts it took to generate working synthetic data: {script_attempts}
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
 
     feedback_chain = prompt | llm | StrOutputParser()
 
@@ -37,7 +57,10 @@ def display_results(context, writer):
             "question_3": context.get("question_3", ""),
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
+            "script_attempts": script_attempts or "not recorded",
         }
     )
-    context["final_response"] = response
-    return context
+    # Appended as is, an LLM asked to copy the table may change the numbers
+    if run_summary:
+        response += f"\n\n### Build breakdown\n\n{run_summary}"
+    return {"final_response": response}
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+
+from utils.llm import get_llm
 
 
 # Define conditional nodes to determine the starting point based on the state
@@ -32,7 +33,7 @@ def evaluate_human_feedback(context, writer):
     )
 
     # LLM with structured output
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
     structured_llm_evaluator = llm.with_structured_output(FeedbackEvaluationOutput)
 
     # Chain
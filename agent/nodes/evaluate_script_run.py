@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+import time
+
+
+def _max_fix_attempts():
+    return int(os.getenv("SCRIPT_MAX_FIX_ATTEMPTS", "3"))
+
+
+def _time_budget():
+    return float(os.getenv("SCRIPT_FIX_TIME_BUDGET_SECONDS", "900"))
+
+
+def error_signature(stack_trace):
+    """Short hash identifying an error independently of line numbers and addresses.
+
+    Only the final line (the exception, or the last pre-flight finding) is
+    used, so the same error surfacing at a different line after a fix still
+    counts as a repeat.
+    """
+    lines = [line.strip() for line in (stack_trace or "").splitlines() if line.strip()]
+    if not lines:
+        return None
+    last_line = re.sub(r"0x[0-9a-fA-F]+|\d+", "N", lines[-1])
+    return hashlib.sha1(last_line.encode("utf-8")).hexdigest()[:12]
+
+
+def start_script_attempt(strategy):
+    """State update for the nodes producing a script; execute_dataset_script closes it."""
+    return {"script_strategy": strategy, "script_started_at": time.time()}
+
+
+def record_script_attempt(context):
+    """State update appending the attempt that just ran to `script_attempts`."""
+    attempts = list(context.get("script_attempts") or [])
+    started_at = context.get("script_started_at") or time.time()
+    attempts.append(
+        {
+            "attempt": len(attempts) + 1,
+            "strategy": context.get("script_strategy", "generate"),
+            "started_at": started_at,
+            # Generation / fix, check and execution of this attempt
+            "seconds": time.time() - started_at,
+            "error": error_signature(context.get("stack_trace")),
+        }
+    )
+    return {"script_attempts": attempts}
+
+
+def summarize_script_attempts(attempts):
+    return ", ".join(
+        f"#{attempt['attempt']} {attempt['strategy']} "
+        f"{'failed' if attempt['error'] else 'succeeded'} in {attempt['seconds']:.0f}s"
+        for attempt in attempts
+    )
+
+
+# Conditional edge after ExecuteDatasetScript
+def evaluate_script_run(context, writer):
+    if not context.get("stack_trace"):
+        return "UploadToSnowflake"
+
+    # Budgets count from the start, or from the last time the user was asked
+    attempts = (context.get("script_attempts") or [])[context.get("script_budget_start", 0) :]
+    failures = [attempt for attempt in attempts if attempt["error"]]
+    elapsed = time.time() - attempts[0]["started_at"] if attempts else 0
+
+    if len(failures) >= _max_fix_attempts() or elapsed >= _time_budget():
+        writer(
+            f"The dataset script still fails after {len(failures)} attempt(s) "
+            f"and {elapsed:.0f}s, asking for help..."
+        )
+        return "AskScriptGuidance"
+
+    # The same error twice means the fixes aren't working, change strategy
+    if failures[-1]["error"] in {failure["error"] for failure in failures[:-1]}:
+        if not any(attempt["strategy"] == "regenerate" for attempt in attempts):
+            writer("The same error came back, regenerating the script from scratch...")
+            return "RegenerateDatasetScript"
+        writer("The same error came back after regenerating, asking for help...")
+        return "AskScriptGuidance"
+
+    return "FixPythonScript"
@@ -1,38 +1,66 @@
-import os
-import subprocess
+from nodes.evaluate_script_run import record_script_attempt
+from utils.artifacts import load_artifact
+from utils.script_preflight import preflight_script
+from utils.script_runner import describe_failure, run_script
+from utils.workspace import (
+    DATA_DIRECTORY,
+    SCRIPT_FILE,
+    reset_directory,
+    workspace_dir,
+    workspace_path,
+)
 
 
 def execute_dataset_script(context, writer):
     writer("Executing dataset generation script...")
 
-    output_directory = "generated_csvs"
-    if os.path.exists(output_directory):
-        for file in os.listdir(output_directory):
-            file_path = os.path.join(output_directory, file)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-        os.rmdir(output_directory)
-    os.makedirs(output_directory, exist_ok=True)
+    # Only this build's workspace is cleared, see utils/workspace.py
+    output_directory = reset_directory(workspace_path(DATA_DIRECTORY))
+    script_path = workspace_path(SCRIPT_FILE)
 
-    script_path = "generated_script.py"
-    if os.path.exists(script_path):
-        os.remove(script_path)
-
-    script_content = context["script"].strip("```python\n").strip("```")
+    script_content = load_artifact(context["script_ref"]).strip("```python\n").strip("```")
     with open(script_path, "w") as script_file:
         script_file.write(script_content)
 
-    context["output_directory"] = output_directory
-
-    try:
-        subprocess.run(["python", script_path], check=True)
+    # Problems visible in the source go straight back to fix_python_script
+    # without paying for a run
+    findings, estimated_rows = preflight_script(script_content)
+    if findings:
+        update = {
+            "script_run_stats": {
+                "estimated_rows": estimated_rows,
+                "preflight_findings": findings,
+            },
+            "stack_trace": (
+                "The script was not run, static checks found these problems:\n"
+                + "\n".join(f"- {finding}" for finding in findings)
+            ),
+        }
+        writer(f"Script failed {len(findings)} pre-flight check(s)")
+        return {**update, **record_script_attempt({**context, **update})}
 
-        csv_files = [f for f in os.listdir(output_directory) if f.endswith(".csv")]
-        context["csv_files"] = [os.path.join(output_directory, f) for f in csv_files]
+    run = run_script(script_path, output_directory, cwd=workspace_dir())
+    # Everything but the captured output, which only matters on failure
+    update = {
+        "script_run_stats": {
+            **{key: value for key, value in run.items() if key not in ("stdout", "stderr")},
+            "estimated_rows": estimated_rows,
+        },
+        "stack_trace": describe_failure(run),
+    }
 
-    except subprocess.CalledProcessError as e:
-        context["stack_trace"] = str(e)
-        print(f"Error during script execution: {e}")
-        return context
+    if update["stack_trace"]:
+        print(f"Error during script execution: {update['stack_trace']}")
+        return {**update, **record_script_attempt({**context, **update})}
 
-    return context
+    data_files = run["data_files"]
+    usage = f"{run['wall_seconds']:.1f}s"
+    if run["cpu_seconds"] is not None:
+        usage += f", {run['cpu_seconds']:.1f}s CPU, {run['peak_rss_mb']:.0f} MB peak memory"
+    writer(
+        f"Generated {len(data_files)} file(s) with "
+        f"{sum(stats['rows'] for stats in data_files.values())} rows and "
+        f"{sum(stats['bytes'] for stats in data_files.values()) / 1024 / 1024:.1f} MB "
+        f"in {usage}"
+    )
+    return {**update, **record_script_attempt({**context, **update})}
@@ -1,10 +1,16 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+
+from nodes.evaluate_script_run import start_script_attempt
+from utils.artifacts import load_artifact, save_artifact
+from utils.llm import get_llm
+from utils.streaming import llm_progress_config, llm_progress_enabled
 
 
 def fix_python_script(context, writer):
     writer("Fixing Python script due to an error during execution...")
+    guidance = context.get("script_guidance")
+    attempt = start_script_attempt("fix_with_guidance" if guidance else "fix")
 
     class DemoScript(BaseModel):
         script: str = Field(
@@ -13,7 +19,7 @@ def fix_python_script(context, writer):
         )
 
     stack_trace = context.get("stack_trace", "")
-    current_script = context.get("script", "")
+    current_script = load_artifact(context.get("script_ref"))
 
     prompt = ChatPromptTemplate.from_template(
         """
@@ -31,18 +37,23 @@ def fix_python_script(context, writer):
 
         ### Error Stack Trace ###
         {stack_trace}
+
+        ### Guidance From The User ###
+        {guidance}
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm(streaming=llm_progress_enabled())
     structured_llm_generator = llm.with_structured_output(DemoScript)
 
     chain = prompt | structured_llm_generator
 
     response = chain.invoke(
-        {"current_script": current_script, "stack_trace": stack_trace}
+        {
+            "current_script": current_script,
+            "stack_trace": stack_trace,
+            "guidance": guidance or "None given.",
+        },
+        config=llm_progress_config(writer, "Fixing the dataset script"),
     )
-    context["stack_trace"] = None
-
-    context.update(response.dict())
-    return context
+    return {**attempt, "stack_trace": None, "script_ref": save_artifact(response.script)}
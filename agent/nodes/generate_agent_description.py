@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langgraph.types import Command
 
+from utils.artifacts import load_artifact
+from utils.llm import get_llm
+
 
 def generate_agent_description(context, writer):
     writer("Generating Agent description...")
@@ -44,13 +46,12 @@ def generate_agent_description(context, writer):
 
     prompt = ChatPromptTemplate.from_template(prompt_template)
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
     structured_llm_generator = llm.with_structured_output(AgentDescriptionOutput)
 
     chain = prompt | structured_llm_generator
 
-    with open("semantic_model.yaml", "r") as f:
-        semantic_model_yaml = f.read()
+    semantic_model_yaml = load_artifact(context.get("semantic_model_ref"))
 
     response = chain.invoke(
         {
@@ -63,5 +64,4 @@ def generate_agent_description(context, writer):
             "semantic_model_yaml": semantic_model_yaml,
         }
     )
-    context.update(response.dict())
-    return context
+    return response.dict()
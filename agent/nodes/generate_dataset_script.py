@@ -1,12 +1,17 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from datetime import datetime
 
+from nodes.evaluate_script_run import start_script_attempt
+from utils.artifacts import save_artifact
+from utils.dataset_format import output_instructions
+from utils.llm import get_llm
+from utils.script_library import script_library_reference
+from utils.streaming import llm_progress_config, llm_progress_enabled
+from utils.workspace import SCRIPT_FILE, workspace_path
 
-def generate_dataset_script(context, writer):
-    writer("Generating Python script for synthetic dataset creation...")
 
+def _generate_script(context, writer, previous_error=None):
     class DemoScript(BaseModel):
         script: str = (
             Field(
@@ -42,9 +47,16 @@ def generate_dataset_script(context, writer):
 
         You can assume the python environment that will execute this has `pandas`, `numpy`, `random`, and `faker` available. Ensure the generated script can be copied into a .py file and would run, so include all needed import statements.
 
-        Write the script so that it writes the synthetic data to a CSV file, with the format TABLENAME.csv in the current directory. So for example, if the table should be called CUSTOMERS it writes CUSTOMERS.csv with the generated data.
+        The environment also provides `demo_data`, a library of NumPy vectorized generators. Use it (`import demo_data as dd`) to build every table column by column,
+        DO NOT build rows in Python loops or call `faker` once per field or row, that takes minutes for large tables. Use `dd.foreign_keys` for every ID column that
+        references another table so every join key exists in the parent table, and the seasonality options of `dd.dates` / `dd.time_series` to make trends visible.
+
+        ### demo_data library ###
+        {script_library}
+
+        {output_instructions}
 
-        Save all CSVs into the folder `generated_csvs` in the current directory.
+        Save all files into the folder `generated_csvs` in the current directory.
 
         Joins are supported, but make sure your script generates valid IDs so after I load the synthetic data into snowflake the SQL queries would actually work.
 
@@ -73,10 +85,11 @@ def generate_dataset_script(context, writer):
         - Question 4: {question_4}
         - Question 5: {question_5}
 
+        {previous_attempt}
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm(streaming=llm_progress_enabled())
     structured_llm_generator = llm.with_structured_output(DemoScript)
 
     chain = prompt | structured_llm_generator
@@ -90,10 +103,43 @@ def generate_dataset_script(context, writer):
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
             "current_date": current_date,
-        }
+            "script_library": script_library_reference(),
+            "output_instructions": output_instructions(),
+            "previous_attempt": (
+                "### Error of a previous attempt, avoid it ###\n" + previous_error
+                if previous_error
+                else ""
+            ),
+        },
+        config=llm_progress_config(writer, "Writing the dataset script"),
     )
 
-    with open("generated_script.py", "w") as f:
+    with open(workspace_path(SCRIPT_FILE), "w") as f:
         f.write(response.script)
-    context.update(response.dict())
-    return context
+    return response, save_artifact(response.script)
+
+
+def generate_dataset_script(context, writer):
+    writer("Generating Python script for synthetic dataset creation...")
+    attempt = start_script_attempt("generate")
+
+    response, script_ref = _generate_script(context, writer)
+    return {
+        **attempt,
+        "script_ref": script_ref,
+        "schema": response.schema,
+        "agent_name": response.agent_name,
+    }
+
+
+def regenerate_dataset_script(context, writer):
+    """Start over with a new script when fixing keeps hitting the same error.
+
+    The schema and agent name stay as they are, the document branch already
+    uses them.
+    """
+    writer("Regenerating the Python script from scratch...")
+    attempt = start_script_attempt("regenerate")
+
+    _, script_ref = _generate_script(context, writer, previous_error=context.get("stack_trace"))
+    return {**attempt, "script_ref": script_ref, "stack_trace": None}
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langgraph.types import Command
 
+from utils.llm import get_llm
+
 
 def generate_demo_scenario(context, writer):
     writer("Generating a potential demo scenario...")
@@ -73,7 +74,7 @@ def generate_demo_scenario(context, writer):
 
     prompt = ChatPromptTemplate.from_template(prompt_final)
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
     structured_llm_generator = llm.with_structured_output(DemoScenarioOutput)
 
     chain = prompt | structured_llm_generator
@@ -90,5 +91,4 @@ def generate_demo_scenario(context, writer):
             "human_feedback": context.get("human_feedback", ""),
         }
     )
-    context.update(response.dict())
-    return context
+    return response.dict()
@@ -1,7 +1,46 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
+import csv
+import os
+
+import pandas as pd
+from utils.dataset_format import dataset_format, documents_path
+from utils.llm import get_llm
+from utils.streaming import llm_progress_config, llm_progress_enabled
+
+
+DOCUMENT_COLUMNS = ["DOCUMENT_TITLE", "DOCUMENT_URL", "TEXT"]
+
+# Create a prompt to generate the document text
+document_prompt = ChatPromptTemplate.from_template(
+    """
+    Generate a synthetic document that will be used for a RAG demo based on the following details:
+
+    ## DEMO OVERVIEW ##
+    - Demo Description: {demo_description}
+
+    ## DOCUMENT DETAILS ##
+    Title: {title}
+    Instructions for generation: {generation_description}
+    """
+)
+
+
+def generate_document_texts(llm, demo_description, documents, max_concurrency, config=None):
+    """Generate the body of every document concurrently, in the order given."""
+    chain = document_prompt | llm | StrOutputParser()
+    return chain.batch(
+        [
+            {
+                "demo_description": demo_description,
+                "title": document.title,
+                "generation_description": document.generation_description,
+            }
+            for document in documents
+        ],
+        config={**(config or {}), "max_concurrency": max_concurrency},
+    )
 
 
 def generate_document_data(context, writer):
@@ -46,7 +85,7 @@ def generate_document_data(context, writer):
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm(streaming=llm_progress_enabled())
     structured_llm_generator = llm.with_structured_output(DocumentStore)
 
     chain = prompt | structured_llm_generator
@@ -59,53 +98,45 @@ def generate_document_data(context, writer):
             "question_3": context.get("question_3", ""),
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
-        }
+        },
+        config=llm_progress_config(writer, "Planning the documents"),
+    )
+    documents = response.documents
+    writer(
+        f"Generating {len(documents)} documents: "
+        + ", ".join(document.title for document in documents)
+    )
+    max_concurrency = int(os.getenv("DOCUMENT_GENERATION_CONCURRENCY", "5"))
+    document_texts = generate_document_texts(
+        llm,
+        context.get("demo_description", ""),
+        documents,
+        max_concurrency,
+        config=llm_progress_config(writer, "Writing the documents"),
     )
-    # Loop through each document in the response
-    generated_documents = []
-    for document in response.documents:
-        writer(f"Generating document for title: {document.title}")
-
-        # Create a prompt to generate the document text
-        document_prompt = ChatPromptTemplate.from_template(
-            """
-            Generate a synthetic document that will be used for a RAG demo based on the following details:
-
-            ## DEMO OVERVIEW ##
-            - Demo Description: {demo_description}
-            
-            ## DOCUMENT DETAILS ##
-            Title: {title}
-            Instructions for generation: {generation_description}
-            """
-        )
-
-        chain = document_prompt | llm | StrOutputParser()
-        # Use the LLM to generate the document text
-        document_text = chain.invoke(
-            {
-                "demo_description": context.get("demo_description", ""),
-                "title": document.title,
-                "generation_description": document.generation_description,
-            }
-        )
-
-        # Append the generated document details to the list
-        generated_documents.append(
-            {
-                "DOCUMENT_TITLE": document.title,
-                "DOCUMENT_URL": document.url,
-                "TEXT": document_text,
-            }
-        )
-
-    # Create a CSV file with the generated documents
-    import csv
 
-    csv_file_path = "./generated_csvs/DOCUMENTS.csv"
-    with open(csv_file_path, mode="w", newline="", encoding="utf-8") as csv_file:
-        csv_writer = csv.DictWriter(
-            csv_file, fieldnames=["DOCUMENT_TITLE", "DOCUMENT_URL", "TEXT"]
+    # batch() keeps the input order, so the CSV rows follow the metadata order
+    generated_documents = [
+        {
+            "DOCUMENT_TITLE": document.title,
+            "DOCUMENT_URL": document.url,
+            "TEXT": document_text,
+        }
+        for document, document_text in zip(documents, document_texts)
+    ]
+
+    documents_file = documents_path()
+    os.makedirs(os.path.dirname(documents_file), exist_ok=True)
+    if dataset_format() == "parquet":
+        pd.DataFrame(generated_documents, columns=DOCUMENT_COLUMNS).to_parquet(
+            documents_file, index=False
         )
-        csv_writer.writeheader()
-        csv_writer.writerows(generated_documents)
+    else:
+        with open(documents_file, mode="w", newline="", encoding="utf-8") as csv_file:
+            csv_writer = csv.DictWriter(csv_file, fieldnames=DOCUMENT_COLUMNS)
+            csv_writer.writeheader()
+            csv_writer.writerows(generated_documents)
+
+    # This node runs in parallel with the structured data branch, so only
+    # return the keys it owns.
+    return {"documents_file": documents_file}
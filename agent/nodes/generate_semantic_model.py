@@ -1,6 +1,13 @@
 from pydantic import BaseModel, Field
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+
+from nodes.check_semantic_model import _strip_code_fences
+from utils.artifacts import load_json_artifact, save_artifact
+from utils.llm import get_llm
+from utils.streaming import llm_progress_config, llm_progress_enabled
+from utils.semantic_model_docs import get_semantic_model_documentation
+from utils.table_profile import format_table_info
+from utils.workspace import SEMANTIC_MODEL_FILE, workspace_path
 
 
 def generate_semantic_model(context, writer):
@@ -32,7 +39,7 @@ def generate_semantic_model(context, writer):
 
         Below you will find sections for the following:
         
-        TABLE INFO - which contains the information about each table in snowflake including the full path to the table, the columns, and sample values.
+        TABLE INFO - which contains the information about each table in snowflake including the full path to the table, the row count, the columns with their types, and a profile of each column (distinct count, null ratio, value range and sample values).
         Be aware of synonyms and other hints in the semantic model that will improve accuracy of answering the specific questions listed below.
         
         DEMO DESCRIPTION AND QUESTIONS - this will contain the demo description and the questions that are intended to be answered by the semantic model. As mentioned some of the questions
@@ -63,17 +70,16 @@ def generate_semantic_model(context, writer):
         """,
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm(streaming=llm_progress_enabled())
     structured_llm_generator = llm.with_structured_output(DemoScript)
 
     chain = prompt | structured_llm_generator
 
-    with open("semantic_model_docs.txt", "r") as f:
-        semantic_model_documentation = f.read()
+    semantic_model_documentation = get_semantic_model_documentation(writer)
 
     response = chain.invoke(
         {
-            "table_info": context["table_info"],
+            "table_info": format_table_info(load_json_artifact(context["table_info_ref"])),
             "demo_description": context.get("demo_description", ""),
             "question_1": context.get("question_1", ""),
             "question_2": context.get("question_2", ""),
@@ -81,24 +87,12 @@ def generate_semantic_model(context, writer):
             "question_4": context.get("question_4", ""),
             "question_5": context.get("question_5", ""),
             "semantic_model_documentation": semantic_model_documentation,
-        }
+        },
+        config=llm_progress_config(writer, "Writing the semantic model"),
     )
 
-    yaml_content = response.semantic_model_yaml.strip()
-
-    # Remove leading ```yaml or ```
-    if yaml_content.startswith("```yaml"):
-        yaml_content = yaml_content[7:]
-    elif yaml_content.startswith("```"):
-        yaml_content = yaml_content[3:]
-
-    # Remove trailing ``` and any text after it
-    if "```" in yaml_content:
-        yaml_content = yaml_content.split("```", 1)[0]
-
-    yaml_content = yaml_content.strip()
+    yaml_content = _strip_code_fences(response.semantic_model_yaml)
 
-    with open("semantic_model.yaml", "w") as f:
+    with open(workspace_path(SEMANTIC_MODEL_FILE), "w") as f:
         f.write(yaml_content)
-    context.update(response.dict())
-    return context
+    return {"semantic_model_ref": save_artifact(yaml_content)}
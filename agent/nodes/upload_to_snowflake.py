@@ -1,126 +1,510 @@
+import contextvars
+import json
 import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pandas as pd
-from snowflake.snowpark import Session
-from snowflake.snowpark.functions import col
 from langchain.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableParallel
+
+from utils.artifacts import load_artifact, save_json_artifact
+from utils.dataset_format import (
+    documents_path,
+    is_data_file,
+    read_columns,
+    read_rows,
+    table_name_for,
+)
+from utils.llm import get_llm
+from utils.run_stats import InstrumentedSession
+from utils.schema_inference import (
+    apply_schema,
+    coerce_to_schema,
+    infer_schema,
+    number_columns,
+    schema_from_arrow,
+    widen_for_chunks,
+    widen_numbers,
+)
+from utils.snowflake_pool import run_session, session_pool
+from utils.table_profile import fetch_column_types, profile_dataframe, profile_table
+from utils.workspace import DATA_DIRECTORY, SEMANTIC_MODEL_FILE, workspace_path
 
 
 def get_snowflake_session(context):
-    # Reuse the session from the context or create a new one if not available
-    session = context.get("snowflake_session")
-    if not session:
-        session = Session.builder.config(
-            "CONNECTION_NAME", os.getenv("SNOWFLAKE_CONNECTION_NAME", "agent-creator")
-        ).getOrCreate()
-        schema = context.get("schema", "DEFAULT")
-        session.sql(f"CREATE SCHEMA IF NOT EXISTS {schema}").collect()
-        session.use_schema(schema)
-        context["snowflake_session"] = session
-    return session
+    # Sessions live in the pool, not in the (checkpointed) state. The run keeps
+    # the one it checked out, with its own schema, until it stops.
+    session = run_session(context.get("schema", "DEFAULT"))
+    # Statements are recorded for the calling node, see utils/run_stats.py
+    return InstrumentedSession(session)
 
 
-def upload_to_snowflake(context, writer):
-    writer("Creating data in Snowflake (check for MFA notifications)...")
+def _primary_key_column(columns):
+    # Treat the first column as the primary key if it has 'ID' in its name (case insensitive)
+    if columns and "ID" in columns[0].upper():
+        return columns[0].upper()
+    return None
 
-    session = get_snowflake_session(context)
 
-    csv_directory = "./generated_csvs"
-    csv_files = [f for f in os.listdir(csv_directory) if f.endswith(".csv")]
+def _read_chunks(file_path, chunk_size, columns=None):
+    """Return `(arrow_schema, chunks)` for a data file, the schema is None for CSV.
+
+    `columns` (upper case names) limits the columns that are read.
+    """
+    if file_path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        if columns is not None:
+            columns = [name for name in parquet_file.schema_arrow.names if name.upper() in columns]
+        batches = parquet_file.iter_batches(batch_size=chunk_size, columns=columns)
+        return parquet_file.schema_arrow, (batch.to_pandas() for batch in batches)
+    usecols = None if columns is None else (lambda name: name.upper() in columns)
+    return None, iter(pd.read_csv(file_path, chunksize=chunk_size, usecols=usecols))
+
+
+def _upper_case_columns(chunks):
+    for chunk in chunks:
+        chunk.columns = [col.upper() for col in chunk.columns]
+        yield chunk
 
-    table_info = []
 
-    for csv_file in csv_files:
-        table_name = os.path.splitext(csv_file)[0].upper()
-        writer(f"Uploading {csv_file} to Snowflake as table {table_name}...")
-
-        file_path = os.path.join(csv_directory, csv_file)
-        df = pd.read_csv(file_path)
-
-        df.columns = [col.upper() for col in df.columns]
-
-        # Drop existing table and detect/convert date-like columns
-        session.sql(f"DROP TABLE IF EXISTS {table_name}").collect()
-        date_cols = set()
-        # Only convert columns where at least 80% of values match the YYYY-MM-DD pattern
-        date_threshold = 0.8
-        for col_name in df.columns:
-            series_str = df[col_name].astype(str)
-            mask = series_str.str.match(r"^\d{4}-\d{2}-\d{2}$")
-            if mask.sum() >= len(df) * date_threshold:
-                # safely parse strictly formatted dates
-                df[col_name] = pd.to_datetime(
-                    df[col_name], format="%Y-%m-%d", errors="coerce"
-                ).dt.date
-                date_cols.add(col_name)
-
-        # Build column definitions based on detected types
-        col_defs = []
-        for col_name in df.columns:
-            if col_name in date_cols:
-                col_type = "DATE"
-            elif pd.api.types.is_integer_dtype(df[col_name]):
-                col_type = "NUMBER"
-            elif pd.api.types.is_float_dtype(df[col_name]):
-                col_type = "FLOAT"
-            else:
-                max_len = df[col_name].astype(str).map(len).max() or 1
-                col_type = f"VARCHAR({max_len})"
-            col_defs.append(f"{col_name} {col_type}")
-
-        # Create table with schema and load data
-        session.sql(f"CREATE TABLE {table_name} ({', '.join(col_defs)})").collect()
+def _pandas_load_file(session, file_path, table_name, sample_fraction, chunk_size, report):
+    """Load one data file with write_pandas, reading and writing it in bounded chunks.
+
+    Column types come from the Parquet schema, or are inferred from the first
+    chunk of a CSV, so peak memory depends on the chunk size rather than on the
+    size of the file. The number columns of the later chunks are scanned
+    before the table is created, to widen their scale. Returns
+    `(row_count, profile)`.
+    """
+    arrow_schema, chunks = _read_chunks(file_path, chunk_size)
+    df = next(chunks, None)
+    if df is None:
+        df = (
+            arrow_schema.empty_table().to_pandas()
+            if arrow_schema is not None
+            else pd.read_csv(file_path, nrows=0)
+        )
+    next_chunk = next(chunks, None)
+
+    df.columns = [col.upper() for col in df.columns]
+
+    session.sql(f"DROP TABLE IF EXISTS {table_name}").collect()
+
+    if arrow_schema is not None:
+        column_types = apply_schema(df, schema_from_arrow(arrow_schema, df))
+    else:
+        column_types = apply_schema(df, infer_schema(df, sample_fraction=sample_fraction))
+    if next_chunk is not None:
+        column_types = widen_for_chunks(column_types)
+        numbers = number_columns(column_types)
+        if numbers:
+            # Later chunks may need more decimal places than the first one, an
+            # existing column can't be widened, so read the numbers up front
+            _, number_chunks = _read_chunks(file_path, chunk_size, columns=set(numbers))
+            next(number_chunks, None)
+            column_types = widen_numbers(column_types, _upper_case_columns(number_chunks))
+    col_defs = [f"{col_name} {col_type}" for col_name, col_type in column_types.items()]
+
+    # Create table with schema and load data
+    session.sql(f"CREATE TABLE {table_name} ({', '.join(col_defs)})").collect()
+    session.write_pandas(
+        df,
+        table_name,
+        auto_create_table=False,
+        overwrite=False,
+        quote_identifiers=False,
+    )
+    row_count = len(df)
+
+    chunk_number = 1
+    while next_chunk is not None:
+        chunk_number += 1
+        report(f"Uploading chunk {chunk_number} of {table_name}...")
+        next_chunk.columns = df.columns
+        coerce_to_schema(next_chunk, column_types)
         session.write_pandas(
-            df,
+            next_chunk,
             table_name,
             auto_create_table=False,
             overwrite=False,
             quote_identifiers=False,
         )
-
-        # Check if the first column has 'ID' in its name (case insensitive)
-        first_column = df.columns[0]
-        if "ID" in first_column.upper():
-            session.sql(
-                f"ALTER TABLE {table_name} ADD PRIMARY KEY ({first_column})"
-            ).collect()
-
-        snowflake_table = session.table(table_name)
-        column_info = []
-        for column in snowflake_table.schema.fields:
-            column_name = column.name
-            column_type = column.datatype
-            sample_values = (
-                snowflake_table.select(col(column_name))
-                .limit(5)
-                .to_pandas()[column_name]
-                .tolist()
-            )
-            column_info.append(
-                {
-                    "column_name": column_name,
-                    "column_type": str(column_type),
-                    "sample_values": sample_values,
-                }
+        row_count += len(next_chunk)
+        next_chunk = next(chunks, None)
+
+    primary_key = _primary_key_column(list(df.columns))
+    if primary_key:
+        session.sql(
+            f"ALTER TABLE {table_name} ADD PRIMARY KEY ({primary_key})"
+        ).collect()
+
+    # Files that fit in a single chunk are profiled from the DataFrame that was
+    # loaded, larger ones with a single profiling query.
+    if chunk_number == 1:
+        return row_count, profile_dataframe(df, column_types)
+    columns = fetch_column_types(session, [table_name])[table_name]
+    return row_count, profile_table(session, table_name, columns)[1]
+
+
+def pandas_load_files(session, directory, files, writer):
+    """Load the data files with write_pandas, several tables at a time.
+
+    Up to UPLOAD_WORKERS tables are parsed, created, loaded and profiled
+    concurrently, each worker on its own Snowpark session checked out of the
+    pool. Workers that can't get one within UPLOAD_SESSION_TIMEOUT_SECONDS
+    are not started; the build's own session is always one of them. Progress
+    is relayed to `writer` from the calling thread, and a failing table is
+    reported in the returned errors instead of aborting the others.
+    """
+    sample_fraction = float(os.getenv("SCHEMA_INFERENCE_SAMPLE_FRACTION", "1.0"))
+    chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", "250000"))
+    workers = max(min(int(os.getenv("UPLOAD_WORKERS", "4")), len(files)), 1)
+    start = time.perf_counter()
+
+    results = {}
+    errors = {}
+    progress = queue.Queue()
+
+    def load(file_name, worker_session):
+        table_name = table_name_for(file_name)
+        progress.put(f"Uploading {file_name} to Snowflake as table {table_name}...")
+        try:
+            results[table_name] = _pandas_load_file(
+                worker_session,
+                os.path.join(directory, file_name),
+                table_name,
+                sample_fraction,
+                chunk_size,
+                progress.put,
             )
-
-        database = session.get_current_database()
+        except Exception as e:
+            errors[table_name] = str(e)
+            progress.put(f"Failed to upload {table_name}: {e}")
+
+    def drain_progress():
+        while not progress.empty():
+            writer(progress.get())
+
+    if workers == 1:
+        for file_name in files:
+            load(file_name, session)
+            drain_progress()
+    else:
+        # The run's own session plus one checked out session per extra
+        # worker, each used by one worker at a time
         schema = session.get_current_schema()
-        fully_qualified_name = f"{database}.{schema}.{table_name}"
-
-        if table_name != "DOCUMENTS":
-            table_info.append(
-                {
-                    "table_name": table_name,
-                    "fully_qualified_name": fully_qualified_name,
-                    "columns": str(column_info),  # Convert column_info to a string
+        timeout = float(os.getenv("UPLOAD_SESSION_TIMEOUT_SECONDS", "10"))
+        worker_sessions = []
+        for _ in range(workers - 1):
+            try:
+                worker_sessions.append(session_pool().checkout(schema, timeout=timeout))
+            except Exception as e:
+                # The pool is busy or no session could be opened, the
+                # workers that have one do without the rest
+                writer(f"Uploading with {len(worker_sessions) + 1} worker(s): {e}")
+                break
+        free_sessions = queue.Queue()
+        free_sessions.put(session)
+        for pooled in worker_sessions:
+            free_sessions.put(InstrumentedSession(pooled))
+
+        def worker_load(file_name):
+            worker_session = free_sessions.get()
+            try:
+                load(file_name, worker_session)
+            finally:
+                free_sessions.put(worker_session)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(worker_sessions) + 1) as pool:
+                # Each worker records its statements for the node that started it
+                pending = {
+                    pool.submit(contextvars.copy_context().run, worker_load, file_name)
+                    for file_name in files
                 }
+                while pending:
+                    _, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    drain_progress()
+        finally:
+            for pooled in worker_sessions:
+                pooled.close()
+
+    # Rebuild the results in file order so table_info is deterministic
+    rows_loaded = {}
+    profiles = {}
+    for file_name in files:
+        table_name = table_name_for(file_name)
+        if table_name in results:
+            rows_loaded[table_name], profiles[table_name] = results[table_name]
+
+    return rows_loaded, {"load": time.perf_counter() - start}, profiles, errors
+
+
+# File format options and the name PUT gives the staged file, per extension.
+# Parquet is already compressed, so it is staged as is.
+BULK_FILE_FORMATS = {
+    ".csv": (
+        """TYPE = CSV
+            PARSE_HEADER = TRUE
+            FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+            EMPTY_FIELD_AS_NULL = TRUE
+            ERROR_ON_COLUMN_COUNT_MISMATCH = FALSE""",
+        True,
+    ),
+    ".parquet": ("TYPE = PARQUET\n            USE_LOGICAL_TYPE = TRUE", False),
+}
+
+
+def bulk_load_files(session, directory, files, writer, stage_name):
+    """Stage every data file with one PUT per format and load them all with a single scripting block.
+
+    The number of round trips is fixed (create stage, PUT, load block, row
+    counts) no matter how many tables are generated. Column types come from
+    INFER_SCHEMA, server side: Parquet files carry their types, CSV types are
+    inferred. `stage_name` must be unique per concurrent caller, it also names
+    the temporary file formats.
+
+    Every table is created and loaded in its own exception handler, so a file
+    that can't be loaded is reported in the returned errors instead of
+    failing the others. Rows COPY INTO can't load are skipped, their count
+    and the first error are reported for the table as well.
+    """
+    if not files:
+        # An empty scripting block is a syntax error
+        return {}, {}, {}, {}
+
+    timings = {}
+    extensions = [
+        extension
+        for extension in BULK_FILE_FORMATS
+        if any(file_name.lower().endswith(extension) for file_name in files)
+    ]
+
+    start = time.perf_counter()
+    writer(f"Staging {len(files)} files to @{stage_name}...")
+    session.sql(f"CREATE OR REPLACE TEMPORARY STAGE {stage_name}").collect()
+    for extension in extensions:
+        session.file.put(
+            os.path.join(directory, f"*{extension}"),
+            f"@{stage_name}",
+            auto_compress=BULK_FILE_FORMATS[extension][1],
+            overwrite=True,
+        )
+    timings["stage"] = time.perf_counter() - start
+
+    statements = []
+    file_formats = {}
+    for extension in extensions:
+        file_format = f"{stage_name}_{extension[1:].upper()}_FORMAT"
+        file_formats[extension] = file_format
+        statements.append(
+            f"""CREATE OR REPLACE TEMPORARY FILE FORMAT {file_format}
+            {BULK_FILE_FORMATS[extension][0]}"""
+        )
+
+    table_names = []
+    for file_name in files:
+        table_name = table_name_for(file_name)
+        extension = os.path.splitext(file_name)[1].lower()
+        file_format = file_formats[extension]
+        staged_file = f"{file_name}.gz" if BULK_FILE_FORMATS[extension][1] else file_name
+        table_names.append(table_name)
+
+        # Upper-case the inferred column names so they match the unquoted
+        # identifiers used by the semantic model and agent prompts.
+        table_statements = [
+            f"""CREATE OR REPLACE TABLE {table_name} USING TEMPLATE (
+                SELECT ARRAY_AGG(OBJECT_CONSTRUCT(
+                    'COLUMN_NAME', UPPER(COLUMN_NAME),
+                    'TYPE', TYPE,
+                    'NULLABLE', NULLABLE
+                )) WITHIN GROUP (ORDER BY ORDER_ID)
+                FROM TABLE(INFER_SCHEMA(
+                    LOCATION => '@{stage_name}',
+                    FILES => '{staged_file}',
+                    FILE_FORMAT => '{file_format}'
+                ))
+            )""",
+            f"""COPY INTO {table_name}
+            FROM @{stage_name}
+            FILES = ('{staged_file}')
+            FILE_FORMAT = (FORMAT_NAME = '{file_format}')
+            MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+            ON_ERROR = CONTINUE""",
+            # The COPY INTO result has one row per file
+            """SELECT SUM("errors_seen"), MAX("first_error") INTO :rows_skipped, :first_error
+            FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))""",
+            f"""IF (rows_skipped > 0) THEN
+                errors := OBJECT_INSERT(
+                    errors,
+                    '{table_name}',
+                    rows_skipped || ' row(s) skipped, first error: ' || first_error
+                );
+            END IF""",
+        ]
+
+        try:
+            columns = read_columns(os.path.join(directory, file_name))
+        except Exception:
+            columns = []  # Its load fails and reports why
+        primary_key = _primary_key_column(columns)
+        if primary_key:
+            table_statements.append(
+                f"ALTER TABLE {table_name} ADD PRIMARY KEY ({primary_key})"
             )
 
-    context["snowflake_stage"] = "uploaded_stage"
-    context["table_info"] = table_info
-    return context
+        statements.append(
+            "BEGIN\n"
+            + ";\n".join(table_statements)
+            + f""";
+            EXCEPTION
+                WHEN OTHER THEN
+                    errors := OBJECT_INSERT(errors, '{table_name}', SQLERRM, TRUE);
+                    failed := ARRAY_APPEND(failed, '{table_name}');
+            END"""
+        )
+
+    start = time.perf_counter()
+    writer(f"Creating and loading {len(table_names)} tables with COPY INTO...")
+    body = ";\n".join(statements)
+    rows = session.sql(
+        f"""EXECUTE IMMEDIATE $$
+        DECLARE
+            errors OBJECT DEFAULT OBJECT_CONSTRUCT();
+            failed ARRAY DEFAULT ARRAY_CONSTRUCT();
+            rows_skipped NUMBER;
+            first_error VARCHAR;
+        BEGIN
+        {body};
+        RETURN OBJECT_CONSTRUCT('errors', errors, 'failed', failed);
+        END;
+        $$"""
+    ).collect()
+    timings["load"] = time.perf_counter() - start
+
+    # The block returns an OBJECT, which comes back as JSON text
+    result = json.loads(rows[0][0]) if rows and rows[0][0] else {}
+    errors = result.get("errors", {})
+    failed = result.get("failed", [])
+    for table_name, error in errors.items():
+        if table_name in failed:
+            writer(f"Failed to upload {table_name}: {error}")
+        else:
+            writer(f"Loaded {table_name} with errors: {error}")
+    # Tables whose load failed may not exist, the others have their rows
+    table_names = [table_name for table_name in table_names if table_name not in failed]
+
+    row_counts = {}
+    if table_names:
+        count_query = " UNION ALL ".join(
+            f"SELECT '{table_name}' AS TABLE_NAME, COUNT(*) AS ROW_COUNT FROM {table_name}"
+            for table_name in table_names
+        )
+        for row in session.sql(count_query).collect():
+            row_counts[row["TABLE_NAME"]] = row["ROW_COUNT"]
+
+    # Keep the file order so table_info (and the prompts built from it) is stable
+    rows_loaded = {table_name: row_counts.get(table_name, 0) for table_name in table_names}
+    return rows_loaded, timings, {}, errors
+
+
+def load_files(session, directory, files, writer, stage_name):
+    """Load CSV and / or Parquet files, one table per file."""
+    # "bulk" stages everything and loads with COPY INTO, "pandas" uses write_pandas per table
+    upload_mode = os.getenv("SNOWFLAKE_UPLOAD_MODE", "bulk").lower()
+    if upload_mode == "pandas":
+        return pandas_load_files(session, directory, files, writer)
+    return bulk_load_files(session, directory, files, writer, stage_name)
+
+
+def upload_to_snowflake(context, writer):
+    writer("Creating data in Snowflake (check for MFA notifications)...")
+
+    session = get_snowflake_session(context)
+
+    data_directory = workspace_path(DATA_DIRECTORY)
+    # DOCUMENTS is loaded by upload_documents on the document branch
+    data_files = sorted(
+        f
+        for f in os.listdir(data_directory)
+        if is_data_file(f) and table_name_for(f) != "DOCUMENTS"
+    )
+
+    rows_loaded, timings, profiles, errors = load_files(
+        session, data_directory, data_files, writer, stage_name="GENERATED_CSVS_STAGE"
+    )
+
+    for table_name, row_count in rows_loaded.items():
+        writer(f"Loaded {row_count} rows into {table_name}")
+    failed = [table_name for table_name in errors if table_name not in rows_loaded]
+    if failed:
+        writer(f"Failed to upload {len(failed)} table(s): {', '.join(failed)}")
+
+    database = session.get_current_database()
+    schema = session.get_current_schema()
+
+    # Profile whatever the loader couldn't profile locally, one query per table
+    start = time.perf_counter()
+    table_names = list(rows_loaded)
+    missing = [table_name for table_name in table_names if table_name not in profiles]
+    for table_name, columns in fetch_column_types(session, missing).items():
+        _, profiles[table_name] = profile_table(session, table_name, columns)
+    timings["profile"] = time.perf_counter() - start
+
+    table_info = []
+    for table_name in table_names:
+        table_info.append(
+            {
+                "table_name": table_name,
+                "fully_qualified_name": f"{database}.{schema}.{table_name}",
+                "row_count": rows_loaded[table_name],
+                "columns": profiles[table_name],
+            }
+        )
+
+    writer(
+        "Upload timings: "
+        + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in timings.items())
+    )
+
+    return {
+        "snowflake_stage": "uploaded_stage",
+        "table_info_ref": save_json_artifact(table_info),
+        "upload_stats": {
+            "rows_loaded": rows_loaded,
+            "timings": timings,
+            "errors": errors,
+        },
+    }
+
+
+def upload_documents(context, writer):
+    """Load the generated documents into the DOCUMENTS table that backs Cortex Search.
+
+    Runs on the document branch of the graph, concurrently with the structured
+    data branch, so it only returns the keys it owns.
+    """
+    writer("Uploading documents to Snowflake...")
+
+    session = get_snowflake_session(context)
+
+    documents_file = context.get("documents_file") or documents_path()
+    rows_loaded, _, _, errors = load_files(
+        session,
+        os.path.dirname(documents_file),
+        [os.path.basename(documents_file)],
+        writer,
+        stage_name="GENERATED_DOCUMENTS_STAGE",
+    )
+    if "DOCUMENTS" not in rows_loaded:
+        raise RuntimeError(f"Failed to upload documents: {errors}")
+
+    writer(f"Loaded {rows_loaded.get('DOCUMENTS', 0)} documents into DOCUMENTS")
+    return {}
 
 
 def upload_semantic_model(context, writer):
@@ -131,7 +515,10 @@ def upload_semantic_model(context, writer):
     database = session.get_current_database().replace('"', "")
     schema = session.get_current_schema().replace('"', "")
     stage_name = "MODELS"
-    file_path = "./semantic_model.yaml"
+    # Written from the artifact store, the workspace may be newer than the model
+    file_path = workspace_path(SEMANTIC_MODEL_FILE)
+    with open(file_path, "w") as f:
+        f.write(load_artifact(context.get("semantic_model_ref")))
 
     # Create the stage if it doesn't exist and ensure it has a directory table enabled
     session.sql(
@@ -141,8 +528,7 @@ def upload_semantic_model(context, writer):
     # Upload the file to the stage
     session.file.put(file_path, f"@{stage_name}", overwrite=True, auto_compress=False)
 
-    context["semantic_model_path"] = f"@{database}.{schema}.MODELS/semantic_model.yaml"
-    return context
+    return {"semantic_model_path": f"@{database}.{schema}.MODELS/semantic_model.yaml"}
 
 
 def create_cortex_search(context, writer):
@@ -169,9 +555,7 @@ def create_cortex_search(context, writer):
 """
     ).collect()
 
-    context["cortex_search_path"] = f"{database}.{schema}.SEARCH"
-
-    return context
+    return {"cortex_search_path": f"{database}.{schema}.SEARCH"}
 
 
 def generate_tool_descriptions(context, writer):
@@ -196,7 +580,7 @@ def generate_tool_descriptions(context, writer):
         """
     )
 
-    # Generate description for Documents tool based on CSV content
+    # Generate description for Documents tool based on the document file
     documents_prompt = ChatPromptTemplate.from_template(
         """
         Based on the document data that will be available in the Cortex Search service, generate a brief description
@@ -209,38 +593,37 @@ def generate_tool_descriptions(context, writer):
         """
     )
 
-    llm = ChatOpenAI(model_name="gpt-4o")
+    llm = get_llm()
 
-    # Read semantic model
-    try:
-        with open("semantic_model.yaml", "r") as f:
-            semantic_model_yaml = f.read()
-    except FileNotFoundError:
-        semantic_model_yaml = "Semantic model not available"
+    semantic_model_yaml = (
+        load_artifact(context.get("semantic_model_ref")) or "Semantic model not available"
+    )
 
-    # Read documents info
+    # Read only the header and first few documents to understand document types,
+    # the full file can hold many MB of document text
     try:
-        with open("./generated_csvs/DOCUMENTS.csv", "r") as f:
-            # Read first few lines to understand document types
-            lines = f.readlines()[:6]  # Header + 5 sample rows
-            document_info = "\n".join(lines)
+        sample_documents = read_rows(context.get("documents_file") or documents_path(), 5)
+        document_info = "\n".join(
+            f"- {document['DOCUMENT_TITLE']}: {document['TEXT'][:300]}"
+            for document in sample_documents
+        )
     except FileNotFoundError:
         document_info = "Document data not available"
 
-    # Generate descriptions
-    semantic_chain = semantic_model_prompt | llm | StrOutputParser()
-    documents_chain = documents_prompt | llm | StrOutputParser()
-
-    snowflake_data_description = semantic_chain.invoke(
-        {"semantic_model_yaml": semantic_model_yaml}
+    # Generate both descriptions at the same time, they don't depend on each other
+    descriptions_chain = RunnableParallel(
+        snowflake_data_description=semantic_model_prompt | llm | StrOutputParser(),
+        documents_description=documents_prompt | llm | StrOutputParser(),
     )
 
-    documents_description = documents_chain.invoke({"document_info": document_info})
-
-    context["snowflake_data_description"] = snowflake_data_description
-    context["documents_description"] = documents_description
+    descriptions = descriptions_chain.invoke(
+        {"semantic_model_yaml": semantic_model_yaml, "document_info": document_info}
+    )
 
-    return context
+    return {
+        "snowflake_data_description": descriptions["snowflake_data_description"],
+        "documents_description": descriptions["documents_description"],
+    }
 
 
 def create_agent(context, writer):
@@ -324,4 +707,5 @@ def create_agent(context, writer):
 
     session.sql(create_agent_sql).collect()
 
-    return context
+    # The agent lives in Snowflake, the state is unchanged
+    return {}
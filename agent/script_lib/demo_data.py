@@ -0,0 +1,190 @@
+"""Vectorized synthetic data helpers for the generated dataset scripts.
+
+Import with `import demo_data as dd`. Every function returns NumPy arrays or
+pandas objects for all `n` rows at once, so build each table column by column
+with these instead of looping over rows and calling Faker per field:
+
+- `dd.seed(value)`: make the generated data reproducible.
+- `dd.ids(n, prefix=None, start=1, width=6)`: unique IDs, integers or strings
+  like "CUST000001" when a prefix is given.
+- `dd.foreign_keys(parent_ids, n, skew=0.0, cover_all=False)`: values drawn
+  from `parent_ids`, so every key exists in the parent table. `skew` > 0 makes
+  a few parents much more common (Zipf like), `cover_all=True` uses every
+  parent at least once.
+- `dd.categorical(n, values, weights=None)`: values with the given weights.
+- `dd.dates(n, start, end, monthly=None, weekday=None, trend=0.0)`: random
+  dates with seasonality; `monthly` (12 weights) and `weekday` (7 weights,
+  Monday first) shape the distribution and `trend` > 0 favours later dates.
+- `dd.timestamps(...)`: like `dates` with random times of day.
+- `dd.time_series(start, end, freq="D", base=100.0, trend=0.0, seasonality=0.1,
+  noise=0.05)`: DataFrame of `date` and `value` with growth, yearly
+  seasonality and noise, e.g. daily revenue.
+- `dd.amounts(n, mean, sigma=0.5, decimals=2, minimum=0.0)`: positive,
+  right skewed amounts (prices, order values) with the given mean.
+- `dd.integers(n, low, high)` / `dd.normal(n, mean, std, decimals=2)`.
+- `dd.first_names(n)`, `dd.last_names(n)`, `dd.full_names(n)`, `dd.companies(n)`,
+  `dd.cities(n)`, `dd.countries(n)`, `dd.job_titles(n)`, `dd.sentences(n)`:
+  sampled from pools pre-generated once with Faker.
+- `dd.emails(first_names, last_names, domain=None)`: emails built from names.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Distinct Faker values generated per pool; values are sampled from the pool
+POOL_SIZE = 2000
+
+_rng = np.random.default_rng(42)
+_pools = {}
+
+
+def seed(value):
+    global _rng
+    _rng = np.random.default_rng(value)
+    _pools.clear()
+
+
+def ids(n, prefix=None, start=1, width=6):
+    values = np.arange(start, start + n)
+    if prefix is None:
+        return values
+    return pd.Series(values).astype(str).str.zfill(width).radd(prefix).to_numpy()
+
+
+def foreign_keys(parent_ids, n, skew=0.0, cover_all=False):
+    parent_ids = np.asarray(parent_ids)
+    if len(parent_ids) == 0:
+        raise ValueError("parent_ids is empty, generate the parent table first")
+    if skew > 0:
+        weights = 1.0 / np.arange(1, len(parent_ids) + 1) ** skew
+        # Which parents are popular shouldn't depend on their order
+        weights = _rng.permutation(weights / weights.sum())
+        keys = _rng.choice(parent_ids, size=n, p=weights)
+    else:
+        keys = parent_ids[_rng.integers(0, len(parent_ids), size=n)]
+    if cover_all and n >= len(parent_ids):
+        positions = _rng.choice(n, size=len(parent_ids), replace=False)
+        keys[positions] = parent_ids
+    return keys
+
+
+def categorical(n, values, weights=None):
+    values = np.asarray(values)
+    if weights is not None:
+        weights = np.asarray(weights, dtype="float64")
+        weights = weights / weights.sum()
+    return _rng.choice(values, size=n, p=weights)
+
+
+def _day_weights(days, monthly, weekday, trend):
+    weights = np.ones(len(days))
+    if monthly is not None:
+        weights *= np.asarray(monthly, dtype="float64")[days.month - 1]
+    if weekday is not None:
+        weights *= np.asarray(weekday, dtype="float64")[days.weekday]
+    if trend:
+        weights *= 1.0 + trend * np.linspace(0.0, 1.0, len(days))
+    return weights / weights.sum()
+
+
+def dates(n, start, end, monthly=None, weekday=None, trend=0.0):
+    days = pd.date_range(start, end, freq="D")
+    weights = _day_weights(days, monthly, weekday, trend)
+    return pd.DatetimeIndex(days.to_numpy()[_rng.choice(len(days), size=n, p=weights)])
+
+
+def timestamps(n, start, end, monthly=None, weekday=None, trend=0.0):
+    seconds = pd.to_timedelta(_rng.integers(0, 24 * 60 * 60, size=n), unit="s")
+    return dates(n, start, end, monthly, weekday, trend) + seconds
+
+
+def time_series(start, end, freq="D", base=100.0, trend=0.0, seasonality=0.1, noise=0.05):
+    index = pd.date_range(start, end, freq=freq)
+    progress = np.linspace(0.0, 1.0, len(index))
+    season = 1.0 + seasonality * np.sin(2 * np.pi * (index.dayofyear.to_numpy() / 365.25))
+    values = base * (1.0 + trend * progress) * season * _rng.normal(1.0, noise, len(index))
+    return pd.DataFrame({"date": index, "value": np.round(values, 2)})
+
+
+def amounts(n, mean, sigma=0.5, decimals=2, minimum=0.0):
+    # Lognormal with the requested mean
+    mu = np.log(mean) - sigma**2 / 2
+    return np.round(np.maximum(_rng.lognormal(mu, sigma, size=n), minimum), decimals)
+
+
+def integers(n, low, high):
+    return _rng.integers(low, high + 1, size=n)
+
+
+def normal(n, mean, std, decimals=2):
+    return np.round(_rng.normal(mean, std, size=n), decimals)
+
+
+def _pool(name):
+    if name not in _pools:
+        from faker import Faker
+
+        faker = Faker()
+        faker.seed_instance(int(_rng.integers(0, 2**31)))
+        provider = {
+            "full_names": faker.name,
+            "first_names": faker.first_name,
+            "last_names": faker.last_name,
+            "companies": faker.company,
+            "cities": faker.city,
+            "countries": faker.country,
+            "job_titles": faker.job,
+            "sentences": faker.sentence,
+        }[name]
+        _pools[name] = np.array([provider() for _ in range(POOL_SIZE)])
+    return _pools[name]
+
+
+def _sample_pool(name, n):
+    pool = _pool(name)
+    return pool[_rng.integers(0, len(pool), size=n)]
+
+
+def first_names(n):
+    return _sample_pool("first_names", n)
+
+
+def last_names(n):
+    return _sample_pool("last_names", n)
+
+
+def full_names(n):
+    return _sample_pool("full_names", n)
+
+
+def companies(n):
+    return _sample_pool("companies", n)
+
+
+def cities(n):
+    return _sample_pool("cities", n)
+
+
+def countries(n):
+    return _sample_pool("countries", n)
+
+
+def job_titles(n):
+    return _sample_pool("job_titles", n)
+
+
+def sentences(n):
+    return _sample_pool("sentences", n)
+
+
+def emails(first_names, last_names, domain=None):
+    first = pd.Series(first_names).astype(str).str.lower().str.replace(r"[^a-z]", "", regex=True)
+    last = pd.Series(last_names).astype(str).str.lower().str.replace(r"[^a-z]", "", regex=True)
+    # A number keeps emails of people with the same name apart
+    suffix = pd.Series(_rng.integers(1, 1000, size=len(first))).astype(str)
+    domains = (
+        pd.Series(np.full(len(first), domain))
+        if domain
+        else pd.Series(categorical(len(first), ["gmail.com", "yahoo.com", "outlook.com"]))
+    )
+    return (first + "." + last + suffix + "@" + domains).to_numpy()
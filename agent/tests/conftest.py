@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# The agent's modules import each other as top level packages (utils, nodes)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_directories(tmp_path, monkeypatch):
+    """Keep artifacts, workspaces and run summaries of a test in its tmp_path."""
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setenv("WORKSPACE_ROOT", str(tmp_path / "workspaces"))
+    monkeypatch.setenv("RUN_SUMMARY_DIR", str(tmp_path / "run_summaries"))
+    monkeypatch.setenv("LLM_CACHE", "none")
+    return tmp_path
+
+
+@pytest.fixture
+def fake_services():
+    """Fake chat model and Snowpark sessions answering for the small benchmark scenario.
+
+    Every session checked out of the pool is a new FakeSession; the list of
+    them is returned.
+    """
+    from benchmark.fake_llm import FakeChatModel
+    from benchmark.fake_snowflake import FakeSession
+    from benchmark.scenarios import SCENARIOS, SCHEMA, scenario_responses
+    from utils.dataset_format import dataset_format
+    from utils.llm import set_llm_factory
+    from utils.resources import release_resource
+    from utils.snowflake_pool import POOL_KEY, set_session_factory
+
+    scenario = SCENARIOS["small"]
+    sessions = []
+
+    def new_session():
+        sessions.append(FakeSession(schema=SCHEMA))
+        return sessions[-1]
+
+    responses = scenario_responses(scenario, dataset_format(), FakeSession().database)
+    set_llm_factory(
+        lambda model_name, **kwargs: FakeChatModel(
+            model_name=model_name, responses=responses, text_chars=scenario["document_chars"]
+        )
+    )
+    set_session_factory(new_session)
+    yield sessions
+    set_llm_factory(None)
+    release_resource(POOL_KEY)
+
+
+def run_build(thread_id, stream_mode=("updates",), question="A small benchmark demo"):
+    """Run a build of `thread_id` to the end, approving the demo idea, and return its chunks."""
+    from langgraph.types import Command
+
+    import app
+
+    chunks = []
+    inputs = {"question": question}
+    while True:
+        chunks.extend(app.stream_build(inputs, thread_id, stream_mode=stream_mode))
+        state = app.app.get_state(app.thread_config(thread_id))
+        if not any(task.interrupts for task in state.tasks):
+            return chunks
+        inputs = Command(resume="Looks good, go ahead")
@@ -0,0 +1,240 @@
+import importlib
+import inspect
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import run_build
+
+# Nodes of the two branches that run in parallel after GenerateDatasetScript
+STRUCTURED_BRANCH = {
+    "CheckDatasetScript",
+    "ExecuteDatasetScript",
+    "UploadToSnowflake",
+    "GenerateSemanticModel",
+    "CheckSemanticModel",
+    "UploadSemanticModel",
+}
+DOCUMENT_BRANCH = {"GenerateDocumentData", "UploadDocuments", "CreateCortexSearch"}
+
+# Where the routing functions send a build that goes well
+ROUTES = {
+    "evaluate_human_feedback": "GenerateDatasetScript",
+    "evaluate_script_run": "UploadToSnowflake",
+}
+
+
+@pytest.fixture
+def stub_app():
+    """The graph of app.py with every node replaced by a stub.
+
+    Call the fixture with the seconds a node function sleeps, by function name.
+    Stubs return no state updates, routing functions follow ROUTES.
+    """
+    import app
+
+    stubs = pytest.MonkeyPatch()
+
+    def install(sleeps):
+        for module_name, module in list(sys.modules.items()):
+            if not module_name.startswith("nodes."):
+                continue
+            for name, function in inspect.getmembers(module, inspect.isfunction):
+                if function.__module__ == module_name:
+                    stubs.setattr(module, name, _stub(name, sleeps.get(name, 0)))
+        return importlib.reload(app)
+
+    yield install
+    stubs.undo()
+    importlib.reload(app)
+
+
+def _stub(name, seconds):
+    def node(context, writer):
+        time.sleep(seconds)
+        return ROUTES.get(name, {})
+
+    return node
+
+
+def test_branches_run_at_the_same_time(stub_app):
+    sleeps = {
+        "check_dataset_script": 0.3,
+        "execute_dataset_script": 0.3,
+        "generate_document_data": 0.3,
+        "upload_documents": 0.3,
+    }
+    app = stub_app(sleeps)
+
+    start = time.perf_counter()
+    app.app.invoke({"question": "A demo"}, {"configurable": {"thread_id": "timing"}})
+    elapsed = time.perf_counter() - start
+
+    # One after the other the two branches would take 1.2s
+    assert elapsed < sum(sleeps.values())
+
+
+def test_parallel_branches_write_separate_keys(fake_services):
+    import app
+
+    updates = {}
+    for _, chunk in run_build("branches"):
+        for node, update in chunk.items():
+            if node == "__interrupt__":
+                continue
+            updates.setdefault(node, set()).update(update or {})
+
+    assert STRUCTURED_BRANCH | DOCUMENT_BRANCH <= set(updates)
+    structured_keys = set().union(*(updates[node] for node in STRUCTURED_BRANCH))
+    document_keys = set().union(*(updates[node] for node in DOCUMENT_BRANCH))
+    assert structured_keys.isdisjoint(document_keys)
+    # Nodes return what they changed, not the whole state
+    assert updates["UploadToSnowflake"] == {"snowflake_stage", "table_info_ref", "upload_stats"}
+    assert updates["GenerateToolDescriptions"] == {"snowflake_data_description", "documents_description"}
+    assert not updates["CreateAgent"]
+    state = app.app.get_state(app.thread_config("branches")).values
+    assert state["cortex_search_path"] and state["semantic_model_path"]
+
+
+def test_build_breakdown_follows_the_final_response(fake_services):
+    import app
+    from utils.run_stats import format_run_summary, load_run_summary
+
+    run_build("breakdown")
+
+    response = app.app.get_state(app.thread_config("breakdown")).values["final_response"]
+    answer, breakdown = response.split("\n\n### Build breakdown\n\n")
+    assert answer
+    # format_run_summary's table, not an LLM's copy of it
+    lines = breakdown.splitlines()
+    assert lines[:2] == format_run_summary(load_run_summary("breakdown")).splitlines()[:2]
+    assert "| ExecuteDatasetScript |" in breakdown and lines[-1].startswith("| Total |")
+
+
+def _final_state(app, thread_id):
+    """State of a finished build, without timings and the path of its workspace."""
+    state = dict(app.app.get_state(app.thread_config(thread_id)).values)
+    del state["script_started_at"]
+    state["final_response"] = state["final_response"].split("### Build breakdown")[0]
+    state["documents_file"] = os.path.basename(state["documents_file"])
+    state["upload_stats"] = {**state["upload_stats"], "timings": None}
+    state["script_run_stats"] = state["script_run_stats"]["data_files"]
+    state["script_attempts"] = [
+        (attempt["strategy"], attempt["error"]) for attempt in state["script_attempts"]
+    ]
+    return state
+
+
+@pytest.fixture
+def sqlite_app(monkeypatch, tmp_path):
+    """The graph compiled with a SqliteSaver checkpointer in a temporary file."""
+    import app
+    from utils.checkpoints import create_checkpointer
+
+    monkeypatch.setenv("CHECKPOINTER", "sqlite")
+    monkeypatch.setenv("CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(app, "app", app.workflow.compile(checkpointer=create_checkpointer()))
+    return app
+
+
+def test_resume_skips_completed_nodes(fake_services, sqlite_app, monkeypatch):
+    from benchmark.fake_snowflake import FakeSession
+    from utils.checkpoints import create_checkpointer
+    from utils.run_stats import load_run_summary
+
+    run_build("uninterrupted")
+
+    fake_sql = FakeSession.sql
+    failures = []
+
+    def sql(self, query, *args, **kwargs):
+        # Fails once, in the step that also runs UploadToSnowflake on the other branch
+        if "CORTEX SEARCH SERVICE" in query and not failures:
+            failures.append(query)
+            raise RuntimeError("Snowflake went away")
+        return fake_sql(self, query, *args, **kwargs)
+
+    monkeypatch.setattr(FakeSession, "sql", sql)
+    with pytest.raises(RuntimeError, match="Snowflake went away"):
+        run_build("interrupted")
+    assert sqlite_app.resumable_nodes("interrupted") == ("CreateCortexSearch",)
+
+    # As after a restart, from a new connection to the checkpoint file
+    monkeypatch.setattr(
+        sqlite_app, "app", sqlite_app.workflow.compile(checkpointer=create_checkpointer())
+    )
+    list(sqlite_app.resume("interrupted"))
+
+    def runs(thread_id):
+        return {name: node["runs"] for name, node in load_run_summary(thread_id)["nodes"].items()}
+
+    # Only the node that failed ran again
+    assert runs("interrupted") == {**runs("uninterrupted"), "CreateCortexSearch": 2}
+    assert _final_state(sqlite_app, "interrupted") == _final_state(sqlite_app, "uninterrupted")
+
+
+def test_stale_workspace_of_a_waiting_build_is_kept(fake_services):
+    import app
+    from utils.workspace import prune_workspaces, workspace_dir
+
+    # Stops at AskUserFeedback
+    list(app.stream_build({"question": "A small benchmark demo"}, "waiting", stream_mode=("updates",)))
+    assert app.app.get_state(app.thread_config("waiting")).next == ("AskUserFeedback",)
+    finished = workspace_dir("finished")
+    waiting = workspace_dir("waiting")
+    for directory in (finished, waiting):
+        os.utime(directory, (0, 0))
+
+    prune_workspaces()
+
+    assert os.path.isdir(waiting) and not os.path.exists(finished)
+
+
+def test_concurrent_builds_are_isolated(fake_services, monkeypatch):
+    from benchmark.fake_llm import FakeChatModel
+    from benchmark.fake_snowflake import FakeSession
+    from benchmark.scenarios import SCENARIOS, scenario_responses
+    from utils.artifacts import load_artifact
+    from utils.dataset_format import dataset_format
+    from utils.llm import set_llm_factory
+    from utils.workspace import DATA_DIRECTORY, workspace_dir, workspace_name
+
+    import app
+
+    monkeypatch.setenv("WORKSPACE_CLEANUP", "never")
+    scenarios = {
+        "build-a": {**SCENARIOS["small"], "rows": 2_000},
+        "build-b": {**SCENARIOS["small"], "tables": 2, "rows": 3_000},
+    }
+    responses = {
+        thread_id: scenario_responses(scenario, dataset_format(), FakeSession().database)
+        for thread_id, scenario in scenarios.items()
+    }
+    # Each build gets the answers of its own scenario
+    set_llm_factory(
+        lambda model_name, **kwargs: FakeChatModel(
+            model_name=model_name, responses=responses[workspace_name()], text_chars=2_000
+        )
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(run_build, scenarios))
+
+    states = {
+        thread_id: app.app.get_state(app.thread_config(thread_id)).values for thread_id in scenarios
+    }
+    assert workspace_dir("build-a") != workspace_dir("build-b")
+    assert states["build-a"]["script_ref"] != states["build-b"]["script_ref"]
+    assert "dd.ids(200)" in load_artifact(states["build-a"]["script_ref"])
+    assert "dd.ids(300)" in load_artifact(states["build-b"]["script_ref"])
+    for thread_id, expected in [
+        ("build-a", {"CUSTOMERS": 200, "ORDERS": 2_000, "SHIPMENTS": 2_000}),
+        ("build-b", {"CUSTOMERS": 300, "ORDERS": 3_000}),
+    ]:
+        data_files = os.listdir(os.path.join(workspace_dir(thread_id), DATA_DIRECTORY))
+        assert sorted(os.path.splitext(name)[0] for name in data_files) == sorted(expected)
+        assert states[thread_id]["upload_stats"]["rows_loaded"] == expected
+        assert states[thread_id]["documents_file"].startswith(workspace_dir(thread_id))
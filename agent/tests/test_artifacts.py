@@ -0,0 +1,37 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.artifacts import load_artifact, load_json_artifact, save_artifact, save_json_artifact
+
+
+def test_artifacts_are_content_addressed(isolated_directories):
+    ref = save_artifact("print('hello')")
+
+    assert save_artifact("print('hello')") == ref
+    assert save_artifact("print('bye')") != ref
+    assert load_artifact(ref) == "print('hello')"
+    assert os.path.isfile(isolated_directories / "artifacts" / ref[:2] / ref)
+
+
+def test_missing_reference_loads_as_empty():
+    assert load_artifact(None) == ""
+    assert load_artifact("") == ""
+    assert load_json_artifact(None, default=[]) == []
+
+
+def test_json_artifacts():
+    value = {"tables": [{"name": "ORDERS", "rows": 10}], "unicode": "Zürich"}
+
+    assert load_json_artifact(save_json_artifact(value)) == value
+
+
+def test_concurrent_saves_of_the_same_content(isolated_directories):
+    content = "x" * 1_000_000
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        refs = set(pool.map(lambda _: save_artifact(content), range(16)))
+
+    (ref,) = refs
+    assert load_artifact(ref) == content
+    # No temporary files are left behind
+    assert os.listdir(isolated_directories / "artifacts" / ref[:2]) == [ref]
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import batch
+from utils import workspace
+
+
+def test_read_requests(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    path.write_text(
+        '{"prompt": "A retail demo", "feedback": "More stores"}\n'
+        "\n"
+        '{"request_id": "r-2", "title": "Telco", "body": "Churn analysis"}\n'
+    )
+
+    requests = batch.read_requests(str(path))
+
+    assert [(request["id"], request["prompt"]) for request in requests] == [
+        ("1", "A retail demo"),
+        ("r-2", "Telco\n\nChurn analysis"),
+    ]
+    assert batch._scripted_replies(requests[0]) == ["More stores"]
+
+
+def test_request_without_prompt_is_rejected(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    path.write_text('{"id": "empty"}\n')
+
+    with pytest.raises(ValueError, match="requests.jsonl:1 has no prompt"):
+        batch.read_requests(str(path))
+
+
+def test_workers_are_capped_at_the_build_slots(fake_services, monkeypatch, tmp_path, capsys):
+    monkeypatch.setenv("MAX_CONCURRENT_BUILDS", "1")
+    # More workers than slots would make the second build time out in the queue
+    monkeypatch.setenv("BUILD_QUEUE_TIMEOUT_SECONDS", "0.01")
+    monkeypatch.setattr(workspace, "_build_slots", None)
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text('{"id": "a", "prompt": "First demo"}\n{"id": "b", "prompt": "Second demo"}\n')
+    output = tmp_path / "results.jsonl"
+
+    exit_code = batch.main([str(requests), "--output", str(output), "--workers", "4", "--quiet"])
+
+    assert exit_code == 0
+    assert "using 1 worker(s)" in capsys.readouterr().out
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted((result["id"], result["status"]) for result in results) == [
+        ("a", "succeeded"),
+        ("b", "succeeded"),
+    ]
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import script_lib.demo_data as dd
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    dd.seed(7)
+
+
+def test_seed_makes_data_reproducible():
+    first = (dd.integers(5, 1, 100), dd.cities(5))
+    dd.seed(7)
+    second = (dd.integers(5, 1, 100), dd.cities(5))
+
+    assert first[0].tolist() == second[0].tolist()
+    assert first[1].tolist() == second[1].tolist()
+
+
+def test_ids():
+    assert dd.ids(3).tolist() == [1, 2, 3]
+    assert dd.ids(2, prefix="CUST", start=9, width=4).tolist() == ["CUST0009", "CUST0010"]
+
+
+def test_foreign_keys_exist_in_the_parent_table():
+    parents = dd.ids(50, prefix="C")
+
+    keys = dd.foreign_keys(parents, 1_000, skew=1.2, cover_all=True)
+
+    assert set(keys) == set(parents)
+    # Skewed: the most common parent is far above the average of 20
+    assert pd.Series(keys).value_counts().iloc[0] > 60
+
+
+def test_foreign_keys_need_a_parent_table():
+    with pytest.raises(ValueError, match="parent_ids is empty"):
+        dd.foreign_keys([], 10)
+
+
+def test_categorical_weights():
+    values = pd.Series(dd.categorical(10_000, ["a", "b"], [9, 1]))
+
+    assert values.value_counts(normalize=True)["a"] == pytest.approx(0.9, abs=0.02)
+
+
+def test_dates_follow_the_seasonality():
+    monthly = [0] * 11 + [1]
+    days = dd.dates(1_000, "2024-01-01", "2024-12-31", monthly=monthly, weekday=[1] * 5 + [0, 0])
+
+    assert (days.month == 12).all()
+    assert (days.weekday < 5).all()
+    times = dd.timestamps(100, "2024-01-01", "2024-01-31")
+    assert times.min() >= pd.Timestamp("2024-01-01") and times.max() < pd.Timestamp("2024-02-01")
+
+
+def test_time_series():
+    series = dd.time_series("2024-01-01", "2024-12-31", base=100.0, trend=1.0, noise=0.0)
+
+    assert list(series.columns) == ["date", "value"] and len(series) == 366
+    # Doubles over the year with the trend, seasonality aside
+    assert series["value"].iloc[-1] / series["value"].iloc[0] == pytest.approx(2.0, rel=0.15)
+
+
+def test_numbers():
+    amounts = dd.amounts(100_000, mean=50.0, minimum=1.0)
+    assert amounts.min() >= 1.0 and amounts.mean() == pytest.approx(50.0, rel=0.05)
+    assert np.array_equal(amounts, np.round(amounts, 2))
+
+    integers = dd.integers(1_000, 1, 3)
+    assert set(integers) == {1, 2, 3}
+    assert dd.normal(100_000, 10.0, 2.0).std() == pytest.approx(2.0, rel=0.05)
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [dd.first_names, dd.last_names, dd.full_names, dd.companies, dd.cities, dd.countries, dd.job_titles, dd.sentences],
+)
+def test_faker_pools(sample):
+    values = sample(5_000)
+
+    assert len(values) == 5_000
+    # Sampled from a pool of POOL_SIZE values generated once
+    assert len(set(values)) <= dd.POOL_SIZE
+
+
+def test_emails():
+    emails = dd.emails(["Ann-Marie", "Bob"], ["O'Neil", "Smith"], domain="example.com")
+
+    assert emails[0].startswith("annmarie.oneil") and emails[0].endswith("@example.com")
+    assert emails[1].startswith("bob.smith")
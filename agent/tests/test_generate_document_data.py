@@ -0,0 +1,68 @@
+import re
+import threading
+import time
+
+import pandas as pd
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmark.fake_llm import FakeChatModel
+from nodes.generate_document_data import generate_document_data
+from utils.llm import set_llm_factory
+
+DOCUMENTS = 7
+# Documents being written right now and the most written at once
+LOCK = threading.Lock()
+RUNNING = []
+PEAK = [0]
+
+
+class TitleEchoModel(FakeChatModel):
+    """Writes each document as its title, later documents finishing first."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(message.content) for message in messages)
+        number = int(re.search(r"Title: Document (\d+)", prompt).group(1))
+        with LOCK:
+            RUNNING.append(number)
+            PEAK[0] = max(PEAK[0], len(RUNNING))
+        time.sleep(0.05 * (DOCUMENTS - number))
+        with LOCK:
+            RUNNING.remove(number)
+        text = f"Body of document {number}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+@pytest.fixture
+def echo_llm():
+    responses = {
+        "documents": [
+            {
+                "title": f"Document {i}",
+                "url": f"https://example.com/{i}",
+                "generation_description": "A policy document.",
+            }
+            for i in range(1, DOCUMENTS + 1)
+        ]
+    }
+    PEAK[0] = 0
+    set_llm_factory(lambda model_name, **kwargs: TitleEchoModel(model_name=model_name, responses=responses))
+    yield
+    set_llm_factory(None)
+
+
+@pytest.mark.parametrize("data_format", ["parquet", "csv"])
+def test_documents_keep_their_order_when_generated_concurrently(echo_llm, monkeypatch, data_format):
+    monkeypatch.setenv("DOCUMENT_GENERATION_CONCURRENCY", "3")
+    monkeypatch.setenv("DATASET_FORMAT", data_format)
+
+    result = generate_document_data({"demo_description": "A demo"}, lambda message: None)
+
+    path = result["documents_file"]
+    documents = pd.read_parquet(path) if data_format == "parquet" else pd.read_csv(path)
+    assert documents["DOCUMENT_TITLE"].tolist() == [f"Document {i}" for i in range(1, DOCUMENTS + 1)]
+    assert documents["TEXT"].tolist() == [f"Body of document {i}" for i in range(1, DOCUMENTS + 1)]
+    assert documents["DOCUMENT_URL"].tolist()[0] == "https://example.com/1"
+    # Concurrent, but no more than DOCUMENT_GENERATION_CONCURRENCY at a time
+    assert PEAK[0] == 3
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import openai
+import pytest
+
+from utils import llm
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}
+    ],
+    "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+}
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Route the shared HTTP client of `get_llm` through a MockTransport.
+
+    Call the fixture with the handler for the requests.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    # Fresh per-model semaphores, sized from the environment of the test
+    monkeypatch.setattr(llm, "_semaphores", {})
+
+    def install(handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(llm, "get_http_client", lambda: client)
+
+    return install
+
+
+def test_requests_per_model_are_capped(transport, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    lock = threading.Lock()
+    in_flight = {"now": 0, "peak": 0}
+
+    def handler(request):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.05)
+        with lock:
+            in_flight["now"] -= 1
+        return httpx.Response(200, json=COMPLETION)
+
+    transport(handler)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        answers = list(
+            pool.map(lambda i: llm.get_llm("gpt-4o-mini").invoke(f"question {i}").content, range(6))
+        )
+
+    assert answers == ["ok"] * 6
+    assert in_flight["peak"] == 2
+
+
+def test_rate_limited_requests_wait_for_retry_after(transport, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "3")
+    sent = []
+
+    def handler(request):
+        sent.append(time.perf_counter())
+        if len(sent) < 3:
+            return httpx.Response(429, headers={"retry-after-ms": "200"}, json={"error": {}})
+        return httpx.Response(200, json=COMPLETION)
+
+    transport(handler)
+
+    assert llm.get_llm("gpt-4o-mini").invoke("question").content == "ok"
+    assert len(sent) == 3
+    assert all(later - earlier >= 0.2 for earlier, later in zip(sent, sent[1:]))
+
+
+def test_server_errors_back_off_exponentially(transport, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "2")
+    sent = []
+
+    def handler(request):
+        sent.append(time.perf_counter())
+        return httpx.Response(503, json={"error": {"message": "overloaded"}})
+
+    transport(handler)
+
+    with pytest.raises(openai.InternalServerError):
+        llm.get_llm("gpt-4o-mini").invoke("question")
+    # One request and LLM_MAX_RETRIES retries, waiting 0.375-0.5s and then 0.75-1s
+    assert len(sent) == 3
+    first_wait, second_wait = sent[1] - sent[0], sent[2] - sent[1]
+    assert 0.3 <= first_wait < second_wait
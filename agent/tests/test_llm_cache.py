@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from langchain_core.outputs import Generation
+
+from utils.llm_cache import InMemoryLRUCache, SQLiteCache, create_cache_from_env
+from utils.run_stats import instrument_node, load_run_summary
+
+LLM_STRING = "model=gpt-4o-mini"
+
+
+def _answer(text):
+    return [Generation(text=text)]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return InMemoryLRUCache(**kwargs)
+        return SQLiteCache(str(tmp_path / "cache.sqlite"), **kwargs)
+
+    return make
+
+
+def test_hits_and_misses_are_counted(make_cache):
+    cache = make_cache()
+
+    assert cache.lookup("prompt", LLM_STRING) is None
+    cache.update("prompt", LLM_STRING, _answer("cached"))
+
+    assert cache.lookup("prompt", LLM_STRING) == _answer("cached")
+    # Same prompt, different model or structured output schema
+    assert cache.lookup("prompt", "model=gpt-4o") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+
+def test_least_recently_used_entries_are_evicted(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.update("a", LLM_STRING, _answer("a"))
+    cache.update("b", LLM_STRING, _answer("b"))
+    cache.lookup("a", LLM_STRING)
+
+    cache.update("c", LLM_STRING, _answer("c"))
+
+    assert cache.lookup("b", LLM_STRING) is None
+    assert cache.lookup("a", LLM_STRING) == _answer("a")
+    assert cache.size() == 2
+
+
+def test_entries_expire(make_cache, monkeypatch):
+    cache = make_cache(ttl_seconds=60)
+    cache.update("prompt", LLM_STRING, _answer("cached"))
+
+    now = time.time()
+    monkeypatch.setattr("utils.llm_cache.time.time", lambda: now + 61)
+
+    assert cache.lookup("prompt", LLM_STRING) is None
+    assert cache.size() == 0
+
+
+def test_sqlite_cache_survives_restarts(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteCache(path).update("prompt", LLM_STRING, _answer("cached"))
+
+    assert SQLiteCache(path).lookup("prompt", LLM_STRING) == _answer("cached")
+
+
+@pytest.mark.parametrize(
+    "backend, expected", [("none", type(None)), ("memory", InMemoryLRUCache), ("sqlite", SQLiteCache)]
+)
+def test_backend_from_env(backend, expected, monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE", backend)
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+
+    assert isinstance(create_cache_from_env(), expected)
+
+
+def test_lookups_are_counted_per_build():
+    cache = InMemoryLRUCache()
+    cache.update("earlier build", LLM_STRING, _answer("cached"))
+    cache.lookup("earlier build", LLM_STRING)  # Outside of any node
+
+    def node(context, writer):
+        cache.lookup("earlier build", LLM_STRING)
+        cache.lookup("new prompt", LLM_STRING)
+        return {}
+
+    events = []
+    instrument_node("Node", node)({}, events.append)
+
+    assert events[0]["llm_cache_hits"] == 1 and events[0]["llm_cache_misses"] == 1
+    assert load_run_summary()["totals"]["llm_cache_hits"] == 1
+    # The process wide counters include the lookup of the other build
+    assert cache.stats()["hits"] == 2
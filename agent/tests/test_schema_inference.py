@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.schema_inference import (
+    apply_schema,
+    coerce_to_schema,
+    infer_column_type,
+    infer_schema,
+    schema_from_arrow,
+    widen_for_chunks,
+    widen_numbers,
+)
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["true", "False", "TRUE", None], "BOOLEAN"),
+        (["2024-01-31", "2023-12-01", None], "DATE"),
+        (["2024-01-31 10:15:00", "2023-12-01T08:00:00.123", None], "TIMESTAMP_NTZ"),
+        (["yes", "no"], "VARCHAR"),
+        # Ten characters, but not dates
+        (["abcdefghij", "0123456789"], "VARCHAR"),
+    ],
+)
+def test_text_columns(values, expected):
+    assert infer_column_type(pd.Series(values, dtype=object)) == expected
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([1, 2, 3], "NUMBER(38,0)"),
+        ([1.0, 2.0, np.nan], "NUMBER(38,0)"),
+        ([19.99, 5.5, 100.0], "NUMBER(38,2)"),
+        ([0.123456, 1.0], "NUMBER(38,6)"),
+        ([1 / 3, 2 / 3], "FLOAT"),
+        ([np.inf, 1.25], "NUMBER(38,2)"),
+        # Too small for the largest scale, not zero
+        ([0.0000003, 1.0], "FLOAT"),
+        ([0.000004, 0.1 + 0.2], "NUMBER(38,6)"),
+    ],
+)
+def test_numeric_columns(values, expected):
+    assert infer_column_type(pd.Series(values)) == expected
+
+
+def test_native_dtypes_are_kept():
+    df = pd.DataFrame(
+        {
+            "FLAG": [True, False],
+            "CREATED_AT": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+            "ID": [1, 2],
+        }
+    )
+
+    assert infer_schema(df) == {
+        "FLAG": "BOOLEAN",
+        "CREATED_AT": "TIMESTAMP_NTZ",
+        "ID": "NUMBER(38,0)",
+    }
+
+
+def test_arrow_decimals_wider_than_snowflake_become_float():
+    pa = pytest.importorskip("pyarrow")
+    from decimal import Decimal
+
+    table = pa.table(
+        {
+            "price": pa.array([Decimal("19.99")], pa.decimal128(10, 2)),
+            "balance": pa.array([Decimal("12345.678")], pa.decimal256(60, 3)),
+        }
+    )
+    df = table.to_pandas()
+    df.columns = [column.upper() for column in df.columns]
+
+    assert schema_from_arrow(table.schema, df) == {"PRICE": "NUMBER(10,2)", "BALANCE": "FLOAT"}
+    assert df["BALANCE"].tolist() == [12345.678]
+
+
+def test_apply_schema_converts_and_sizes_varchar():
+    df = pd.DataFrame(
+        {
+            "DAY": ["2024-01-31", "2024-02-01"],
+            "ACTIVE": ["true", "false"],
+            "NAME": ["Ann", "Bartholomew"],
+            "EMPTY": [None, None],
+        }
+    )
+
+    schema = apply_schema(df, infer_schema(df))
+
+    assert schema == {
+        "DAY": "DATE",
+        "ACTIVE": "BOOLEAN",
+        "NAME": "VARCHAR(11)",
+        "EMPTY": "VARCHAR(1)",
+    }
+    assert df["DAY"].tolist() == [pd.Timestamp("2024-01-31").date(), pd.Timestamp("2024-02-01").date()]
+    assert df["ACTIVE"].tolist() == [True, False]
+
+
+def test_scale_missed_by_the_sample_is_widened():
+    df = pd.DataFrame({"AMOUNT": [1.5] * 50_000})
+    df.loc[25_000, "AMOUNT"] = 1.123
+
+    # The deterministic 10k row sample misses the value with three decimals
+    sampled = infer_schema(df, sample_fraction=0.01, min_sample_rows=10_000)
+    assert sampled == {"AMOUNT": "NUMBER(38,1)"}
+    assert infer_schema(df) == {"AMOUNT": "NUMBER(38,3)"}
+    assert apply_schema(df, sampled) == {"AMOUNT": "NUMBER(38,3)"}
+
+
+def test_small_frames_are_not_sampled():
+    df = pd.DataFrame({"AMOUNT": [1.5] * 999 + [1.123]})
+
+    assert infer_schema(df, sample_fraction=0.01, min_sample_rows=10_000) == {"AMOUNT": "NUMBER(38,3)"}
+
+
+@pytest.mark.parametrize(
+    "sampled_type, values, expected",
+    [
+        # Most rows aren't dates in the full data
+        ("DATE", ["2024-01-01", "n/a", "unknown", "tbd"], "VARCHAR(10)"),
+        ("TIMESTAMP_NTZ", ["2024-01-01 10:00:00", "later", "soon", "never"], "VARCHAR(19)"),
+        ("BOOLEAN", ["true", "false", "maybe"], "VARCHAR(5)"),
+    ],
+)
+def test_full_data_falls_back_to_varchar(sampled_type, values, expected):
+    df = pd.DataFrame({"COLUMN": values})
+
+    assert apply_schema(df, {"COLUMN": sampled_type}) == {"COLUMN": expected}
+    # Left as text
+    assert df["COLUMN"].tolist() == values
+
+
+def test_full_data_widens_numbers():
+    df = pd.DataFrame({"SCALED": [1.5, 1 / 3], "WHOLE": [1.0, 2.5], "INTEGER": [1, 2]})
+
+    assert apply_schema(
+        df, {"SCALED": "NUMBER(38,1)", "WHOLE": "NUMBER(38,0)", "INTEGER": "NUMBER(38,0)"}
+    ) == {
+        "SCALED": "FLOAT",
+        "WHOLE": "NUMBER(38,1)",
+        "INTEGER": "NUMBER(38,0)",
+    }
+
+
+def test_dates_that_do_not_parse_become_null():
+    df = pd.DataFrame({"DAY": ["2024-01-01"] * 9 + ["not a date"]})
+
+    assert apply_schema(df, {"DAY": "DATE"}) == {"DAY": "DATE"}
+    assert df["DAY"].isna().sum() == 1
+
+
+def test_widen_for_chunks_drops_varchar_lengths():
+    assert widen_for_chunks({"NAME": "VARCHAR(11)", "ID": "NUMBER(38,0)"}) == {
+        "NAME": "VARCHAR",
+        "ID": "NUMBER(38,0)",
+    }
+
+
+def test_coerce_to_schema_converts_later_chunks():
+    chunk = pd.DataFrame(
+        {
+            "DAY": ["2024-03-01", "garbage"],
+            "ACTIVE": ["TRUE", "false"],
+            "AMOUNT": ["1.5", "x"],
+            "CODE": [1, 2],
+        }
+    )
+
+    coerce_to_schema(
+        chunk, {"DAY": "DATE", "ACTIVE": "BOOLEAN", "AMOUNT": "FLOAT", "CODE": "VARCHAR"}
+    )
+
+    assert chunk["DAY"].iloc[0] == pd.Timestamp("2024-03-01").date()
+    assert pd.isna(chunk["DAY"].iloc[1])
+    assert chunk["ACTIVE"].tolist() == [True, False]
+    assert chunk["AMOUNT"].iloc[0] == 1.5 and pd.isna(chunk["AMOUNT"].iloc[1])
+    assert chunk["CODE"].tolist() == ["1", "2"]
+
+
+def test_widen_numbers_scans_later_chunks():
+    schema = {"AMOUNT": "NUMBER(38,1)", "ID": "NUMBER(38,0)", "RATIO": "NUMBER(38,2)"}
+    chunks = [
+        pd.DataFrame({"AMOUNT": [1.25], "ID": [7], "RATIO": [0.5]}),
+        pd.DataFrame({"AMOUNT": ["2.125"], "ID": [8], "RATIO": [1 / 3]}),
+    ]
+
+    assert widen_numbers(schema, chunks) == {
+        "AMOUNT": "NUMBER(38,3)",
+        "ID": "NUMBER(38,0)",
+        "RATIO": "FLOAT",
+    }
+
+
+def test_coerce_to_schema_refuses_to_round():
+    chunk = pd.DataFrame({"AMOUNT": [1.5, 1.25]})
+
+    with pytest.raises(ValueError, match="AMOUNT needs NUMBER\\(38,2\\)"):
+        coerce_to_schema(chunk, {"AMOUNT": "NUMBER(38,1)"})
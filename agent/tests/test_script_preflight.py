@@ -0,0 +1,120 @@
+import textwrap
+
+import pytest
+
+from utils.script_preflight import preflight_script
+
+
+def _preflight(script):
+    return preflight_script(textwrap.dedent(script))
+
+
+def test_good_script_passes():
+    findings, rows = _preflight(
+        """
+        import os
+        import numpy as np
+        import pandas as pd
+        import demo_data as dd
+
+        ROWS = 10_000
+        os.makedirs("generated_csvs", exist_ok=True)
+        orders = pd.DataFrame({"AMOUNT": np.random.normal(size=ROWS), "ID": dd.ids(ROWS)})
+        orders.to_parquet(os.path.join("generated_csvs", "ORDERS.parquet"), index=False)
+        with open(f"generated_csvs/{ROWS}.txt", "w") as f:
+            f.write("done")
+        """
+    )
+
+    assert findings == []
+    assert rows == 10_000
+
+
+def test_syntax_errors_are_reported_with_the_line():
+    findings, rows = _preflight(
+        """
+        import pandas as pd
+        df = pd.DataFrame(
+        """
+    )
+
+    assert len(findings) == 1 and findings[0].startswith("line 3: syntax error")
+    assert rows == 0
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("import subprocess", "line 1: `subprocess` must not be used"),
+        ("from urllib.request import urlopen", "line 1: `urllib.request` must not be used"),
+        ("import polars as pl", "line 1: `polars` is not available"),
+    ],
+)
+def test_imports(source, expected):
+    findings, _ = _preflight(source)
+
+    assert findings[0].startswith(expected)
+
+
+def test_standard_library_imports_are_allowed():
+    assert _preflight("import json, random, datetime\nfrom collections import Counter")[0] == []
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        'df.to_csv("ORDERS.csv")',
+        'df.to_csv("/tmp/ORDERS.csv")',
+        'df.to_parquet(path_or_buf="generated_csvs/../ORDERS.parquet")',
+        'df.to_csv(os.path.join("data", "ORDERS.csv"))',
+        'open("notes.txt", "w")',
+        'os.chdir("/tmp")',
+    ],
+)
+def test_writes_outside_the_output_directory(write):
+    findings, _ = _preflight(f"import os\n{write}")
+
+    assert len(findings) == 1 and findings[0].startswith("line 2: ")
+
+
+def test_dynamic_paths_get_the_benefit_of_the_doubt():
+    findings, _ = _preflight(
+        """
+        for name, df in tables.items():
+            df.to_csv(f"{folder}/{name}.csv")
+        open("generated_csvs/ORDERS.csv").read()
+        """
+    )
+
+    assert findings == []
+
+
+def test_nested_loops_multiply(monkeypatch):
+    monkeypatch.setenv("SCRIPT_MAX_ROWS", "1000000")
+
+    findings, rows = _preflight(
+        """
+        CUSTOMERS = 2_000
+        rows = []
+        for customer in range(CUSTOMERS):
+            for order in range(1, 1001):
+                rows.append((customer, order))
+        """
+    )
+
+    assert rows == 2_000_000
+    assert findings == [
+        "line 5: generates about 2,000,000 rows, keep the data under 1,000,000 rows so the demo loads quickly"
+    ]
+
+
+def test_size_arguments_count_as_rows():
+    _, rows = _preflight(
+        """
+        N = 10 ** 5
+        values = np.random.randint(0, 10, size=N * 3)
+        names = [fake.name() for _ in range(int(N / 2))]
+        """
+    )
+
+    assert rows == 300_000
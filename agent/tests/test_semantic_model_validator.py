@@ -0,0 +1,208 @@
+import pytest
+import yaml
+
+from nodes.check_semantic_model import _strip_code_fences
+from utils.semantic_model_validator import validate_semantic_model
+
+TABLE_INFO = [
+    {
+        "fully_qualified_name": '"DEMO_DB"."SALES"."CUSTOMERS"',
+        "columns": [
+            {"column_name": "CUSTOMER_ID", "column_type": "NUMBER(38,0)"},
+            {"column_name": "REGION", "column_type": "VARCHAR(16)"},
+        ],
+    },
+    {
+        "fully_qualified_name": '"DEMO_DB"."SALES"."ORDERS"',
+        "columns": [
+            {"column_name": "ORDER_ID", "column_type": "NUMBER(38,0)"},
+            {"column_name": "CUSTOMER_ID", "column_type": "NUMBER(38,0)"},
+            {"column_name": "AMOUNT", "column_type": "NUMBER(38,2)"},
+        ],
+    },
+]
+
+
+def _table(name, dimensions=(), facts=()):
+    return {
+        "name": name.lower(),
+        "description": f"The {name.lower()}",
+        "base_table": {"database": "DEMO_DB", "schema": "SALES", "table": name},
+        "dimensions": list(dimensions),
+        "facts": list(facts),
+    }
+
+
+def _model(**overrides):
+    model = {
+        "name": "sales",
+        "description": "Customers and their orders",
+        "tables": [
+            _table(
+                "CUSTOMERS",
+                dimensions=[
+                    {"name": "customer_id", "expr": "CUSTOMER_ID", "data_type": "NUMBER"},
+                    {"name": "region", "expr": "REGION", "data_type": "VARCHAR"},
+                ],
+            ),
+            _table(
+                "ORDERS",
+                dimensions=[{"name": "order_id", "expr": "ORDER_ID", "data_type": "NUMBER"}],
+                facts=[{"name": "amount", "expr": "AMOUNT", "data_type": "NUMBER"}],
+            ),
+        ],
+    }
+    model.update(overrides)
+    return model
+
+
+def _validate(model):
+    yaml_content, repairs, violations = validate_semantic_model(yaml.safe_dump(model), TABLE_INFO)
+    return yaml.safe_load(yaml_content), repairs, violations
+
+
+def test_valid_model_is_left_alone():
+    yaml_content = yaml.safe_dump(_model())
+
+    assert validate_semantic_model(yaml_content, TABLE_INFO) == (yaml_content, [], [])
+
+
+def test_structure_is_repaired():
+    model = {"semantic_model": _model(verified_queries=[{"name": "q"}], owner="me")}
+    model["semantic_model"]["tables"][1]["metrics"] = [{"name": "total"}]
+    model["semantic_model"]["tables"][1]["base_table"]["schema"] = "PUBLIC"
+
+    repaired, repairs, violations = _validate(model)
+
+    assert violations == []
+    assert set(repaired) == {"name", "description", "tables"}
+    assert "metrics" not in repaired["tables"][1]
+    assert repaired["tables"][1]["base_table"] == {
+        "database": "DEMO_DB",
+        "schema": "SALES",
+        "table": "ORDERS",
+    }
+    assert len(repairs) == 5
+
+
+def test_unknown_tables_and_columns_are_violations():
+    model = _model()
+    model["tables"][1]["facts"].append({"name": "tax", "expr": "TAX", "data_type": "NUMBER"})
+    model["tables"].append(_table("RETURNS"))
+
+    _, _, violations = _validate(model)
+
+    assert len(violations) == 2
+    assert "references column 'TAX', which does not exist in ORDERS" in violations[0]
+    assert "base_table 'RETURNS', which is not one of the loaded tables" in violations[1]
+
+
+def test_relationships_are_repaired():
+    model = _model(
+        relationships=[
+            {
+                "name": "orders_to_customers",
+                "left_table": "orders",
+                "right_table": "customers",
+                "relationship_columns": [
+                    {"left_column": "CUSTOMER_ID", "right_column": "CUSTOMER_ID"},
+                    {"left_column": "ORDER_ID", "right_column": "REGION"},
+                ],
+                "join_type": "full_outer",
+            },
+            {"name": "orders_to_stores", "left_table": "orders", "right_table": "stores"},
+        ]
+    )
+
+    repaired, _, violations = _validate(model)
+
+    assert violations == []
+    assert repaired["relationships"] == [
+        {
+            "name": "orders_to_customers",
+            "left_table": "orders",
+            "right_table": "customers",
+            "relationship_columns": [{"left_column": "customer_id", "right_column": "customer_id"}],
+            "join_type": "left_outer",
+            "relationship_type": "many_to_one",
+        }
+    ]
+    customers, orders = repaired["tables"]
+    assert customers["primary_key"] == {"columns": ["customer_id"]}
+    # The join column of ORDERS had no logical column yet
+    assert {"name": "customer_id", "expr": "CUSTOMER_ID", "data_type": "NUMBER(38,0)"} in orders[
+        "dimensions"
+    ]
+
+
+@pytest.mark.parametrize(
+    "malformed, expected",
+    [
+        (
+            lambda model: model["tables"][0].update(base_table="DEMO_DB.SALES.CUSTOMERS"),
+            "base_table of table 'customers' needs to be a mapping",
+        ),
+        (
+            lambda model: model["tables"][1]["facts"].append("AMOUNT"),
+            "every entry in facts of table 'orders' needs to be a mapping",
+        ),
+        (
+            lambda model: model.update(relationships=["orders_to_customers"]),
+            "every entry in relationships needs to be a mapping",
+        ),
+        (
+            lambda model: model.update(
+                relationships=[
+                    {
+                        "name": "orders_to_customers",
+                        "left_table": "orders",
+                        "right_table": "customers",
+                        "relationship_columns": ["CUSTOMER_ID"],
+                    }
+                ]
+            ),
+            "every entry in relationship_columns of 'orders_to_customers' needs to be a mapping",
+        ),
+        (
+            lambda model: (
+                model["tables"][0].update(primary_key=["customer_id"]),
+                model.update(
+                    relationships=[
+                        {
+                            "name": "orders_to_customers",
+                            "left_table": "orders",
+                            "right_table": "customers",
+                            "relationship_columns": [
+                                {"left_column": "customer_id", "right_column": "customer_id"}
+                            ],
+                        }
+                    ]
+                ),
+            ),
+            "primary_key of table 'customers' needs to be a mapping",
+        ),
+    ],
+)
+def test_malformed_entries_are_violations(malformed, expected):
+    model = _model()
+    malformed(model)
+
+    _, _, violations = _validate(model)
+
+    assert any(expected in violation for violation in violations), violations
+
+
+@pytest.mark.parametrize(
+    "yaml_content",
+    ["name: [unclosed", "- just\n- a list\n"],
+)
+def test_unparseable_models_are_violations(yaml_content):
+    assert validate_semantic_model(yaml_content, TABLE_INFO)[2]
+
+
+@pytest.mark.parametrize(
+    "response",
+    ["```yaml\nname: sales\n```\nHere you go", "```\nname: sales\n```", "  name: sales\n"],
+)
+def test_code_fences_are_stripped(response):
+    assert _strip_code_fences(response) == "name: sales"
@@ -0,0 +1,188 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from benchmark.fake_snowflake import FakeSession
+from utils.resources import release_resource
+from utils.run_stats import InstrumentedSession
+from utils.snowflake_pool import (
+    POOL_KEY,
+    SessionPool,
+    release_run_session,
+    run_session,
+    set_session_factory,
+)
+
+
+class CountingFactory:
+    def __init__(self, session_class=FakeSession):
+        self.session_class = session_class
+        self.sessions = []
+
+    def __call__(self):
+        self.sessions.append(self.session_class())
+        return self.sessions[-1]
+
+
+class ClosedConnection:
+    def is_closed(self):
+        return True
+
+
+class ConcurrencyCheckingSession(FakeSession):
+    """Fails the test when two statements run on it at the same time."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.peak = 0
+        self._counter_lock = threading.Lock()
+
+    def _execute(self, query):
+        with self._counter_lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        try:
+            return super()._execute(query)
+        finally:
+            with self._counter_lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def pool_factory():
+    pools = []
+
+    def make(factory, **kwargs):
+        pools.append(SessionPool(factory, heartbeat_seconds=0, **kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def session_factory():
+    """Replace the process wide pool's factory for the test."""
+    yield set_session_factory
+    release_resource(POOL_KEY)
+
+
+def test_checkout_reuses_returned_sessions(pool_factory):
+    factory = CountingFactory()
+    pool = pool_factory(factory, size=2)
+
+    with pool.checkout("SALES", create_schema=True) as session:
+        assert session.schema == "SALES"
+    with pool.checkout("HR") as session:
+        assert session.get_current_schema() == '"HR"'
+
+    assert len(factory.sessions) == 1
+    assert "CREATE SCHEMA IF NOT EXISTS SALES" in factory.sessions[0].statements
+
+
+def test_checkout_without_a_schema_resets_to_the_default(pool_factory):
+    pool = pool_factory(CountingFactory(), size=1)
+    with pool.checkout("BUILD_SCHEMA") as session:
+        session.sql("SELECT 1").collect()
+
+    with pool.checkout() as session:
+        assert session.get_current_database() == '"BENCHMARK_DB"'
+        assert session.get_current_schema() == '"DEMO"'
+
+
+def test_checkout_times_out_when_every_session_is_in_use(pool_factory):
+    pool = pool_factory(CountingFactory(), size=1)
+    held = pool.checkout()
+
+    with pytest.raises(RuntimeError, match="All 1 Snowflake sessions are in use"):
+        pool.checkout(timeout=0.01)
+    held.close()
+    pool.checkout(timeout=0.01).close()
+
+
+def test_checkout_replaces_lost_sessions(pool_factory):
+    factory = CountingFactory()
+    pool = pool_factory(factory, size=1)
+    pool.checkout().close()
+    factory.sessions[0].connection = ClosedConnection()
+
+    pool.checkout(timeout=0.01).close()
+
+    assert len(factory.sessions) == 2
+
+
+def test_pandas_upload_checks_out_a_session_per_worker(session_factory, tmp_path, monkeypatch):
+    from nodes.upload_to_snowflake import pandas_load_files
+
+    factory = CountingFactory()
+    session_factory(factory)
+    monkeypatch.setenv("UPLOAD_WORKERS", "3")
+    for name in ("CUSTOMERS", "ORDERS", "SHIPMENTS"):
+        pd.DataFrame({"ID": [1, 2], "NAME": ["a", "b"]}).to_csv(tmp_path / f"{name}.csv", index=False)
+    session = FakeSession()
+
+    rows_loaded, _, _, errors = pandas_load_files(
+        InstrumentedSession(session),
+        str(tmp_path),
+        ["CUSTOMERS.csv", "ORDERS.csv", "SHIPMENTS.csv"],
+        lambda message: None,
+    )
+
+    assert errors == {}
+    assert rows_loaded == {"CUSTOMERS": 2, "ORDERS": 2, "SHIPMENTS": 2}
+    # A fresh pool has no idle sessions, the two extra workers open theirs
+    assert len(factory.sessions) == 2
+    tables = [table for used in (session, *factory.sessions) for table in used.tables]
+    assert sorted(tables) == ["CUSTOMERS", "ORDERS", "SHIPMENTS"]
+
+
+def test_pandas_upload_continues_without_pooled_sessions(session_factory, tmp_path, monkeypatch):
+    from nodes.upload_to_snowflake import pandas_load_files
+
+    def factory():
+        raise RuntimeError("MFA prompt timed out")
+
+    session_factory(factory)
+    monkeypatch.setenv("UPLOAD_WORKERS", "3")
+    for name in ("CUSTOMERS", "ORDERS", "SHIPMENTS"):
+        pd.DataFrame({"ID": [1, 2], "NAME": ["a", "b"]}).to_csv(tmp_path / f"{name}.csv", index=False)
+    session = FakeSession()
+
+    rows_loaded, _, _, errors = pandas_load_files(
+        InstrumentedSession(session),
+        str(tmp_path),
+        ["CUSTOMERS.csv", "ORDERS.csv", "SHIPMENTS.csv"],
+        lambda message: None,
+    )
+
+    assert errors == {}
+    assert rows_loaded == {"CUSTOMERS": 2, "ORDERS": 2, "SHIPMENTS": 2}
+    assert set(session.tables) == {"CUSTOMERS", "ORDERS", "SHIPMENTS"}
+
+
+def test_run_session_is_used_one_statement_at_a_time(session_factory):
+    factory = CountingFactory(ConcurrencyCheckingSession)
+    session_factory(factory)
+
+    def branch(index):
+        # What the nodes of a parallel branch do with the run's session
+        session = InstrumentedSession(run_session("SALES"))
+        for statement in range(5):
+            session.sql(f"CREATE STAGE STAGE_{index}_{statement}").collect()
+            session.get_current_schema()
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(branch, range(4)))
+    finally:
+        release_run_session(None)
+
+    (session,) = factory.sessions
+    assert session.peak == 1
+    assert sum(statement.startswith("CREATE STAGE") for statement in session.statements) == 20
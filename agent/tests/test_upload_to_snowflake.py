@@ -0,0 +1,135 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark.fake_snowflake import FakeSession
+from nodes.upload_to_snowflake import _pandas_load_file, bulk_load_files
+
+AGENT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_bulk_load_creates_and_loads_every_file(tmp_path):
+    pd.DataFrame({"customer_id": [1, 2, 3], "city": ["A", "B", "C"]}).to_parquet(
+        tmp_path / "CUSTOMERS.parquet", index=False
+    )
+    pd.DataFrame({"order_id": [1, 2], "customer_id": [1, 3]}).to_csv(
+        tmp_path / "ORDERS.csv", index=False
+    )
+    session = FakeSession()
+
+    rows_loaded, timings, _, errors = bulk_load_files(
+        session, str(tmp_path), ["CUSTOMERS.parquet", "ORDERS.csv"], lambda message: None, "STAGE_1"
+    )
+
+    assert rows_loaded == {"CUSTOMERS": 3, "ORDERS": 2}
+    assert set(timings) == {"stage", "load"}
+    assert errors == {}
+    assert list(session.tables["CUSTOMERS"].columns) == ["CUSTOMER_ID", "CITY"]
+    # One create stage, one load block and one row count query
+    assert len(session.statements) == 3
+
+
+def test_bulk_load_reports_a_bad_file_without_failing_the_others(tmp_path):
+    pd.DataFrame({"customer_id": [1, 2, 3]}).to_parquet(tmp_path / "CUSTOMERS.parquet", index=False)
+    (tmp_path / "ORDERS.parquet").write_bytes(b"not a parquet file")
+    session = FakeSession()
+    messages = []
+
+    rows_loaded, _, _, errors = bulk_load_files(
+        session, str(tmp_path), ["CUSTOMERS.parquet", "ORDERS.parquet"], messages.append, "STAGE_1"
+    )
+
+    assert rows_loaded == {"CUSTOMERS": 3}
+    assert list(errors) == ["ORDERS"]
+    assert any(message.startswith("Failed to upload ORDERS: ") for message in messages)
+    # Every table is loaded in its own exception handler, skipping rows COPY INTO can't load
+    load_block = next(statement for statement in session.statements if "EXECUTE IMMEDIATE" in statement)
+    assert load_block.count("EXCEPTION") == 2
+    assert load_block.count("ON_ERROR = CONTINUE") == 2
+
+
+def test_bulk_load_without_files_sends_no_statements(tmp_path):
+    session = FakeSession()
+
+    assert bulk_load_files(session, str(tmp_path), [], lambda message: None, "STAGE_1") == ({}, {}, {}, {})
+    assert session.statements == []
+
+
+def test_chunked_load_widens_scale_from_later_chunks(tmp_path):
+    path = tmp_path / "ORDERS.csv"
+    pd.DataFrame({"order_id": range(6), "amount": [1.5, 2.5, 3.5, 4.5, 5.125, 6.5]}).to_csv(
+        path, index=False
+    )
+    session = FakeSession()
+
+    row_count, _ = _pandas_load_file(session, str(path), "ORDERS", 1.0, 2, lambda message: None)
+
+    assert row_count == 6
+    create = next(statement for statement in session.statements if statement.startswith("CREATE TABLE"))
+    assert "AMOUNT NUMBER(38,3)" in create
+    assert session.tables["ORDERS"]["AMOUNT"].tolist()[4] == 5.125
+
+
+# Loads a 5M row CSV in chunks and prints how much the peak RSS grew. The
+# session keeps no rows, so the growth is what the loader itself holds.
+MEMORY_SCRIPT = """
+import resource
+import sys
+
+from benchmark.fake_snowflake import FakeSession
+from nodes.upload_to_snowflake import _pandas_load_file
+
+
+class DiscardingSession(FakeSession):
+    def write_pandas(self, df, table_name, **kwargs):
+        self.tables[table_name] = df.head(0)
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+before = peak_mb()
+row_count, _ = _pandas_load_file(
+    DiscardingSession(), sys.argv[1], "EVENTS", 1.0, int(sys.argv[2]), lambda message: None
+)
+print(row_count, peak_mb() - before)
+"""
+ROWS = 5_000_000
+CHUNK_SIZE = 250_000
+# Chunks of 250k rows grow the peak by about 110 MB, the whole file at once by about 770 MB
+PEAK_GROWTH_CEILING_MB = 300
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="ru_maxrss is in KB on Linux only")
+def test_chunked_load_peak_memory_stays_bounded(tmp_path):
+    path = tmp_path / "EVENTS.csv"
+    rng = np.random.default_rng(0)
+    for start in range(0, ROWS, 1_000_000):
+        rows = min(1_000_000, ROWS - start)
+        pd.DataFrame(
+            {
+                "event_id": np.arange(start, start + rows),
+                "amount": np.round(rng.random(rows) * 100, 2),
+                "day": pd.to_datetime("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+                "category": rng.choice(["North", "South", "East", "West"], rows),
+            }
+        ).to_csv(path, mode="a", header=start == 0, index=False, date_format="%Y-%m-%d")
+
+    result = subprocess.run(
+        [sys.executable, "-c", MEMORY_SCRIPT, str(path), str(CHUNK_SIZE)],
+        cwd=AGENT_DIRECTORY,
+        env={**os.environ, "PYTHONPATH": AGENT_DIRECTORY},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    row_count, growth_mb = result.stdout.split()
+
+    assert int(row_count) == ROWS
+    assert float(growth_mb) < PEAK_GROWTH_CEILING_MB
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils import workspace
+
+
+def _stale_workspace(thread_id, hours=48):
+    directory = workspace.workspace_dir(thread_id)
+    stale = time.time() - hours * 3600
+    os.utime(directory, (stale, stale))
+    return directory
+
+
+def test_workspaces_are_per_thread_and_safe():
+    assert workspace.workspace_path("data.csv", thread_id="a") != workspace.workspace_path(
+        "data.csv", thread_id="b"
+    )
+    # Thread ids can't point outside the root
+    assert os.path.dirname(workspace.workspace_dir("../../etc")) == workspace.workspace_root()
+
+
+def test_stale_workspaces_are_pruned_unless_resumable(monkeypatch):
+    monkeypatch.setattr(workspace, "_resumable_check", lambda thread_id: thread_id == "waiting")
+    finished = _stale_workspace("finished")
+    waiting = _stale_workspace("waiting")
+    recent = workspace.workspace_dir("recent")
+
+    workspace.workspace_dir("new")
+
+    assert not os.path.exists(finished)
+    assert os.path.isdir(waiting) and os.path.isdir(recent)
+
+
+def test_workspace_is_kept_when_resumability_is_unknown(monkeypatch):
+    def check(thread_id):
+        raise RuntimeError("checkpoint database is locked")
+
+    monkeypatch.setattr(workspace, "_resumable_check", check)
+    stale = _stale_workspace("unknown")
+
+    workspace.prune_workspaces()
+
+    assert os.path.isdir(stale)
+
+
+@pytest.mark.parametrize(
+    "policy, succeeded, kept",
+    [
+        ("on_success", True, False),
+        ("on_success", False, True),
+        ("always", False, False),
+        ("never", True, True),
+    ],
+)
+def test_cleanup_policy(policy, succeeded, kept, monkeypatch):
+    monkeypatch.setenv("WORKSPACE_CLEANUP", policy)
+    directory = workspace.workspace_dir("build")
+
+    workspace.finish_workspace("build", succeeded)
+
+    assert os.path.isdir(directory) == kept
+
+
+def test_builds_wait_for_a_slot(monkeypatch):
+    monkeypatch.setenv("MAX_CONCURRENT_BUILDS", "1")
+    monkeypatch.setenv("BUILD_QUEUE_TIMEOUT_SECONDS", "0.1")
+    monkeypatch.setattr(workspace, "_build_slots", None)
+    messages = []
+
+    with workspace.build_slot():
+        waiter = threading.Thread(target=lambda: messages.append(_try_slot(messages.append)))
+        waiter.start()
+        waiter.join()
+
+    assert messages == [
+        "Waiting for another demo build to finish...",
+        "Too many demo builds are running, no slot became free within 0s",
+    ]
+
+
+def _try_slot(writer):
+    try:
+        with workspace.build_slot(writer):
+            return "got a slot"
+    except RuntimeError as e:
+        return str(e)
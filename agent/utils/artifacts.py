@@ -0,0 +1,55 @@
+"""Content addressed store for the large artifacts of a build.
+
+Scripts, semantic models and table profiles are written once to ARTIFACT_DIR
+under the SHA-256 of their content and the graph state only carries that
+reference, so every checkpoint stays a few KB no matter how large the
+artifacts get. Identical content is stored once.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+
+def _artifact_path(ref):
+    return os.path.join(os.getenv("ARTIFACT_DIR", ".artifacts"), ref[:2], ref)
+
+
+def save_artifact(content):
+    """Store `content` (a string) and return its reference."""
+    data = content.encode("utf-8")
+    ref = hashlib.sha256(data).hexdigest()
+    path = _artifact_path(ref)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write and rename so concurrent readers never see a partial artifact
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    return ref
+
+
+@lru_cache(maxsize=128)
+def _read_artifact(path):
+    # Artifacts never change once written, so caching by path is safe
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_artifact(ref):
+    """Return the content stored under `ref`, or "" when there is no reference."""
+    if not ref:
+        return ""
+    return _read_artifact(_artifact_path(ref))
+
+
+def save_json_artifact(value):
+    return save_artifact(json.dumps(value))
+
+
+def load_json_artifact(ref, default=None):
+    content = load_artifact(ref)
+    return json.loads(content) if content else default
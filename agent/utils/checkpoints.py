@@ -0,0 +1,27 @@
+"""Checkpointer used to compile the graph.
+
+CHECKPOINTER selects it: "memory" (the default) keeps checkpoints for the life
+of the process, "sqlite" writes them to CHECKPOINT_PATH so a build that was
+interrupted by a crash or a restart of the UI can be resumed from the last
+completed node.
+"""
+
+import os
+import sqlite3
+
+from langgraph.checkpoint.memory import MemorySaver
+
+
+def create_checkpointer():
+    backend = os.getenv("CHECKPOINTER", "memory").lower()
+    if backend == "sqlite":
+        # Only needed for durable checkpoints
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        # Parallel branches write checkpoints from worker threads; SqliteSaver
+        # serializes access to the connection itself.
+        connection = sqlite3.connect(
+            os.getenv("CHECKPOINT_PATH", ".checkpoints.sqlite"), check_same_thread=False
+        )
+        return SqliteSaver(connection)
+    return MemorySaver()
@@ -0,0 +1,97 @@
+"""File format the generated datasets are exchanged in.
+
+DATASET_FORMAT selects it: "parquet" (the default) keeps the column types the
+script produced and is smaller and faster to parse than CSV; "csv" is the
+fallback, and is also used when pyarrow isn't installed.
+"""
+
+import csv
+import itertools
+import os
+from functools import lru_cache
+
+from utils.workspace import DOCUMENTS_DIRECTORY, workspace_path
+
+DATA_FILE_EXTENSIONS = (".csv", ".parquet")
+
+
+@lru_cache(maxsize=None)
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def dataset_format():
+    requested = os.getenv("DATASET_FORMAT", "parquet").lower()
+    if requested == "parquet" and _pyarrow_available():
+        return "parquet"
+    return "csv"
+
+
+def is_data_file(file_name):
+    return file_name.lower().endswith(DATA_FILE_EXTENSIONS)
+
+
+def table_name_for(file_name):
+    return os.path.splitext(os.path.basename(file_name))[0].upper()
+
+
+def output_instructions():
+    """How the generation prompts ask the script to write its tables."""
+    if dataset_format() == "parquet":
+        return (
+            "Write the script so that it writes the synthetic data of each table to a Parquet file with "
+            "`df.to_parquet(path, index=False)`, with the format TABLENAME.parquet. So for example, if the "
+            "table should be called CUSTOMERS it writes CUSTOMERS.parquet with the generated data. Keep "
+            "the column types meaningful: integers, floats, booleans, timestamps as datetime columns and "
+            "date-only columns converted with `.dt.date`, rather than formatted strings."
+        )
+    return (
+        "Write the script so that it writes the synthetic data to a CSV file, with the format "
+        "TABLENAME.csv. So for example, if the table should be called CUSTOMERS it writes "
+        "CUSTOMERS.csv with the generated data."
+    )
+
+
+def read_columns(file_path):
+    """Column names of a data file without reading its rows."""
+    if file_path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(file_path).names
+    with open(file_path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def read_rows(file_path, limit):
+    """The first `limit` rows of a data file as dicts."""
+    if file_path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        batch = next(pq.ParquetFile(file_path).iter_batches(batch_size=limit), None)
+        return batch.to_pylist() if batch is not None else []
+    with open(file_path, "r", newline="", encoding="utf-8") as f:
+        return list(itertools.islice(csv.DictReader(f), limit))
+
+
+def row_count(file_path):
+    """Rows of a data file, from the footer for Parquet and line based for CSV."""
+    if file_path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_metadata(file_path).num_rows
+    lines = 0
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            lines += block.count(b"\n")
+    # A quoted value spanning lines is counted more than once
+    return max(lines - 1, 0)
+
+
+def documents_path():
+    # Kept outside generated_csvs, which execute_dataset_script wipes while the
+    # document branch may already be done
+    return workspace_path(DOCUMENTS_DIRECTORY, f"DOCUMENTS.{dataset_format()}")
@@ -0,0 +1,160 @@
+"""Shared factory for the chat models used by the graph nodes.
+
+Every chat model handed out by `get_llm` shares one pooled HTTP client, so
+connections to the API are reused across nodes and parallel branches, and uses
+the same timeout and retry policy. Failed requests (429 and 5xx) are retried by
+the OpenAI client with exponential backoff that honours `Retry-After`.
+Requests per model are additionally capped by a semaphore so parallel demo
+builds queue locally instead of tripping the API's rate limits.
+
+Set OPENAI_BASE_URL to point the models at a local HTTP stub.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from utils.llm_cache import create_cache_from_env
+from utils.run_stats import record_llm_call
+
+DEFAULT_MODEL = "gpt-4o"
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+_held = threading.local()
+# Replaces the chat models handed out by get_llm, see set_llm_factory
+_llm_factory = None
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """The process wide response cache configured by LLM_CACHE, or None."""
+    return create_cache_from_env()
+
+
+@lru_cache(maxsize=None)
+def get_http_client():
+    """The pooled HTTP client shared by every chat model."""
+    max_connections = _env_int("LLM_MAX_CONNECTIONS", 20)
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        timeout=httpx.Timeout(
+            _env_float("LLM_TIMEOUT_SECONDS", 120.0),
+            connect=_env_float("LLM_CONNECT_TIMEOUT_SECONDS", 10.0),
+        ),
+    )
+
+
+def _model_semaphore(model_name):
+    with _semaphores_lock:
+        if model_name not in _semaphores:
+            _semaphores[model_name] = threading.BoundedSemaphore(
+                _env_int("LLM_MAX_CONCURRENCY", 8)
+            )
+        return _semaphores[model_name]
+
+
+@contextmanager
+def _model_slot(model_name):
+    """Hold one of the model's request slots for the current thread.
+
+    Re-entrant per thread, because `_generate` falls back to `_stream` when the
+    model is created with `streaming=True`.
+    """
+    depth = getattr(_held, "depth", 0)
+    if depth:
+        _held.depth = depth + 1
+        try:
+            yield
+        finally:
+            _held.depth = depth
+        return
+
+    with _model_semaphore(model_name):
+        _held.depth = 1
+        try:
+            yield
+        finally:
+            _held.depth = 0
+
+
+def _usage(usage_metadata):
+    if not usage_metadata:
+        return 0, 0
+    return usage_metadata.get("input_tokens", 0), usage_metadata.get("output_tokens", 0)
+
+
+class LimitedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that waits for a free per-model slot before each request.
+
+    Token usage of every request (cached responses make none) is recorded for
+    the node it was made from, see utils/run_stats.py.
+    """
+
+    def _generate(self, *args, **kwargs):
+        with _model_slot(self.model_name):
+            result = super()._generate(*args, **kwargs)
+        # With streaming=True the request went through _stream, which recorded it
+        if not self.streaming:
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            record_llm_call(
+                self.model_name,
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+            )
+        return result
+
+    def _stream(self, *args, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        try:
+            with _model_slot(self.model_name):
+                for chunk in super()._stream(*args, **kwargs):
+                    # Only the last chunk carries usage (stream_usage=True)
+                    chunk_prompt, chunk_completion = _usage(chunk.message.usage_metadata)
+                    prompt_tokens += chunk_prompt
+                    completion_tokens += chunk_completion
+                    yield chunk
+        finally:
+            record_llm_call(self.model_name, prompt_tokens, completion_tokens)
+
+
+def set_llm_factory(factory):
+    """Make `get_llm` return `factory(model_name, **kwargs)` instead, None restores it.
+
+    Used by the offline benchmark (see benchmark/) to run the graph without the API.
+    """
+    global _llm_factory
+    _llm_factory = factory
+
+
+def get_llm(model_name=DEFAULT_MODEL, **kwargs):
+    """Return a chat model wired to the shared HTTP client, retry policy and cache."""
+    if _llm_factory is not None:
+        return _llm_factory(model_name, **kwargs)
+    return LimitedChatOpenAI(
+        model_name=model_name,
+        http_client=get_http_client(),
+        timeout=_env_float("LLM_TIMEOUT_SECONDS", 120.0),
+        max_retries=_env_int("LLM_MAX_RETRIES", 6),
+        cache=get_llm_cache(),
+        # Streamed responses report their token usage too
+        stream_usage=True,
+        **kwargs,
+    )
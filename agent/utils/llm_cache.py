@@ -0,0 +1,181 @@
+"""Content-addressed response caches for the chat models used by the nodes.
+
+Entries are keyed on a hash of the prompt and LangChain's `llm_string`, which
+holds the model name, its parameters and any bound structured output schema,
+so a cached answer is only reused for the exact same request. Both backends
+support a TTL and a maximum number of entries (least recently used entries
+are evicted first) and count hits and misses, for the process and for the
+node that looked the response up (see utils/run_stats.py).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from utils.run_stats import record_llm_cache_lookup
+
+
+def cache_key(prompt, llm_string):
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class CountingCache(BaseCache):
+    """Base class keeping hit / miss counters for the concrete backends."""
+
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _expired(self, created):
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _record(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        record_llm_cache_lookup(value is not None)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": self.size()}
+
+
+class InMemoryLRUCache(CountingCache):
+    """Process local cache, lost when the process exits."""
+
+    def __init__(self, max_entries=1000, ttl_seconds=None):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries = OrderedDict()
+
+    # Not __len__: LangChain tests the cache for truthiness, an empty cache
+    # would be skipped
+    def size(self):
+        return len(self._entries)
+
+    def lookup(self, prompt, llm_string):
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return self._record(entry and entry[1])
+
+    def update(self, prompt, llm_string, return_val):
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            self._entries[key] = (time.time(), return_val)
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._entries.clear()
+
+
+def _serializable(generations):
+    """Store structured output parsed by the OpenAI client as a plain dict."""
+    serializable = []
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        parsed = message.additional_kwargs.get("parsed") if message else None
+        if hasattr(parsed, "model_dump"):
+            generation = generation.model_copy(deep=True)
+            generation.message.additional_kwargs["parsed"] = parsed.model_dump()
+        serializable.append(generation)
+    return serializable
+
+
+class SQLiteCache(CountingCache):
+    """On disk cache that survives restarts and can be shared between runs."""
+
+    def __init__(self, path, max_entries=10000, ttl_seconds=None):
+        super().__init__(max_entries, ttl_seconds)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def size(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def lookup(self, prompt, llm_string):
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1]):
+                self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE llm_cache SET accessed = ? WHERE key = ?", (time.time(), key)
+                )
+            self._connection.commit()
+            return self._record(row and loads(row[0]))
+
+    def update(self, prompt, llm_string, return_val):
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        value = dumps(_serializable(return_val))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.max_entries:
+                self._connection.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key NOT IN (
+                        SELECT key FROM llm_cache ORDER BY accessed DESC LIMIT ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+            self._connection.commit()
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_cache")
+            self._connection.commit()
+
+
+def create_cache_from_env():
+    """Build the cache selected by LLM_CACHE ("none", "memory" or "sqlite")."""
+    backend = os.getenv("LLM_CACHE", "none").lower()
+    ttl = os.getenv("LLM_CACHE_TTL_SECONDS")
+    ttl_seconds = float(ttl) if ttl else None
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+    if backend == "memory":
+        return InMemoryLRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteCache(
+            os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+        )
+    return None
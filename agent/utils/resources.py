@@ -0,0 +1,49 @@
+"""Registry for runtime resources that must not end up in the graph state.
+
+Live objects such as Snowpark sessions can't be serialized into checkpoints,
+so nodes look them up here by key instead of passing them through `context`.
+Resources are created on first use and closed when released or when the
+process exits.
+"""
+
+import atexit
+import threading
+
+_resources = {}
+_lock = threading.Lock()
+# One lock per key, so a slow factory (a Snowflake login, waiting for a free
+# pooled session) only holds up callers of the same key
+_key_locks = {}
+
+
+def get_resource(key, factory):
+    """Return the resource registered under `key`, creating it with `factory()`."""
+    with _lock:
+        if key in _resources:
+            return _resources[key]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        with _lock:
+            if key in _resources:
+                return _resources[key]
+        resource = factory()
+        with _lock:
+            _resources[key] = resource
+        return resource
+
+
+def release_resource(key):
+    with _lock:
+        resource = _resources.pop(key, None)
+        _key_locks.pop(key, None)
+    if resource is not None and hasattr(resource, "close"):
+        resource.close()
+
+
+@atexit.register
+def release_all_resources():
+    for key in list(_resources):
+        try:
+            release_resource(key)
+        except Exception as e:
+            print(f"Failed to close {key}: {e}")
@@ -0,0 +1,269 @@
+"""Per-node instrumentation of a build.
+
+Every graph node (and routing function) is wrapped with `instrument_node`.
+While a node runs, the chat models from `get_llm` record their calls, tokens,
+estimated cost and response cache lookups, and the Snowpark sessions from
+`get_snowflake_session` (wrapped in `InstrumentedSession`) record their
+statements, the time spent waiting for them and the bytes uploaded. When the
+node finishes its numbers are sent on the `custom` stream as a dict:
+
+    {"type": "node_stats", "node": ..., "status": ..., "seconds": ...,
+     "llm_calls": ..., "prompt_tokens": ..., "completion_tokens": ...,
+     "cost_usd": ..., "llm_cache_hits": ..., "llm_cache_misses": ...,
+     "snowflake_statements": ..., "snowflake_seconds": ..., "bytes_uploaded": ...}
+
+and added to the JSON run summary of the build in RUN_SUMMARY_DIR, which
+outlives the build's workspace. `merge_node_stats` builds the same summary
+from the events, e.g. for the UI or the batch CLI.
+"""
+
+import contextvars
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+from langgraph.errors import GraphBubbleUp
+
+from utils.workspace import workspace_name
+
+# USD per million prompt / completion tokens, matched by model name prefix.
+# LLM_PRICES (JSON, same format) adds or overrides models.
+LLM_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "o3-mini": (1.10, 4.40),
+    "o4-mini": (1.10, 4.40),
+}
+COUNTERS = (
+    "llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cost_usd",
+    "llm_cache_hits",
+    "llm_cache_misses",
+    "snowflake_statements",
+    "snowflake_seconds",
+    "bytes_uploaded",
+)
+
+_current_stats = contextvars.ContextVar("node_stats", default=None)
+# Nodes on parallel branches, and the threads they start, record concurrently
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _prices():
+    prices = dict(LLM_PRICES)
+    prices.update(json.loads(os.getenv("LLM_PRICES", "{}")))
+    # Longest prefix first, so "gpt-4o-mini" isn't priced as "gpt-4o"
+    return sorted(prices.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def llm_cost(model_name, prompt_tokens, completion_tokens):
+    """Estimated USD cost of a call, None for models without a known price."""
+    for prefix, (prompt_price, completion_price) in _prices():
+        if model_name.startswith(prefix):
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+    return None
+
+
+def _record(**increments):
+    stats = _current_stats.get()
+    if stats is None:  # Not running inside an instrumented node
+        return
+    with _lock:
+        for key, value in increments.items():
+            stats[key] += value
+
+
+def record_llm_call(model_name, prompt_tokens, completion_tokens):
+    cost = llm_cost(model_name, prompt_tokens, completion_tokens)
+    _record(
+        llm_calls=1,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=cost or 0.0,
+    )
+
+
+def record_llm_cache_lookup(hit):
+    _record(llm_cache_hits=int(hit), llm_cache_misses=int(not hit))
+
+
+def record_snowflake_statement(seconds, bytes_uploaded=0):
+    _record(snowflake_statements=1, snowflake_seconds=seconds, bytes_uploaded=bytes_uploaded)
+
+
+def _timed_statement(call, bytes_uploaded=0):
+    start = time.perf_counter()
+    try:
+        return call()
+    finally:
+        record_snowflake_statement(time.perf_counter() - start, bytes_uploaded)
+
+
+class _InstrumentedDataFrame:
+    def __init__(self, dataframe):
+        self._dataframe = dataframe
+
+    def __getattr__(self, name):
+        return getattr(self._dataframe, name)
+
+    def collect(self, *args, **kwargs):
+        return _timed_statement(lambda: self._dataframe.collect(*args, **kwargs))
+
+    def to_pandas(self, *args, **kwargs):
+        return _timed_statement(lambda: self._dataframe.to_pandas(*args, **kwargs))
+
+
+class _InstrumentedFileOperation:
+    def __init__(self, file_operation):
+        self._file_operation = file_operation
+
+    def __getattr__(self, name):
+        return getattr(self._file_operation, name)
+
+    def put(self, local_file_name, stage_location, *args, **kwargs):
+        size = sum(os.path.getsize(path) for path in glob.glob(local_file_name))
+        return _timed_statement(
+            lambda: self._file_operation.put(local_file_name, stage_location, *args, **kwargs),
+            bytes_uploaded=size,
+        )
+
+
+class InstrumentedSession:
+    """Snowpark session that records what `sql`, `file.put` and `write_pandas` do.
+
+    Everything else is passed through to the wrapped session. Bytes uploaded
+    by `write_pandas` are the in-memory size of the DataFrame.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def sql(self, query, *args, **kwargs):
+        return _InstrumentedDataFrame(self._session.sql(query, *args, **kwargs))
+
+    @property
+    def file(self):
+        return _InstrumentedFileOperation(self._session.file)
+
+    def write_pandas(self, df, table_name, *args, **kwargs):
+        return _timed_statement(
+            lambda: self._session.write_pandas(df, table_name, *args, **kwargs),
+            bytes_uploaded=int(df.memory_usage(deep=True).sum()),
+        )
+
+
+def run_summary_path(thread_id=None):
+    directory = os.path.abspath(os.getenv("RUN_SUMMARY_DIR", ".run_summaries"))
+    return os.path.join(directory, f"{workspace_name(thread_id)}.json")
+
+
+def load_run_summary(thread_id=None):
+    try:
+        with open(run_summary_path(thread_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"nodes": {}, "totals": {}}
+
+
+def merge_node_stats(summary, event):
+    """Add a `node_stats` event to a run summary (in place) and return it."""
+    node = summary["nodes"].setdefault(
+        event["node"], {"runs": 0, "errors": 0, "seconds": 0.0, **dict.fromkeys(COUNTERS, 0)}
+    )
+    node["runs"] += 1
+    node["errors"] += event["status"] == "error"
+    for key in ("seconds",) + COUNTERS:
+        node[key] += event[key]
+        summary["totals"][key] = summary["totals"].get(key, 0) + event[key]
+    return summary
+
+
+def _save_node_stats(event):
+    path = run_summary_path()
+    with _lock:
+        summary = merge_node_stats(load_run_summary(), event)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+def format_node_stats(event):
+    """One line status update for a `node_stats` event."""
+    parts = [f"{event['node']} {event['status']} in {event['seconds']:.1f}s"]
+    if event["llm_calls"]:
+        parts.append(
+            f"{event['llm_calls']} LLM call(s), "
+            f"{event['prompt_tokens'] + event['completion_tokens']} tokens, "
+            f"${event['cost_usd']:.3f}"
+        )
+    if event["llm_cache_hits"]:
+        parts.append(f"{event['llm_cache_hits']} cached LLM response(s)")
+    if event["snowflake_statements"]:
+        parts.append(
+            f"{event['snowflake_statements']} Snowflake statement(s) taking "
+            f"{event['snowflake_seconds']:.1f}s"
+        )
+    return ", ".join(parts)
+
+
+def format_run_summary(summary):
+    """Markdown table of a run summary, slowest nodes first."""
+    if not summary["nodes"]:
+        return ""
+    lines = [
+        "| Node | Seconds | LLM calls | Tokens | Cost (USD) | Snowflake statements | Snowflake seconds | MB uploaded |",
+        "| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    rows = sorted(summary["nodes"].items(), key=lambda item: item[1]["seconds"], reverse=True)
+    for name, node in rows + [("Total", summary["totals"])]:
+        lines.append(
+            f"| {name} | {node['seconds']:.1f} | {node['llm_calls']} | "
+            f"{node['prompt_tokens'] + node['completion_tokens']} | {node['cost_usd']:.3f} | "
+            f"{node['snowflake_statements']} | {node['snowflake_seconds']:.1f} | "
+            f"{node['bytes_uploaded'] / 1024 / 1024:.1f} |"
+        )
+    return "\n".join(lines)
+
+
+def instrument_node(name, node):
+    """Wrap a `(context, writer)` node or routing function to report its stats."""
+
+    @functools.wraps(node)
+    def instrumented(context, writer):
+        stats = dict.fromkeys(COUNTERS, 0)
+        token = _current_stats.set(stats)
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            return node(context, writer)
+        except GraphBubbleUp:
+            status = "interrupted"  # Waiting for user input, not a failure
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            _current_stats.reset(token)
+            event = {
+                "type": "node_stats",
+                "node": name,
+                "status": status,
+                "seconds": time.perf_counter() - start,
+                **stats,
+            }
+            _save_node_stats(event)
+            writer(event)
+
+    return instrumented
@@ -0,0 +1,257 @@
+"""Infer Snowflake column types for generated datasets.
+
+Columns are classified with vectorized pandas operations only: string lengths
+rule out temporal and boolean types before anything is parsed, and dates are
+recognised with pandas' C datetime parser instead of per-value regexes.
+
+`infer_schema` can classify a sample of a large file. `apply_schema` then
+converts the full columns, which doubles as verification: when the full data
+disagrees with the type picked from the sample, the column deterministically
+falls back to a wider type (DATE / TIMESTAMP / BOOLEAN -> VARCHAR,
+NUMBER(38, s) -> a larger scale or FLOAT).
+
+Parquet files carry their column types, `schema_from_arrow` maps them
+directly and only refines floats.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Share of non-null values that must parse as a date / timestamp for the column
+# to be typed as one. Values that don't parse are loaded as NULL.
+TEMPORAL_THRESHOLD = 0.8
+# Largest scale tried before a non-integral numeric column is typed as FLOAT.
+MAX_SCALE = 6
+# Digits of a Snowflake NUMBER, its scale can be at most one less.
+MAX_PRECISION = 38
+
+_DATE_FORMAT = "%Y-%m-%d"
+_BOOLEAN_VALUES = {"true": True, "false": False}
+
+
+def _numeric_scale(values):
+    """Smallest number of decimal places that represents every value, or None."""
+    values = values[np.isfinite(values)]
+    for scale in range(MAX_SCALE + 1):
+        scaled = values * 10**scale
+        # Relative to the value, so tiny values aren't rounded away and only
+        # float representation error (0.1 + 0.2) is tolerated
+        if np.allclose(scaled, np.round(scaled), rtol=1e-9, atol=0):
+            return scale
+    return None
+
+
+def _widened_number(column_type, series):
+    """`column_type` (NUMBER(38, s)), or the wider type the values of `series` need."""
+    scale = _numeric_scale(series.to_numpy(dtype="float64"))
+    if scale is None:
+        return "FLOAT"
+    declared = int(column_type[len("NUMBER(38,") : -1])
+    return f"NUMBER(38,{max(scale, declared)})"
+
+
+def _parsed_ratio(parsed, total):
+    return parsed.notna().sum() / total if total else 0.0
+
+
+def _classify_text(strings):
+    """Classify a series of non-null strings."""
+    if strings.empty:
+        return "VARCHAR"
+
+    lengths = strings.str.len()
+    if lengths.between(4, 5).all() and strings.str.lower().isin(_BOOLEAN_VALUES).all():
+        return "BOOLEAN"
+    if (lengths == 10).mean() >= TEMPORAL_THRESHOLD:
+        dates = pd.to_datetime(strings, format=_DATE_FORMAT, errors="coerce")
+        if _parsed_ratio(dates, len(strings)) >= TEMPORAL_THRESHOLD:
+            return "DATE"
+    if lengths.between(16, 32).mean() >= TEMPORAL_THRESHOLD:
+        timestamps = pd.to_datetime(strings, format="ISO8601", errors="coerce")
+        if _parsed_ratio(timestamps, len(strings)) >= TEMPORAL_THRESHOLD:
+            return "TIMESTAMP_NTZ"
+    return "VARCHAR"
+
+
+def infer_column_type(series):
+    """Infer the Snowflake type of a single column."""
+    if pd.api.types.is_bool_dtype(series):
+        return "BOOLEAN"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP_NTZ"
+    if pd.api.types.is_integer_dtype(series):
+        return "NUMBER(38,0)"
+    if pd.api.types.is_numeric_dtype(series):
+        scale = _numeric_scale(series.to_numpy(dtype="float64"))
+        # Precision stays at the maximum so rows outside a sample always fit;
+        # Snowflake's storage does not depend on the declared precision.
+        return f"NUMBER(38,{scale})" if scale is not None else "FLOAT"
+    return _classify_text(series.dropna().astype(str))
+
+
+def infer_schema(df, sample_fraction=1.0, min_sample_rows=10_000, random_state=0):
+    """Return `{column_name: snowflake_type}` for every column of `df`.
+
+    With `sample_fraction` below 1 the columns are classified from a
+    deterministic random sample of at least `min_sample_rows` rows. Pass the
+    result through `apply_schema` to verify it against the full data.
+    """
+    sample = df
+    if sample_fraction < 1 and len(df) > min_sample_rows:
+        sample_rows = max(int(len(df) * sample_fraction), min_sample_rows)
+        sample = df.sample(n=sample_rows, random_state=random_state)
+
+    return {column: infer_column_type(sample[column]) for column in df.columns}
+
+
+def _varchar(series):
+    max_len = series.dropna().astype(str).str.len().max()
+    return f"VARCHAR({max(int(max_len), 1) if pd.notna(max_len) else 1})"
+
+
+def apply_schema(df, schema):
+    """Convert the columns of `df` in place and return the verified schema.
+
+    Columns whose full data doesn't fit the inferred type fall back to VARCHAR
+    (or a larger scale / FLOAT for numbers), and VARCHAR lengths are sized from
+    the full column.
+    """
+    verified = {}
+    for column, column_type in schema.items():
+        series = df[column]
+        total = series.notna().sum()
+
+        if column_type == "DATE" and not pd.api.types.is_datetime64_any_dtype(series):
+            parsed = pd.to_datetime(series, format=_DATE_FORMAT, errors="coerce")
+            if _parsed_ratio(parsed, total) >= TEMPORAL_THRESHOLD:
+                df[column] = parsed.dt.date
+            else:
+                column_type = "VARCHAR"
+        elif column_type == "TIMESTAMP_NTZ" and not pd.api.types.is_datetime64_any_dtype(
+            series
+        ):
+            parsed = pd.to_datetime(series, format="ISO8601", errors="coerce")
+            if _parsed_ratio(parsed, total) >= TEMPORAL_THRESHOLD:
+                df[column] = parsed
+            else:
+                column_type = "VARCHAR"
+        elif column_type == "BOOLEAN" and not pd.api.types.is_bool_dtype(series):
+            parsed = series.astype(str).str.lower().map(_BOOLEAN_VALUES)
+            if parsed.notna().sum() == total:
+                df[column] = parsed
+            else:
+                column_type = "VARCHAR"
+        elif column_type.startswith("NUMBER(38,") and not pd.api.types.is_integer_dtype(series):
+            # The sample may have missed values with more decimal places
+            column_type = _widened_number(column_type, series)
+
+        if column_type == "VARCHAR":
+            column_type = _varchar(series)
+        verified[column] = column_type
+    return verified
+
+
+def widen_for_chunks(schema):
+    """Drop VARCHAR lengths from a schema inferred from the first chunk of a file.
+
+    Later chunks may hold longer strings than the one the schema was sized from.
+    """
+    return {
+        column: "VARCHAR" if column_type.startswith("VARCHAR") else column_type
+        for column, column_type in schema.items()
+    }
+
+
+def number_columns(schema):
+    """Columns of `schema` typed NUMBER(38, s), whose scale later chunks may widen."""
+    return [column for column, column_type in schema.items() if column_type.startswith("NUMBER(38,")]
+
+
+def widen_numbers(schema, chunks):
+    """Widen the NUMBER(38, s) columns of `schema` to fit every chunk of `chunks`.
+
+    Chunks are scanned before the table is created, only their number columns
+    need to be read. A column with more decimal places than MAX_SCALE in any
+    chunk becomes FLOAT.
+    """
+    widened = dict(schema)
+    for chunk in chunks:
+        for column in number_columns(widened):
+            series = pd.to_numeric(chunk[column], errors="coerce")
+            if not pd.api.types.is_integer_dtype(series):
+                widened[column] = _widened_number(widened[column], series)
+    return widened
+
+
+def coerce_to_schema(df, schema):
+    """Convert the columns of `df` in place to an already fixed `schema`.
+
+    Used for every chunk after the first: the table exists already, so values
+    that don't fit are loaded as NULL instead of changing the column type.
+    Numbers with more decimal places than their column's scale raise a
+    ValueError rather than being rounded, run `widen_numbers` first.
+    """
+    for column, column_type in schema.items():
+        series = df[column]
+        if column_type.startswith("NUMBER(38,"):
+            if not pd.api.types.is_numeric_dtype(series):
+                series = df[column] = pd.to_numeric(series, errors="coerce")
+            if not pd.api.types.is_integer_dtype(series):
+                needed = _widened_number(column_type, series)
+                if needed != column_type:
+                    raise ValueError(
+                        f"Column {column} needs {needed}, its table column is {column_type}"
+                    )
+        elif column_type == "DATE":
+            df[column] = pd.to_datetime(
+                series, format=_DATE_FORMAT, errors="coerce"
+            ).dt.date
+        elif column_type == "TIMESTAMP_NTZ":
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                df[column] = pd.to_datetime(series, format="ISO8601", errors="coerce")
+        elif column_type == "BOOLEAN":
+            if not pd.api.types.is_bool_dtype(series):
+                df[column] = series.astype(str).str.lower().map(_BOOLEAN_VALUES)
+        elif column_type.startswith("NUMBER") or column_type == "FLOAT":
+            if not pd.api.types.is_numeric_dtype(series):
+                df[column] = pd.to_numeric(series, errors="coerce")
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            df[column] = series.astype(str).where(series.notna())
+    return df
+
+
+def schema_from_arrow(arrow_schema, df):
+    """Snowflake types for the columns of a Parquet file, from its Arrow schema.
+
+    The types the script wrote are kept as they are; only floats are looked at
+    (vectorized) to type money-like columns as NUMBER(38, s). Decimals with
+    more than MAX_PRECISION digits become FLOAT, their columns of `df` are
+    converted in place. Pass the result through `apply_schema` to size the
+    VARCHARs.
+    """
+    import pyarrow as pa
+
+    schema = {}
+    for field in arrow_schema:
+        column = field.name.upper()
+        arrow_type = field.type
+        if pa.types.is_boolean(arrow_type):
+            schema[column] = "BOOLEAN"
+        elif pa.types.is_integer(arrow_type):
+            schema[column] = "NUMBER(38,0)"
+        elif pa.types.is_floating(arrow_type):
+            schema[column] = infer_column_type(df[column])
+        elif pa.types.is_decimal(arrow_type):
+            if arrow_type.precision <= MAX_PRECISION and arrow_type.scale < MAX_PRECISION:
+                schema[column] = f"NUMBER({arrow_type.precision},{arrow_type.scale})"
+            else:
+                # Wider than any Snowflake NUMBER, e.g. a decimal256
+                schema[column] = "FLOAT"
+                df[column] = df[column].astype("float64")
+        elif pa.types.is_date(arrow_type):
+            schema[column] = "DATE"
+        elif pa.types.is_timestamp(arrow_type):
+            schema[column] = "TIMESTAMP_TZ" if arrow_type.tz else "TIMESTAMP_NTZ"
+        else:
+            schema[column] = "VARCHAR"
+    return schema
@@ -0,0 +1,24 @@
+"""The helper library offered to generated dataset scripts (agent/script_lib).
+
+The sandbox puts SCRIPT_LIB_PATH on the script's `sys.path`, and the prompts
+describe the library with the module docstrings, read without importing them.
+"""
+
+import ast
+import os
+from functools import lru_cache
+
+SCRIPT_LIB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "script_lib"
+)
+LIBRARY_MODULES = ("demo_data",)
+
+
+@lru_cache(maxsize=None)
+def script_library_reference():
+    """Prompt text describing the modules of the library."""
+    sections = []
+    for module in LIBRARY_MODULES:
+        with open(os.path.join(SCRIPT_LIB_PATH, f"{module}.py"), "r") as f:
+            sections.append(ast.get_docstring(ast.parse(f.read())))
+    return "\n\n".join(sections)
@@ -0,0 +1,227 @@
+"""Static checks for generated dataset scripts, run before they are executed.
+
+`preflight_script` parses the script with `ast` and reports problems that
+would make the run fail or misbehave without spending a subprocess launch on
+it: syntax errors, imports outside the packages the generation prompt
+promises, files written outside `generated_csvs/`, and row counts large enough
+to burn minutes of CPU. Only what can be resolved statically (literals,
+module level constants, simple arithmetic and path joins) is checked, so
+anything dynamic is given the benefit of the doubt.
+"""
+
+import ast
+import os
+import sys
+
+from utils.script_library import LIBRARY_MODULES
+
+OUTPUT_DIRECTORY = "generated_csvs"
+# Packages the generation prompt says are available
+ALLOWED_PACKAGES = {"pandas", "numpy", "faker", "pyarrow", *LIBRARY_MODULES}
+# Standard library modules a data generation script has no business using
+BLOCKED_MODULES = {"subprocess", "socket", "urllib", "http", "ftplib", "smtplib", "ctypes"}
+# Keyword arguments that size generated data, e.g. np.random.randint(size=...)
+SIZE_KEYWORDS = {"size", "n", "num_rows", "n_rows", "nrows", "periods"}
+WRITE_METHODS = {"to_csv", "to_parquet"}
+_UNKNOWN = "\0"
+
+
+def _max_rows():
+    return int(os.getenv("SCRIPT_MAX_ROWS", "5000000"))
+
+
+def _module_constants(tree):
+    """Module level `NAME = <literal>` assignments."""
+    constants = {}
+    for statement in tree.body:
+        if (
+            isinstance(statement, ast.Assign)
+            and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)
+        ):
+            value = _static_value(statement.value, constants)
+            if value is not None:
+                constants[statement.targets[0].id] = value
+    return constants
+
+
+def _static_value(node, constants):
+    """Resolve numbers and strings built from literals and constants, else None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mult, ast.Pow)):
+        left = _static_value(node.left, constants)
+        right = _static_value(node.right, constants)
+        if left is None or right is None:
+            return None
+        try:
+            if isinstance(node.op, ast.Add):
+                return left + right
+            if isinstance(node.op, ast.Mult):
+                return left * right
+            return left**right if isinstance(left, (int, float)) else None
+        except TypeError:
+            return None
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "int"
+        and len(node.args) == 1
+    ):
+        value = _static_value(node.args[0], constants)
+        return int(value) if isinstance(value, (int, float)) else None
+    return None
+
+
+def _static_path(node, constants):
+    """Resolve a path expression, with _UNKNOWN standing in for dynamic parts."""
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value if isinstance(part, ast.Constant) else _UNKNOWN
+            for part in node.values
+        )
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "join"
+        and ast.unparse(node.func.value) in ("os.path", "path")
+    ):
+        return os.path.join(*[_static_path(arg, constants) for arg in node.args])
+    value = _static_value(node, constants)
+    return value if isinstance(value, str) else _UNKNOWN
+
+
+def _is_outside_output_directory(path):
+    if path.startswith(_UNKNOWN):
+        return False  # Can't tell where a fully dynamic path points
+    if os.path.isabs(path):
+        return True
+    normalized = os.path.normpath(path.replace(_UNKNOWN, "x"))
+    return normalized.split(os.sep)[0] != OUTPUT_DIRECTORY
+
+
+def _check_imports(tree, findings):
+    stdlib = getattr(sys, "stdlib_module_names", set())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            package = module.split(".")[0]
+            if package in BLOCKED_MODULES:
+                findings.append(f"line {node.lineno}: `{module}` must not be used")
+            elif package not in stdlib and package not in ALLOWED_PACKAGES:
+                findings.append(
+                    f"line {node.lineno}: `{module}` is not available, only the standard "
+                    f"library and {', '.join(sorted(ALLOWED_PACKAGES))} can be imported"
+                )
+
+
+def _write_target(node):
+    """The path argument of a call that writes a file, or None."""
+    if isinstance(node.func, ast.Attribute) and node.func.attr in WRITE_METHODS:
+        if node.args:
+            return node.args[0]
+        return next(
+            (keyword.value for keyword in node.keywords if keyword.arg == "path_or_buf"),
+            None,
+        )
+    if isinstance(node.func, ast.Name) and node.func.id == "open" and node.args:
+        mode = node.args[1] if len(node.args) > 1 else None
+        mode = mode or next(
+            (keyword.value for keyword in node.keywords if keyword.arg == "mode"), None
+        )
+        if isinstance(mode, ast.Constant) and set(str(mode.value)) & set("wax+"):
+            return node.args[0]
+    return None
+
+
+def _check_output_paths(tree, constants, findings):
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if ast.unparse(node.func) == "os.chdir":
+            findings.append(f"line {node.lineno}: must not change the working directory")
+            continue
+        target = _write_target(node)
+        if target is None:
+            continue
+        path = _static_path(target, constants)
+        if _is_outside_output_directory(path):
+            findings.append(
+                f"line {node.lineno}: writes to `{path.replace(_UNKNOWN, '{...}')}`, "
+                f"files must be written to the `{OUTPUT_DIRECTORY}/` folder"
+            )
+
+
+def _loop_count(node, constants):
+    """Iterations of `for ... in range(<static>)`, else None."""
+    if (
+        isinstance(node.iter, ast.Call)
+        and isinstance(node.iter.func, ast.Name)
+        and node.iter.func.id == "range"
+        and node.iter.args
+    ):
+        bounds = [_static_value(arg, constants) for arg in node.iter.args[:2]]
+        if all(isinstance(bound, (int, float)) for bound in bounds):
+            return int(bounds[-1] - (bounds[0] if len(bounds) == 2 else 0))
+    return None
+
+
+def estimate_rows(tree, constants):
+    """Largest row count the script obviously produces.
+
+    Nested `for` loops over static ranges are multiplied, and static `size=` /
+    `n=` style arguments (numpy, pandas, list comprehensions) count as well.
+    Returns `(rows, line)` of the largest estimate, or `(0, None)`.
+    """
+    estimates = [(0, None)]
+
+    def visit(node, multiplier):
+        if isinstance(node, ast.For):
+            count = _loop_count(node, constants)
+            if count is not None:
+                multiplier *= max(count, 0)
+                estimates.append((multiplier, node.lineno))
+        elif isinstance(node, ast.comprehension):
+            count = _loop_count(node, constants)
+            if count is not None:
+                estimates.append((multiplier * max(count, 0), node.iter.lineno))
+        elif isinstance(node, ast.Call):
+            for keyword in node.keywords:
+                if keyword.arg in SIZE_KEYWORDS:
+                    value = _static_value(keyword.value, constants)
+                    if isinstance(value, (int, float)):
+                        estimates.append((multiplier * int(value), node.lineno))
+        for child in ast.iter_child_nodes(node):
+            visit(child, multiplier)
+
+    visit(tree, 1)
+    return max(estimates, key=lambda estimate: estimate[0])
+
+
+def preflight_script(script):
+    """Return `(findings, estimated_rows)` for the source of a dataset script."""
+    try:
+        tree = ast.parse(script)
+    except SyntaxError as e:
+        line = (e.text or "").strip()
+        return [f"line {e.lineno}: syntax error: {e.msg}" + (f"\n    {line}" if line else "")], 0
+
+    findings = []
+    constants = _module_constants(tree)
+    _check_imports(tree, findings)
+    _check_output_paths(tree, constants, findings)
+
+    rows, line = estimate_rows(tree, constants)
+    if rows > _max_rows():
+        findings.append(
+            f"line {line}: generates about {rows:,} rows, keep the data under "
+            f"{_max_rows():,} rows so the demo loads quickly"
+        )
+    return findings, rows
@@ -0,0 +1,137 @@
+"""Run generated dataset scripts with limits, captured output and usage stats.
+
+`run_script` executes the script in a child process through `script_sandbox`
+with a wall clock timeout (SCRIPT_TIMEOUT_SECONDS), a CPU time limit
+(SCRIPT_CPU_SECONDS) and an address space limit (SCRIPT_MEMORY_LIMIT_MB).
+The whole process group is killed on timeout, so a runaway script can't hang
+the agent, and stdout / stderr are captured so the real traceback can be handed
+to `fix_python_script`.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.dataset_format import is_data_file, row_count
+
+SANDBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_sandbox.py")
+# Most of a traceback worth showing the LLM is at the end
+MAX_OUTPUT_CHARS = 8000
+# Neither exists on Windows
+_SIGXCPU = getattr(signal, "SIGXCPU", None)
+_SIGKILL = getattr(signal, "SIGKILL", None)
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _tail(text, limit=MAX_OUTPUT_CHARS):
+    return text if len(text) <= limit else "...\n" + text[-limit:]
+
+
+def _kill_process_group(process):
+    try:
+        os.killpg(process.pid, _SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.kill()
+
+
+def output_file_stats(output_directory):
+    """Rows and bytes of every data file in `output_directory`, by file name."""
+    stats = {}
+    for file_name in sorted(os.listdir(output_directory)):
+        if not is_data_file(file_name):
+            continue
+        path = os.path.join(output_directory, file_name)
+        stats[file_name] = {"rows": row_count(path), "bytes": os.path.getsize(path)}
+    return stats
+
+
+def run_script(script_path, output_directory, cwd=None):
+    """Run `script_path` in `cwd` and return a dict describing the run.
+
+    The result holds `returncode`, `timed_out`, `wall_seconds`, `cpu_seconds`,
+    `peak_rss_mb`, the captured `stdout` / `stderr` and the `data_files` stats.
+    """
+    timeout = _env_int("SCRIPT_TIMEOUT_SECONDS", 600)
+    cpu_seconds = _env_int("SCRIPT_CPU_SECONDS", timeout)
+    memory_mb = _env_int("SCRIPT_MEMORY_LIMIT_MB", 4096)
+
+    fd, stats_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            SANDBOX_PATH,
+            stats_path,
+            str(cpu_seconds),
+            str(memory_mb),
+            os.path.abspath(script_path),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        # Scripts write to relative paths, this is the build's workspace
+        cwd=cwd,
+        # Own process group so anything the script starts is killed with it
+        start_new_session=True,
+    )
+    timed_out = False
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_process_group(process)
+        stdout, stderr = process.communicate()
+    wall_seconds = time.perf_counter() - start
+
+    usage = {}
+    try:
+        with open(stats_path) as f:
+            usage = json.load(f)
+    except (OSError, ValueError):
+        pass  # Killed before it could report
+    finally:
+        os.remove(stats_path)
+
+    return {
+        "returncode": process.returncode,
+        "timed_out": timed_out,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": usage.get("cpu_seconds"),
+        "peak_rss_mb": usage.get("peak_rss_mb"),
+        "stdout": stdout,
+        "stderr": stderr,
+        "data_files": output_file_stats(output_directory),
+    }
+
+
+def describe_failure(run):
+    """Error text for `fix_python_script`, or None when the run succeeded."""
+    if run["timed_out"]:
+        reason = (
+            f"The script was killed after exceeding the {run['wall_seconds']:.0f}s time "
+            "limit. Generate less data or use vectorized operations instead of loops."
+        )
+    elif _SIGXCPU and run["returncode"] == -_SIGXCPU:
+        reason = "The script was killed after exceeding its CPU time limit."
+    elif _SIGKILL and run["returncode"] == -_SIGKILL:
+        reason = "The script was killed, most likely for exceeding its memory limit."
+    elif run["returncode"] != 0:
+        reason = f"The script exited with status {run['returncode']}."
+    else:
+        return None
+
+    parts = [reason]
+    if run["stderr"].strip():
+        parts.append(_tail(run["stderr"].strip()))
+    elif run["stdout"].strip():
+        parts.append("Output:\n" + _tail(run["stdout"].strip()))
+    return "\n\n".join(parts)
@@ -0,0 +1,84 @@
+"""Bootstrap that runs a generated script under resource limits.
+
+Usage: python script_sandbox.py STATS_PATH CPU_SECONDS MEMORY_MB SCRIPT_PATH
+
+The limits are applied here, in the child, rather than with `preexec_fn`,
+which is not safe while the graph runs branches in threads. On exit the CPU
+time and peak RSS of the script are written to STATS_PATH as JSON. A failing
+script prints a traceback that starts at the script's own frames.
+"""
+
+import atexit
+import json
+import os
+import runpy
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows: run without limits or usage stats
+    resource = None
+
+# Helper library for generated scripts, see utils/script_library.py
+SCRIPT_LIB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "script_lib"
+)
+
+
+def _apply_limits(cpu_seconds, memory_mb):
+    if resource is None:
+        return
+    limits = []
+    if cpu_seconds > 0:
+        limits.append((resource.RLIMIT_CPU, cpu_seconds))
+    if memory_mb > 0:
+        limits.append((resource.RLIMIT_AS, memory_mb * 1024 * 1024))
+    for limit, value in limits:
+        try:
+            resource.setrlimit(limit, (value, value))
+        except (ValueError, OSError):
+            pass  # Not supported on this platform (e.g. RLIMIT_AS on macOS)
+
+
+def _write_stats(stats_path):
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and in KB everywhere else
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    with open(stats_path, "w") as f:
+        json.dump(
+            {
+                "cpu_seconds": usage.ru_utime + usage.ru_stime,
+                "peak_rss_mb": peak_rss / (1024 * 1024),
+            },
+            f,
+        )
+
+
+def main():
+    stats_path, cpu_seconds, memory_mb, script_path = sys.argv[1:5]
+    _apply_limits(int(cpu_seconds), int(memory_mb))
+    atexit.register(_write_stats, stats_path)
+
+    sys.argv = [script_path]
+    # Same import path as `python script.py`, plus the helper library
+    sys.path[0] = os.path.dirname(script_path)
+    sys.path.insert(1, SCRIPT_LIB_PATH)
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        error_type, error, tb = sys.exc_info()
+        # Skip the bootstrap and runpy frames
+        script_tb = tb
+        while script_tb is not None and script_tb.tb_frame.f_code.co_filename != script_path:
+            script_tb = script_tb.tb_next
+        traceback.print_exception(error_type, error, script_tb or tb)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
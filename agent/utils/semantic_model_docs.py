@@ -0,0 +1,75 @@
+"""Cached Cortex Analyst semantic model documentation for the semantic model prompts.
+
+The documentation file is read once per process. Besides the full text there is
+a condensed variant with only the specification, without the long example
+model at the end. SEMANTIC_MODEL_DOCS_TOKEN_BUDGET picks between the two: the
+full text is used when it fits in the budget, otherwise the condensed one.
+"""
+
+import os
+from functools import lru_cache
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, "semantic_model_docs.txt"
+)
+EXAMPLE_MARKER = "### example semantic model ###"
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        # tiktoken missing or its encoding files can't be downloaded
+        return None
+
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is None:
+        # Rough estimate for English text
+        return len(text) // 4
+    return len(encoding.encode(text))
+
+
+@lru_cache(maxsize=None)
+def full_documentation():
+    with open(DOCS_PATH, "r") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def condensed_documentation():
+    return full_documentation().split(EXAMPLE_MARKER, 1)[0].strip()
+
+
+@lru_cache(maxsize=None)
+def token_report():
+    full_tokens = count_tokens(full_documentation())
+    condensed_tokens = count_tokens(condensed_documentation())
+    return {
+        "full_tokens": full_tokens,
+        "condensed_tokens": condensed_tokens,
+        "saved_tokens": full_tokens - condensed_tokens,
+    }
+
+
+def get_semantic_model_documentation(writer=None):
+    """Return the documentation variant that fits the configured token budget."""
+    report = token_report()
+    budget = os.getenv("SEMANTIC_MODEL_DOCS_TOKEN_BUDGET")
+
+    if budget and report["full_tokens"] > int(budget):
+        variant, documentation = "condensed", condensed_documentation()
+        tokens = report["condensed_tokens"]
+        note = f", saving {report['saved_tokens']} tokens per call"
+    else:
+        variant, documentation = "full", full_documentation()
+        tokens = report["full_tokens"]
+        note = f", condensed would save {report['saved_tokens']}"
+
+    if writer:
+        writer(f"Using {variant} semantic model docs ({tokens} tokens{note})")
+    return documentation
@@ -0,0 +1,294 @@
+"""Local structural checks for generated Cortex Analyst semantic models.
+
+`validate_semantic_model` parses the YAML and checks it against the rules the
+semantic model prompts spell out and the tables that were actually loaded
+(`table_info`). Mechanical problems are repaired in place; anything that needs
+judgement is returned as a violation for the LLM to fix.
+"""
+
+import yaml
+
+TOP_LEVEL_KEYS = {
+    "name",
+    "description",
+    "comments",
+    "tables",
+    "relationships",
+    "verified_queries",
+    "custom_instructions",
+    "module_custom_instructions",
+}
+TABLE_KEYS = {
+    "name",
+    "synonyms",
+    "description",
+    "base_table",
+    "primary_key",
+    "dimensions",
+    "time_dimensions",
+    "facts",
+    "metrics",
+    "filters",
+}
+COLUMN_GROUPS = ("dimensions", "time_dimensions", "facts")
+JOIN_TYPES = {"left_outer", "inner"}
+RELATIONSHIP_TYPES = {"many_to_one", "one_to_one"}
+
+
+def _unquote(identifier):
+    return str(identifier).replace('"', "").upper()
+
+
+def _physical_tables(table_info):
+    """Map upper-cased table names to their (database, schema, {column: type})."""
+    tables = {}
+    for table in table_info:
+        database, schema, name = [
+            _unquote(part) for part in table["fully_qualified_name"].split(".")
+        ]
+        columns = {
+            column["column_name"].upper(): column.get("column_type", "VARCHAR")
+            for column in table["columns"]
+        }
+        tables[name] = (database, schema, columns)
+    return tables
+
+
+def _logical_column(table, physical_columns, column, repairs):
+    """Return the logical name for `column`, adding a dimension if it has none.
+
+    Returns None when `column` is neither a logical nor a physical column.
+    """
+    for group in COLUMN_GROUPS:
+        for logical in table.get(group) or []:
+            if not isinstance(logical, dict):
+                continue
+            if str(logical.get("name", "")).upper() == column.upper():
+                return logical["name"]
+            if str(logical.get("expr", "")).strip().upper() == column.upper():
+                return logical["name"]
+
+    if column.upper() not in physical_columns:
+        return None
+    table.setdefault("dimensions", [])
+    table["dimensions"] = table["dimensions"] or []
+    table["dimensions"].append(
+        {
+            "name": column.lower(),
+            "expr": column.upper(),
+            "data_type": physical_columns[column.upper()],
+        }
+    )
+    repairs.append(f"added dimension '{column.lower()}' to table '{table.get('name')}'")
+    return column.lower()
+
+
+def _repair_structure(model, repairs):
+    # Model wrapped in a single key, e.g. `semantic_model: {name: ..., tables: ...}`
+    if "tables" not in model and len(model) == 1:
+        (wrapper, inner), = model.items()
+        if isinstance(inner, dict) and "tables" in inner:
+            repairs.append(f"unwrapped the model from the '{wrapper}' key")
+            model = inner
+
+    # Relationships nested under a table instead of at the top level
+    for table in model.get("tables") or []:
+        if isinstance(table, dict) and "relationships" in table:
+            nested = table.pop("relationships") or []
+            model.setdefault("relationships", [])
+            model["relationships"] = (model["relationships"] or []) + nested
+            repairs.append(f"moved relationships out of table '{table.get('name')}'")
+
+    for key in list(model):
+        if key == "verified_queries":
+            del model[key]
+            repairs.append("removed verified_queries")
+        elif key not in TOP_LEVEL_KEYS:
+            del model[key]
+            repairs.append(f"removed undocumented top level property '{key}'")
+    return model
+
+
+def _repair_table(table, physical_tables, repairs, violations):
+    name = table.get("name")
+    for key in list(table):
+        if key == "metrics":
+            del table[key]
+            repairs.append(f"removed metrics from table '{name}'")
+        elif key not in TABLE_KEYS:
+            del table[key]
+            repairs.append(f"removed undocumented property '{key}' from table '{name}'")
+
+    base_table = table.get("base_table") or {}
+    if not isinstance(base_table, dict):
+        violations.append(
+            f"base_table of table '{name}' needs to be a mapping with database, schema and table"
+        )
+        return
+    physical_name = _unquote(base_table.get("table") or name or "")
+    if physical_name not in physical_tables:
+        violations.append(
+            f"table '{name}' has base_table '{base_table.get('table')}', which is not one "
+            f"of the loaded tables: {', '.join(sorted(physical_tables))}"
+        )
+        return
+
+    database, schema, columns = physical_tables[physical_name]
+    expected = {"database": database, "schema": schema, "table": physical_name}
+    if {key: _unquote(value) for key, value in base_table.items()} != expected:
+        table["base_table"] = expected
+        repairs.append(f"set base_table of '{name}' to {database}.{schema}.{physical_name}")
+
+    for group in COLUMN_GROUPS:
+        for column in table.get(group) or []:
+            if not isinstance(column, dict):
+                violations.append(
+                    f"every entry in {group} of table '{name}' needs to be a mapping with a name and expr"
+                )
+                continue
+            expr = str(column.get("expr", "")).strip()
+            # Only bare column references can be checked without parsing SQL
+            if expr.replace("_", "").isalnum() and expr.upper() not in columns:
+                violations.append(
+                    f"{group[:-1].replace('_', ' ')} '{column.get('name')}' in table '{name}' "
+                    f"references column '{expr}', which does not exist in {physical_name}"
+                )
+
+
+def _repair_relationships(model, tables_by_name, physical_tables, repairs, violations):
+    related_tables = {}
+    relationships = []
+    for relationship in model.get("relationships") or []:
+        if not isinstance(relationship, dict):
+            violations.append("every entry in relationships needs to be a mapping")
+            continue
+        name = relationship.get("name")
+        left = tables_by_name.get(str(relationship.get("left_table", "")).upper())
+        right = tables_by_name.get(str(relationship.get("right_table", "")).upper())
+        if left is None or right is None:
+            repairs.append(f"dropped relationship '{name}' with an unknown table")
+            continue
+
+        # A relationship only exists between identically named columns present
+        # in both tables
+        left_physical = physical_tables[_unquote(left["base_table"]["table"])][2]
+        right_physical = physical_tables[_unquote(right["base_table"]["table"])][2]
+        columns = []
+        for pair in relationship.get("relationship_columns") or []:
+            if not isinstance(pair, dict):
+                violations.append(
+                    f"every entry in relationship_columns of '{name}' needs to be a mapping "
+                    "with a left_column and right_column"
+                )
+                continue
+            left_column = str(pair.get("left_column", ""))
+            right_column = str(pair.get("right_column", ""))
+            if left_column.upper() != right_column.upper():
+                repairs.append(
+                    f"dropped join {left_column} = {right_column} from relationship '{name}'"
+                )
+                continue
+            left_logical = _logical_column(left, left_physical, left_column, repairs)
+            right_logical = _logical_column(right, right_physical, right_column, repairs)
+            if left_logical is None or right_logical is None:
+                repairs.append(
+                    f"dropped join on {left_column} from relationship '{name}', "
+                    "the column is missing from one of the tables"
+                )
+                continue
+            if {"left_column": left_logical, "right_column": right_logical} != pair:
+                repairs.append(f"pointed join on {left_column} in '{name}' at logical columns")
+            columns.append({"left_column": left_logical, "right_column": right_logical})
+        if not columns:
+            repairs.append(f"dropped relationship '{name}' without identical join columns")
+            continue
+        relationship["relationship_columns"] = columns
+
+        if relationship.get("join_type") not in JOIN_TYPES:
+            relationship["join_type"] = "left_outer"
+            repairs.append(f"set join_type of '{name}' to left_outer")
+        if relationship.get("relationship_type") not in RELATIONSHIP_TYPES:
+            relationship["relationship_type"] = "many_to_one"
+            repairs.append(f"set relationship_type of '{name}' to many_to_one")
+
+        related_tables.setdefault(id(left), (left, None))
+        related_tables[id(right)] = (right, [pair["right_column"] for pair in columns])
+        relationships.append(relationship)
+
+    if relationships:
+        model["relationships"] = relationships
+    elif "relationships" in model:
+        del model["relationships"]
+
+    for table, join_columns in related_tables.values():
+        primary_key = table.get("primary_key") or {}
+        if not isinstance(primary_key, dict):
+            violations.append(
+                f"primary_key of table '{table.get('name')}' needs to be a mapping with a columns list"
+            )
+            continue
+        if primary_key.get("columns"):
+            continue
+        # Same heuristic as the upload: a first column with ID in its name is the key
+        physical = physical_tables[_unquote(table["base_table"]["table"])][2]
+        first_column = next(iter(physical), "")
+        if "ID" in first_column:
+            key_columns = [_logical_column(table, physical, first_column, repairs)]
+        elif join_columns:
+            key_columns = join_columns
+        else:
+            violations.append(
+                f"table '{table.get('name')}' is used in a relationship but has no primary_key"
+            )
+            continue
+        table["primary_key"] = {"columns": key_columns}
+        repairs.append(f"set primary_key of '{table.get('name')}' to {key_columns}")
+
+
+def validate_semantic_model(yaml_content, table_info, model_name=None):
+    """Check and repair a semantic model.
+
+    Returns `(yaml_content, repairs, violations)`. The YAML is only re-serialized
+    when something was repaired, so untouched models keep their formatting.
+    """
+    try:
+        model = yaml.safe_load(yaml_content)
+    except yaml.YAMLError as e:
+        return yaml_content, [], [f"the YAML does not parse: {e}"]
+    if not isinstance(model, dict):
+        return yaml_content, [], ["the YAML is not a mapping with top level properties"]
+
+    repairs = []
+    violations = []
+    model = _repair_structure(model, repairs)
+
+    if not model.get("name"):
+        model["name"] = model_name or "semantic_model"
+        repairs.append(f"added missing name '{model['name']}'")
+    if not model.get("description"):
+        violations.append("the model has no top level description")
+
+    tables = model.get("tables")
+    if not isinstance(tables, list) or not tables:
+        violations.append("the model has no top level tables list")
+        return yaml_content, repairs, violations
+
+    physical_tables = _physical_tables(table_info)
+    tables_by_name = {}
+    for table in tables:
+        if not isinstance(table, dict) or not table.get("name"):
+            violations.append("every entry in tables needs a name")
+            continue
+        _repair_table(table, physical_tables, repairs, violations)
+        tables_by_name[str(table["name"]).upper()] = table
+
+    if not violations:
+        _repair_relationships(
+            model, tables_by_name, physical_tables, repairs, violations
+        )
+
+    if repairs:
+        yaml_content = yaml.safe_dump(
+            model, sort_keys=False, allow_unicode=True, width=1000
+        )
+    return yaml_content, repairs, violations
@@ -0,0 +1,300 @@
+"""Process wide pool of authenticated Snowpark sessions.
+
+Opening a session can mean a browser login and an MFA prompt, so sessions are
+opened once and shared by every build (and the Streamlit pages) in the
+process. Whoever needs one checks it out, gets it to itself with its schema
+set, and returns it with `close()`:
+
+    with session_pool().checkout("MY_SCHEMA") as session:
+        session.sql("SELECT 1").collect()
+
+Without a schema the session is set back to the database and schema of the
+connection, whatever schema its last user left it in.
+
+A graph run uses `run_session`, which checks a session out on first use and
+keeps it for the rest of the run; `app.stream_build` returns it when the run
+stops. The run's parallel branches share it, one call at a time, because
+Snowpark sessions are not safe to use from several threads at once. At most
+SNOWFLAKE_POOL_SIZE sessions are open at a time, a checkout waits up to
+SNOWFLAKE_POOL_TIMEOUT_SECONDS for a free one. Idle sessions are
+pinged every SNOWFLAKE_HEARTBEAT_SECONDS so they don't expire, and sessions
+that did expire or lost their connection are replaced by new ones.
+"""
+
+import os
+import threading
+import time
+
+from snowflake.snowpark import Session
+
+from utils.resources import get_resource, release_resource
+from utils.workspace import workspace_name
+
+POOL_KEY = "snowflake_pool"
+
+
+def _connect():
+    return (
+        Session.builder.config(
+            "CONNECTION_NAME", os.getenv("SNOWFLAKE_CONNECTION_NAME", "agent-creator")
+        )
+        # Reuse the SSO token and MFA approval of the last login where the
+        # account allows it, instead of prompting for every new session
+        .config("client_store_temporary_credential", True)
+        .config("client_request_mfa_token", True)
+        .create()
+    )
+
+
+def _connection_lost(session):
+    connection = getattr(session, "connection", None)
+    if connection is None:
+        return False
+    return connection.is_closed() or getattr(connection, "expired", False)
+
+
+def _ping(session):
+    try:
+        if _connection_lost(session):
+            return False
+        session.sql("SELECT 1").collect()
+        return True
+    except Exception:
+        return False
+
+
+def _close_quietly(session):
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+class PooledSession:
+    """A checked out session; everything but `close` goes to the Snowpark session.
+
+    `close()` (or leaving the `with` block) gives the session back to the pool
+    instead of closing it.
+    """
+
+    def __init__(self, pool, session, schema):
+        self._pool = pool
+        self._session = session
+        self.schema = schema
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def use_schema(self, schema):
+        self._session.use_schema(schema)
+        self.schema = schema
+
+    def close(self):
+        session, self._session = self._session, None
+        if session is not None:
+            self._pool._checkin(session)
+
+
+class _Locked:
+    """Proxy that holds `lock` while anything of `target` is looked up or called."""
+
+    def __init__(self, target, lock):
+        self._target = target
+        self._lock = lock
+
+    def __getattr__(self, name):
+        with self._lock:
+            value = getattr(self._target, name)
+        if not callable(value):
+            return value
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return value(*args, **kwargs)
+
+        return locked
+
+
+class SharedSession(_Locked):
+    """A session used by several threads, one call at a time.
+
+    The DataFrames from `sql` and the `file` operations take the same lock, so
+    a statement runs when its `collect()` gets the session to itself.
+    """
+
+    def __init__(self, session):
+        super().__init__(session, threading.RLock())
+
+    def sql(self, query, *args, **kwargs):
+        with self._lock:
+            return _Locked(self._target.sql(query, *args, **kwargs), self._lock)
+
+    @property
+    def file(self):
+        return _Locked(self._target.file, self._lock)
+
+
+class SessionPool:
+    """Up to `size` sessions from `factory()`, handed out one caller at a time."""
+
+    def __init__(self, factory=_connect, size=4, timeout=300.0, heartbeat_seconds=600.0):
+        self.factory = factory
+        self.size = max(size, 1)
+        self.timeout = timeout
+        self.heartbeat_seconds = heartbeat_seconds
+        self._idle = []  # (session, time it was last known to work)
+        self._defaults = {}  # id(session): (database, schema) it was opened with
+        self._open = 0  # Idle, checked out and being opened
+        self._condition = threading.Condition()
+        self._closed = threading.Event()
+        if heartbeat_seconds > 0:
+            threading.Thread(target=self._heartbeat, name="snowflake-heartbeat", daemon=True).start()
+
+    def checkout(self, schema=None, create_schema=False, timeout=None):
+        """Check out a session with `schema` (created first if asked to) as its schema.
+
+        Without `schema` it gets the connection's default database and schema.
+        Waits up to `timeout` seconds (default: the pool's) for a session when
+        all of them are in use, then raises RuntimeError.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed.is_set():
+                    raise RuntimeError("The Snowflake session pool is closed")
+                if self._idle:
+                    # Most recently used first, it's the least likely to have expired
+                    session, last_used = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    session = last_used = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(
+                        f"All {self.size} Snowflake sessions are in use, none became free within {timeout:g}s"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            if session is not None and self._expired(session, last_used):
+                # Expired while idle, open a new one in its place
+                _close_quietly(session)
+                session = None
+            if session is None:
+                session = self.factory()
+                self._defaults[id(session)] = (
+                    session.get_current_database(),
+                    session.get_current_schema(),
+                )
+            elif not schema:
+                database, default_schema = self._defaults[id(session)]
+                if database and default_schema:
+                    session.use_schema(f"{database}.{default_schema}")
+            if schema:
+                if create_schema:
+                    session.sql(f"CREATE SCHEMA IF NOT EXISTS {schema}").collect()
+                session.use_schema(schema)
+        except Exception:
+            if session is not None:
+                _close_quietly(session)
+            self._discard()
+            raise
+        return PooledSession(self, session, schema)
+
+    def _expired(self, session, last_used):
+        stale = time.monotonic() - last_used > self.heartbeat_seconds > 0
+        return _connection_lost(session) or (stale and not _ping(session))
+
+    def _checkin(self, session):
+        if self._closed.is_set() or _connection_lost(session):
+            _close_quietly(session)
+            self._discard()
+            return
+        with self._condition:
+            self._idle.append((session, time.monotonic()))
+            self._condition.notify()
+
+    def _discard(self):
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _heartbeat(self):
+        while not self._closed.wait(self.heartbeat_seconds):
+            cutoff = time.monotonic() - self.heartbeat_seconds
+            with self._condition:
+                # Taken out of the pool while they are pinged
+                due = [(session, used) for session, used in self._idle if used <= cutoff]
+                self._idle = [(session, used) for session, used in self._idle if used > cutoff]
+            for session, _ in due:
+                if _ping(session):
+                    self._checkin(session)
+                else:
+                    _close_quietly(session)
+                    self._discard()
+
+    def close(self):
+        """Close the idle sessions; checked out ones are closed when returned."""
+        self._closed.set()
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for session, _ in idle:
+            _close_quietly(session)
+
+
+def _create_pool(factory=_connect):
+    # Created on first use, after the .env file has been loaded
+    return SessionPool(
+        factory,
+        size=int(os.getenv("SNOWFLAKE_POOL_SIZE", "4")),
+        timeout=float(os.getenv("SNOWFLAKE_POOL_TIMEOUT_SECONDS", "300")),
+        heartbeat_seconds=float(os.getenv("SNOWFLAKE_HEARTBEAT_SECONDS", "600")),
+    )
+
+
+def session_pool():
+    """The process wide pool, closed at exit by the resource registry."""
+    return get_resource(POOL_KEY, _create_pool)
+
+
+def set_session_factory(factory):
+    """Replace the pool with one whose sessions come from `factory()`, e.g. fakes."""
+    release_resource(POOL_KEY)
+    return get_resource(POOL_KEY, lambda: _create_pool(factory))
+
+
+def _run_session_key(thread_id=None):
+    return ("snowflake_session", workspace_name(thread_id))
+
+
+def run_session(schema):
+    """The session of the running build, checked out on first use, with `schema` set.
+
+    Nodes on parallel branches share it, see `SharedSession`.
+    """
+    session = get_resource(
+        _run_session_key(),
+        lambda: SharedSession(session_pool().checkout(schema, create_schema=True)),
+    )
+    with session._lock:
+        if session.schema != schema:
+            # The build picked a different schema since the session was checked out
+            session.sql(f"CREATE SCHEMA IF NOT EXISTS {schema}").collect()
+            session.use_schema(schema)
+    return session
+
+
+def release_run_session(thread_id):
+    """Give the session of build `thread_id` back to the pool, if it has one."""
+    release_resource(_run_session_key(thread_id))
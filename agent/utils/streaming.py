@@ -0,0 +1,121 @@
+"""Opt-in token progress for long running LLM calls.
+
+With STREAM_LLM_PROGRESS enabled, nodes pass `llm_progress_config(writer,
+label)` to their chain and the deltas the model streams back (plain text or
+the JSON of a structured output) are reported on the `custom` stream channel
+as dicts:
+
+    {"type": "llm_progress", "label": ..., "tokens": ..., "bytes": ...,
+     "preview": ..., "done": ...}
+
+`tokens` counts streamed deltas, which the OpenAI API sends roughly one token
+at a time. The first delta is reported immediately and later ones at most
+every PROGRESS_INTERVAL seconds, so the UI shows output within about a second
+without being flooded. Plain status strings keep flowing on the same channel.
+"""
+
+import os
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langgraph.config import get_config
+
+PROGRESS_INTERVAL = 0.25
+PREVIEW_CHARS = 120
+
+
+def llm_progress_enabled():
+    return os.getenv("STREAM_LLM_PROGRESS", "false").lower() in ("1", "true", "yes")
+
+
+def _chunk_text(chunk):
+    """Text of a streamed chunk, including tool call arguments."""
+    message = getattr(chunk, "message", None)
+    if message is None:
+        return ""
+    if message.content:
+        return message.content if isinstance(message.content, str) else ""
+    return "".join(
+        tool_call.get("args") or "" for tool_call in getattr(message, "tool_call_chunks", [])
+    )
+
+
+class LLMProgressHandler(BaseCallbackHandler):
+    """Reports streamed token counts of every LLM call in a chain to `writer`.
+
+    One handler can follow several concurrent calls, e.g. a `batch`; the counts
+    are totals and `done` is set once no call is in flight.
+    """
+
+    def __init__(self, writer, label):
+        self.writer = writer
+        self.label = label
+        self.tokens = 0
+        self.bytes = 0
+        self._preview = ""
+        self._active = set()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def _emit(self, done=False):
+        self._last_emit = time.monotonic()
+        self.writer(
+            {
+                "type": "llm_progress",
+                "label": self.label,
+                "tokens": self.tokens,
+                "bytes": self.bytes,
+                "preview": " ".join(self._preview.split())[-PREVIEW_CHARS:].strip(),
+                "done": done,
+            }
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self._active.add(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._active.add(run_id)
+
+    def on_llm_new_token(self, token, *, chunk=None, **kwargs):
+        text = token or _chunk_text(chunk)
+        if not text:
+            return
+        with self._lock:
+            self.tokens += 1
+            self.bytes += len(text.encode("utf-8"))
+            self._preview = (self._preview + text)[-4 * PREVIEW_CHARS :]
+            if self.tokens == 1 or time.monotonic() - self._last_emit >= PROGRESS_INTERVAL:
+                self._emit()
+
+    def _finish(self, run_id):
+        with self._lock:
+            self._active.discard(run_id)
+            if not self._active and self.tokens:
+                self._emit(done=True)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+
+def llm_progress_config(writer, label):
+    """Runnable config that streams progress of the chain to `writer`, if enabled."""
+    if not llm_progress_enabled():
+        return {}
+    handler = LLMProgressHandler(writer, label)
+    # Callbacks passed to a chain replace the ones of the graph run, so add
+    # the handler to those instead (the messages stream relies on them)
+    try:
+        callbacks = get_config().get("callbacks")
+    except RuntimeError:  # Not called from a graph node
+        callbacks = None
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler)
+        return {"callbacks": callbacks}
+    return {"callbacks": list(callbacks or []) + [handler]}
@@ -0,0 +1,177 @@
+"""Column profiles (samples, distinct counts, min/max and null ratios) for loaded tables.
+
+Profiles are either computed locally from a DataFrame that was just loaded, or
+with a single aggregate query per table, instead of one query per column.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import numpy as np
+
+SAMPLE_SIZE = 5
+# Distinct sample values are drawn from the first rows only, so the sample
+# aggregate never has to scan (or build an array from) a whole fact table.
+SAMPLE_ROWS = 1000
+
+
+def _plain(value):
+    """Convert driver / numpy values to plain JSON friendly Python values."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _column_profile(
+    column_name, column_type, samples, distinct_count, minimum, maximum, null_ratio
+):
+    return {
+        "column_name": column_name,
+        "column_type": column_type,
+        "sample_values": [_plain(value) for value in samples],
+        "distinct_count": int(distinct_count),
+        "min": _plain(minimum),
+        "max": _plain(maximum),
+        "null_ratio": round(float(null_ratio), 4),
+    }
+
+
+def profile_dataframe(df, column_types):
+    """Profile every column of `df` locally, without touching the warehouse.
+
+    `column_types` maps each column name to the Snowflake type it was loaded as.
+    """
+    null_ratios = df.isna().mean() if len(df) else {name: 0.0 for name in df.columns}
+    distinct_counts = df.nunique(dropna=True)
+
+    profile = []
+    for column_name in df.columns:
+        non_null = df[column_name].dropna()
+        try:
+            minimum, maximum = (non_null.min(), non_null.max()) if len(non_null) else (None, None)
+        except TypeError:
+            # Mixed types that can't be ordered
+            minimum, maximum = None, None
+
+        profile.append(
+            _column_profile(
+                column_name,
+                column_types[column_name],
+                non_null.drop_duplicates().head(SAMPLE_SIZE).tolist(),
+                distinct_counts[column_name],
+                minimum,
+                maximum,
+                null_ratios[column_name],
+            )
+        )
+    return profile
+
+
+def fetch_column_types(session, table_names):
+    """Return `{table_name: [(column_name, data_type), ...]}` for all tables in one query."""
+    if not table_names:
+        return {}
+
+    names = ", ".join(f"'{table_name}'" for table_name in table_names)
+    rows = session.sql(
+        f"""
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME IN ({names})
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+    ).collect()
+
+    column_types = {table_name: [] for table_name in table_names}
+    for row in rows:
+        column_types[row["TABLE_NAME"]].append((row["COLUMN_NAME"], row["DATA_TYPE"]))
+    return column_types
+
+
+def profile_table(session, table_name, columns):
+    """Profile all `columns` of a Snowflake table with a single query.
+
+    Returns `(row_count, profile)`.
+    """
+    stats = ["COUNT(*) AS ROW_COUNT"]
+    samples = []
+    for i, (column_name, column_type) in enumerate(columns):
+        column = f'"{column_name}"'
+        stats.append(f"APPROX_COUNT_DISTINCT({column}) AS DISTINCT_{i}")
+        stats.append(f"COUNT_IF({column} IS NULL) AS NULLS_{i}")
+        if column_type == "BOOLEAN":
+            stats.append(f"NULL AS MIN_{i}, NULL AS MAX_{i}")
+        else:
+            stats.append(f"MIN({column}) AS MIN_{i}, MAX({column}) AS MAX_{i}")
+        samples.append(
+            f"ARRAY_SLICE(ARRAY_AGG(DISTINCT {column}), 0, {SAMPLE_SIZE}) AS SAMPLES_{i}"
+        )
+
+    if not samples:
+        return 0, []
+
+    row = session.sql(
+        f"""
+        WITH STATS AS (
+            SELECT {', '.join(stats)} FROM {table_name}
+        ),
+        SAMPLE AS (
+            SELECT {', '.join(samples)}
+            FROM (SELECT * FROM {table_name} LIMIT {SAMPLE_ROWS})
+        )
+        SELECT * FROM STATS, SAMPLE
+        """
+    ).collect()[0]
+
+    row_count = row["ROW_COUNT"]
+    profile = []
+    for i, (column_name, column_type) in enumerate(columns):
+        sample_values = row[f"SAMPLES_{i}"]
+        if isinstance(sample_values, str):
+            # ARRAY columns come back as JSON text
+            sample_values = json.loads(sample_values)
+        profile.append(
+            _column_profile(
+                column_name,
+                column_type,
+                sample_values or [],
+                row[f"DISTINCT_{i}"],
+                row[f"MIN_{i}"],
+                row[f"MAX_{i}"],
+                row[f"NULLS_{i}"] / row_count if row_count else 0.0,
+            )
+        )
+    return row_count, profile
+
+
+def format_table_info(table_info):
+    """Render table profiles as compact text for the semantic model prompts."""
+    lines = []
+    for table in table_info:
+        lines.append(
+            f"TABLE {table['table_name']} ({table['fully_qualified_name']}), "
+            f"{table.get('row_count', 'unknown')} rows"
+        )
+        for column in table["columns"]:
+            details = [
+                f"distinct={column['distinct_count']}",
+                f"nulls={column['null_ratio']:.1%}",
+            ]
+            if column["min"] is not None:
+                details.append(f"range={column['min']}..{column['max']}")
+            details.append(f"samples={column['sample_values']}")
+            lines.append(
+                f"- {column['column_name']} ({column['column_type']}): "
+                + ", ".join(details)
+            )
+        lines.append("")
+    return "\n".join(lines).strip()
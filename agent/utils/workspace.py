@@ -0,0 +1,155 @@
+"""Per-build working directories and the cap on concurrent builds.
+
+Every build (one graph thread) keeps its script, generated data, documents and
+semantic model in WORKSPACE_ROOT/<thread_id>, so builds running side by side
+in one server never touch each other's files. Nodes find their workspace from
+the thread id of the run they are part of.
+
+WORKSPACE_CLEANUP decides what happens to a workspace once its build finished:
+"on_success" (the default) removes it unless the build failed, so the files
+stay around for debugging and resuming, "always" removes it either way and
+"never" keeps it. Workspaces untouched for WORKSPACE_MAX_AGE_HOURS are pruned
+whenever a new one is created, unless their build can still be resumed or is
+waiting for user input. At most MAX_CONCURRENT_BUILDS builds run at a
+time; further ones wait up to BUILD_QUEUE_TIMEOUT_SECONDS for a slot.
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from langgraph.config import get_config
+
+DATA_DIRECTORY = "generated_csvs"
+DOCUMENTS_DIRECTORY = "generated_documents"
+SCRIPT_FILE = "generated_script.py"
+SEMANTIC_MODEL_FILE = "semantic_model.yaml"
+# Used when a node runs outside a graph run, e.g. when called directly
+DEFAULT_WORKSPACE = "default"
+
+_build_slots = None
+_build_slots_lock = threading.Lock()
+# Whether the build of a thread id can still continue, see set_resumable_check
+_resumable_check = None
+
+
+def workspace_root():
+    return os.path.abspath(os.getenv("WORKSPACE_ROOT", ".workspaces"))
+
+
+def _current_thread_id():
+    try:
+        return get_config()["configurable"]["thread_id"]
+    except (RuntimeError, KeyError):
+        return DEFAULT_WORKSPACE
+
+
+def workspace_name(thread_id=None):
+    """File system safe name of the build `thread_id` (by default the running one)."""
+    # Thread ids come from URLs, don't let one point outside the root
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", str(thread_id or _current_thread_id()))
+    return name.lstrip(".") or DEFAULT_WORKSPACE
+
+
+def _workspace_location(thread_id):
+    return os.path.join(workspace_root(), workspace_name(thread_id))
+
+
+def workspace_dir(thread_id=None):
+    """Directory of the build `thread_id` (by default the running one), created on first use."""
+    directory = _workspace_location(thread_id)
+    if not os.path.isdir(directory):
+        prune_workspaces()
+        os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def workspace_path(*parts, thread_id=None):
+    return os.path.join(workspace_dir(thread_id), *parts)
+
+
+def reset_directory(path):
+    """Empty `path` (or create it) for a fresh run of the node that owns it."""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_workspace(thread_id):
+    shutil.rmtree(_workspace_location(thread_id), ignore_errors=True)
+
+
+def set_resumable_check(check):
+    """Make `prune_workspaces` keep the workspaces of threads for which `check(thread_id)` is true."""
+    global _resumable_check
+    _resumable_check = check
+
+
+def _resumable(name):
+    if _resumable_check is None:
+        return False
+    try:
+        return _resumable_check(name)
+    except Exception:
+        return True  # Can't tell, keep it
+
+
+def prune_workspaces():
+    """Remove workspaces of builds nobody touched for WORKSPACE_MAX_AGE_HOURS.
+
+    Builds that can still continue keep theirs, however old it is.
+    """
+    max_age = float(os.getenv("WORKSPACE_MAX_AGE_HOURS", "24")) * 3600
+    root = workspace_root()
+    if max_age <= 0 or not os.path.isdir(root):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if (
+                os.path.isdir(path)
+                and os.path.getmtime(path) < cutoff
+                and not _resumable(name)
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass  # Removed by another build in the meantime
+
+
+def finish_workspace(thread_id, succeeded):
+    """Apply WORKSPACE_CLEANUP to the workspace of a build that stopped running."""
+    policy = os.getenv("WORKSPACE_CLEANUP", "on_success").lower()
+    if policy == "always" or (policy == "on_success" and succeeded):
+        remove_workspace(thread_id)
+
+
+def _slots():
+    # Created on first use, after the .env file has been loaded
+    global _build_slots
+    with _build_slots_lock:
+        if _build_slots is None:
+            _build_slots = threading.BoundedSemaphore(
+                int(os.getenv("MAX_CONCURRENT_BUILDS", "4"))
+            )
+        return _build_slots
+
+
+@contextmanager
+def build_slot(writer=print):
+    """Hold one of the MAX_CONCURRENT_BUILDS slots while a build runs."""
+    slots = _slots()
+    if not slots.acquire(blocking=False):
+        writer("Waiting for another demo build to finish...")
+        timeout = float(os.getenv("BUILD_QUEUE_TIMEOUT_SECONDS", "600"))
+        if not slots.acquire(timeout=timeout):
+            raise RuntimeError(
+                f"Too many demo builds are running, no slot became free within {timeout:.0f}s"
+            )
+    try:
+        yield
+    finally:
+        slots.release()
@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../agent")))
 
 from agent import app as agent
+from utils.run_stats import format_node_stats, format_run_summary, load_run_summary
 
 
 # Initialize Streamlit app
@@ -26,48 +27,97 @@ if "status_updates" not in st.session_state:
     st.session_state.status_updates = []
 if "thread_config" not in st.session_state:
     st.session_state.thread_config = None
+if "llm_progress" not in st.session_state:
+    st.session_state.llm_progress = {}
+# The thread id is kept in the URL so a build can be picked up again after the
+# app restarts (requires CHECKPOINTER=sqlite)
+if st.session_state.thread_config is None and "thread_id" in st.query_params:
+    st.session_state.thread_config = agent.thread_config(st.query_params["thread_id"])
+    for task in agent.app.get_state(st.session_state.thread_config).tasks:
+        if task.interrupts:
+            st.session_state.interrupt = task.interrupts[0].value
+            break
+
+
+def format_llm_progress(progress):
+    state = "done" if progress["done"] else "streaming"
+    return (
+        f"{progress['label']} ({state}): {progress['tokens']} tokens, "
+        f"{progress['bytes'] / 1024:.1f} KB"
+    )
+
 
+def status_label():
+    lines = st.session_state.status_updates + [
+        format_llm_progress(progress)
+        for progress in st.session_state.llm_progress.values()
+    ]
+    return "\n\n".join([f"- {line}" for line in lines])
 
-def langgraph_stream(prompt):
-    if "interrupt" in st.session_state and st.session_state.interrupt:
+
+def langgraph_stream(prompt, resume_build=False):
+    if resume_build:
+        # Continue a build that stopped, from its last completed node
+        thread_config = st.session_state.thread_config
+        stream = agent.resume(thread_config["configurable"]["thread_id"])
+    elif "interrupt" in st.session_state and st.session_state.interrupt:
         thread_config = st.session_state.thread_config  # Reuse stored thread_config
         inputs = Command(resume=prompt)  # Use Command for resuming
         st.session_state.interrupt = None  # Clear the interrupt after resuming
     else:
-        thread_config = {
-            "configurable": {"thread_id": uuid.uuid4()}
-        }  # New thread_config
+        thread_config = agent.thread_config(uuid.uuid4())  # New thread_config
         st.session_state.thread_config = (
             thread_config  # Store thread_config in session_state
         )
+        st.query_params["thread_id"] = thread_config["configurable"]["thread_id"]
         inputs = {"question": prompt}  # Use plain inputs for new prompts
 
-    for stream_mode, *chunk in agent.app.stream(
-        inputs, stream_mode=["messages", "custom"], config=thread_config
-    ):
+    if not resume_build:
+        stream = agent.stream_build(inputs, thread_config["configurable"]["thread_id"])
+
+    streamed_results = ""
+    for stream_mode, *chunk in stream:
         message_chunk = chunk[0]
 
         if stream_mode == "custom":
-            st.session_state.status_updates.append(message_chunk)
-            chain_of_thought.update(
-                label="\n\n".join(
-                    [f"- {message}" for message in st.session_state.status_updates]
-                )
-            )
+            # Token progress of long running LLM calls (STREAM_LLM_PROGRESS)
+            if isinstance(message_chunk, dict) and message_chunk.get("type") == "llm_progress":
+                st.session_state.llm_progress[message_chunk["label"]] = message_chunk
+                llm_preview.caption(message_chunk["preview"])
+            elif isinstance(message_chunk, dict) and message_chunk.get("type") == "node_stats":
+                st.session_state.status_updates.append(format_node_stats(message_chunk))
+            else:
+                st.session_state.status_updates.append(message_chunk)
+            chain_of_thought.update(label=status_label())
         elif (
             stream_mode == "messages"
             and isinstance(message_chunk[1], dict)
             and "langgraph_node" in message_chunk[1]
             and message_chunk[1]["langgraph_node"].startswith("Display")
         ):
+            if message_chunk[1]["langgraph_node"] == "DisplayResults":
+                streamed_results += message_chunk[0].content
             yield message_chunk[0].content.replace("\n", "\n\n").replace("$", "\\$")
 
     state = agent.app.get_state(thread_config)
 
+    # DisplayResults adds the build breakdown after the LLM's answer
+    final_response = state.values.get("final_response", "")
+    if streamed_results and final_response.startswith(streamed_results):
+        yield final_response[len(streamed_results):].replace("$", "\\$")
+
     # Check for interrupts in tasks and store in session state
     for task in state.tasks:
         if task.interrupts:
             st.session_state.interrupt = task.interrupts[0].value
+            # Interrupts raised outside a Display* node explain themselves
+            interrupt_message = (
+                st.session_state.interrupt.get("message")
+                if isinstance(st.session_state.interrupt, dict)
+                else None
+            )
+            if interrupt_message:
+                yield interrupt_message.replace("$", "\\$")
             break
 
 
@@ -80,15 +130,28 @@ for message in st.session_state.messages:
         with st.chat_message("assistant"):
             st.markdown(message["content"])
 
+resume_requested = False
+if st.session_state.thread_config is not None:
+    pending_nodes = agent.resumable_nodes(
+        st.session_state.thread_config["configurable"]["thread_id"]
+    )
+    if pending_nodes:
+        resume_requested = st.button(
+            f"Resume the interrupted build at {', '.join(pending_nodes)}"
+        )
+
 # Handle user input
-if prompt := st.chat_input("How can I help you today?"):
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+prompt = st.chat_input("How can I help you today?")
+if prompt or resume_requested:
+    if prompt:
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
 
     with st.chat_message("assistant"):
         chain_of_thought = st.status("Thinking...")
-        stream = langgraph_stream(prompt)
+        llm_preview = chain_of_thought.empty()
+        stream = langgraph_stream(prompt, resume_build=resume_requested)
         try:
             response = st.write_stream(stream)
         except Exception as e:
@@ -97,12 +160,19 @@ if prompt := st.chat_input("How can I help you today?"):
 
     st.session_state.messages.append({"role": "assistant", "content": response})
 
+    # Where the build spent its time so far, per node
+    run_summary = format_run_summary(
+        load_run_summary(st.session_state.thread_config["configurable"]["thread_id"])
+    )
+    if run_summary:
+        chain_of_thought.markdown(run_summary)
+
     # Reset status updates
+    llm_preview.empty()
     chain_of_thought.update(
-        label="\n\n".join(
-            [f"- {message}" for message in st.session_state.status_updates]
-        ),
+        label=status_label(),
         expanded=False,
         state="complete",
     )
     st.session_state.status_updates = []
+    st.session_state.llm_progress = {}